@@ -0,0 +1,61 @@
+"""Benchmark role assignment on a full-size pool.
+
+Times assign_role_cards over the five-color candidates of a warm pool for
+growing role targets, and compares its card count with the role buckets of
+the plain build, which count each card toward one role only.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_assignment.py [--cards N]
+"""
+
+import argparse
+import time
+
+from synthetic import COLORS, COMMANDER_NAME, synthetic_index
+
+from mtg_deck_builder.data.card_index import color_identity_mask
+from mtg_deck_builder.engine.assignment import assign_role_cards
+from mtg_deck_builder.engine.card_pool import CardPool
+from mtg_deck_builder.engine.deck_builder import DeckBuilder
+from mtg_deck_builder.engine.deckbrief import DeckBrief
+from mtg_deck_builder.roles.role_engine import RoleEngine
+
+TARGETS = [
+    {"ramp": 10, "card_draw": 10, "interaction": 8, "finisher": 3},
+    {"ramp": 20, "card_draw": 20, "interaction": 15, "finisher": 8},
+    {"ramp": 30, "card_draw": 30, "interaction": 30, "finisher": 10},
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cards", type=int, default=30000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    index = synthetic_index(args.cards)
+    role_engine = RoleEngine()
+    pool = CardPool.load(index, role_engine)
+    candidates = pool.candidates(color_identity_mask(COLORS), land=False)
+
+    print(f"{args.cards} synthetic cards, {len(candidates)} five-color spells")
+    for targets in TARGETS:
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            chosen = assign_role_cards(pool, candidates, targets)
+            timings.append(time.perf_counter() - start)
+
+        brief = DeckBrief(
+            commander=COMMANDER_NAME, color_identity=COLORS, role_targets=targets
+        )
+        buckets = DeckBuilder(index, role_engine, pool).build_deck(brief)
+        bucket_cards = sum(buckets["role_counts"].values())
+
+        print(f"  targets {sum(targets.values())} ({targets})")
+        print(f"    assign_role_cards    {min(timings) * 1000:8.2f} ms")
+        print(f"    cards                {len(chosen):8d}   (buckets: {bucket_cards})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Benchmark the build result cache.
+
+Times a five-color scored build on a cache miss and the same brief on a hit,
+against a warm pool and an on-disk SQLite cache.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_build_cache.py [--cards N]
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from synthetic import COLORS, COMMANDER_NAME, synthetic_index
+
+from mtg_deck_builder.cache.build_cache import BuildCache
+from mtg_deck_builder.engine.card_pool import CardPool
+from mtg_deck_builder.engine.deck_builder import DeckBuilder
+from mtg_deck_builder.engine.deckbrief import DeckBrief
+from mtg_deck_builder.roles.role_engine import RoleEngine
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cards", type=int, default=30000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    index = synthetic_index(args.cards)
+    role_engine = RoleEngine()
+    pool = CardPool.load(index, role_engine)
+    brief = DeckBrief(
+        commander=COMMANDER_NAME,
+        color_identity=COLORS,
+        role_targets={"ramp": 10, "card_draw": 10, "interaction": 8, "finisher": 3},
+        soft_budget=250,
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with BuildCache(Path(tmp) / "builds.db") as cache:
+            builder = DeckBuilder(index, role_engine, pool, scoring=True, cache=cache)
+            start = time.perf_counter()
+            builder.build_deck(brief)
+            miss = time.perf_counter() - start
+
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                builder.build_deck(brief)
+                timings.append(time.perf_counter() - start)
+
+    print(f"{args.cards} synthetic cards, five-color scored build")
+    print(f"  miss (build + store)   {miss * 1000:8.2f} ms")
+    print(f"  hit                    {min(timings) * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Benchmark a commander sweep with DeckBuilder.build_decks.
+
+Builds one deck per commander for many commanders spread over every color
+identity: build_decks against one shared pool versus calling build_deck
+per brief on the index (timed on a sample and extrapolated).
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_build_decks.py [--cards N]
+        [--commanders N]
+"""
+
+import argparse
+import time
+
+from synthetic import synthetic_index
+
+from mtg_deck_builder.data.card_index import COLOR_BITS
+from mtg_deck_builder.engine.deck_builder import DeckBuilder
+from mtg_deck_builder.engine.deckbrief import DeckBrief
+from mtg_deck_builder.roles.role_engine import RoleEngine
+
+TARGETS = {"ramp": 10, "card_draw": 10, "interaction": 8, "finisher": 3}
+
+
+def commander_briefs(index, n_commanders: int) -> list[DeckBrief]:
+    """One brief per legal nonland card, standing in for commanders."""
+    rows = index.conn.execute(
+        """
+        SELECT c.name, c.ci_mask FROM cards c
+        JOIN card_features cf ON c.scryfall_id = cf.scryfall_id
+        WHERE c.commander_legal AND NOT cf.is_land_only
+        ORDER BY c.rowid LIMIT ?
+        """,
+        [n_commanders],
+    ).fetchall()
+    return [
+        DeckBrief(
+            commander=name,
+            color_identity=[c for c, bit in COLOR_BITS.items() if mask & bit],
+            role_targets=TARGETS,
+        )
+        for name, mask in rows
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cards", type=int, default=30000)
+    parser.add_argument("--commanders", type=int, default=2000)
+    parser.add_argument("--sample", type=int, default=20)
+    args = parser.parse_args()
+
+    index = synthetic_index(args.cards)
+    role_engine = RoleEngine()
+    briefs = commander_briefs(index, args.commanders)
+    builder = DeckBuilder(index, role_engine)
+
+    start = time.perf_counter()
+    results = builder.build_decks(briefs)
+    batch = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for brief in briefs[: args.sample]:
+        builder.build_deck(brief)
+    per_deck = (time.perf_counter() - start) / args.sample
+
+    print(f"{args.cards} synthetic cards, {len(briefs)} commanders")
+    print(
+        f"  build_decks          {batch:8.2f} s   "
+        f"({batch / len(results) * 1000:.2f} ms/deck, pool load included)"
+    )
+    print(
+        f"  build_deck per brief {per_deck * len(briefs):8.2f} s   "
+        f"({per_deck * 1000:.2f} ms/deck, from {args.sample} decks)"
+    )
+
+
+if __name__ == "__main__":
+    main()
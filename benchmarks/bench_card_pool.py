@@ -0,0 +1,62 @@
+"""Benchmark full deck builds against an in-memory CardPool.
+
+Times loading the pool once, then a complete 99-card build against the
+warm pool versus the same build querying DuckDB for every phase.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_card_pool.py [--cards N]
+"""
+
+import argparse
+import time
+
+from synthetic import COLORS, COMMANDER_NAME, synthetic_index
+
+from mtg_deck_builder.engine.card_pool import CardPool
+from mtg_deck_builder.engine.deck_builder import DeckBuilder
+from mtg_deck_builder.engine.deckbrief import DeckBrief
+from mtg_deck_builder.roles.role_engine import RoleEngine
+
+
+def best_build(builder: DeckBuilder, brief: DeckBrief, repeat: int) -> float:
+    """Best wall-clock time of build_deck over several runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        builder.build_deck(brief)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cards", type=int, default=30000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    index = synthetic_index(args.cards)
+    role_engine = RoleEngine()
+    brief = DeckBrief(
+        commander=COMMANDER_NAME,
+        color_identity=COLORS,
+        role_targets={"ramp": 10, "card_draw": 10, "interaction": 8, "finisher": 3},
+    )
+
+    start = time.perf_counter()
+    pool = CardPool.load(index, role_engine)
+    load = time.perf_counter() - start
+
+    queried = best_build(DeckBuilder(index, role_engine), brief, args.repeat)
+    in_memory = best_build(DeckBuilder(index, role_engine, pool), brief, args.repeat)
+
+    print(f"{args.cards} synthetic cards, five-color commander")
+    print(f"  pool load            {load * 1000:8.1f} ms ({len(pool)} cards)")
+    print(f"  build, DuckDB        {queried * 1000:8.2f} ms")
+    print(
+        f"  build, warm pool     {in_memory * 1000:8.2f} ms   "
+        f"({queried / in_memory:.0f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Benchmark feature extraction throughput.
+
+Oracle texts are assembled from real Commander card abilities, so every
+feature pattern sees both matching and non-matching text. The DuckDB engine
+(features.sql) is timed on the same cards loaded into an in-memory index.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_feature_extraction.py [--cards N]
+"""
+
+import argparse
+import random
+import time
+
+from mtg_deck_builder.data.card_index import CARD_COLUMNS, CardIndex
+from mtg_deck_builder.features.extract import extract_features, extract_features_batch
+from mtg_deck_builder.features.sql import extract_features_sql
+
+ABILITIES = [
+    "{T}: Add {C}{C}.",
+    "{T}: Add one mana of any color.",
+    "Flying",
+    "Trample\nHaste",
+    "Search your library for a basic land card, put it onto the battlefield "
+    "tapped, then shuffle.",
+    "Whenever an opponent casts a spell, you may draw a card unless that player "
+    "pays {1}.",
+    "Exile target creature. Its controller gains life equal to its power.",
+    "Destroy all creatures. They can't be regenerated.",
+    "All creatures get -X/-X until end of turn.",
+    "Destroy target artifact or enchantment.",
+    "When this creature enters the battlefield, return target card from your "
+    "graveyard to your hand.",
+    "Permanents you control gain hexproof and indestructible until end of turn.",
+    "Create two 1/1 white Soldier creature tokens.",
+    "Put target creature card from a graveyard onto the battlefield under your "
+    "control.",
+    "If you would draw a card while your library has no cards in it, you win "
+    "the game instead.",
+    "This spell costs {1} less to cast for each creature on the battlefield.",
+    "Equipped creature gets +2/+2 and has vigilance.\nEquip {3}",
+    "At the beginning of your upkeep, each player loses 1 life.",
+    "Counter target spell unless its controller pays {3}.",
+    "Whenever a creature you control dies, each opponent loses 1 life and you "
+    "gain 1 life.",
+]
+
+TYPE_LINES = [
+    "Creature — Elf Druid",
+    "Instant",
+    "Sorcery",
+    "Artifact",
+    "Enchantment — Aura",
+    "Land",
+    "Legendary Planeswalker — Nissa",
+]
+
+
+def synthetic_cards(n_cards: int, seed: int = 0) -> list[dict]:
+    """Normalised cards with one to four abilities each."""
+    rng = random.Random(seed)
+    return [
+        {
+            "oracle_text": "\n".join(rng.sample(ABILITIES, rng.randint(1, 4))),
+            "type_line": rng.choice(TYPE_LINES),
+            "power": rng.choice([None, "1", "3", "6", "*"]),
+            "produced_mana": [] if rng.random() < 0.9 else ["G"],
+        }
+        for _ in range(n_cards)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cards", type=int, default=30000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    cards = synthetic_cards(args.cards)
+    index = CardIndex()
+    index.insert_cards_bulk(
+        [
+            {name: None for name in CARD_COLUMNS}
+            | {"scryfall_id": f"bench-{i}", "name": f"Card {i}", "cmc": 0}
+            | {"commander_legal": True}
+            | card
+            for i, card in enumerate(cards)
+        ]
+    )
+
+    for label, run in [
+        ("extract_features", lambda: [extract_features(card) for card in cards]),
+        ("extract_features_batch", lambda: extract_features_batch(cards)),
+        ("extract_features_sql", lambda: extract_features_sql(index)),
+    ]:
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            run()
+            best = min(best, time.perf_counter() - start)
+        print(f"{label:24} {best * 1000:8.1f} ms   {args.cards / best:10,.0f} cards/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Benchmark the swap optimizer on full-size deck builds.
+
+Builds a five-color deck against a warm pool with the greedy fill and with
+scoring, then times the optimizer pass on each and reports the objective
+gain, the swaps made and the cost per evaluated swap.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_optimizer.py [--cards N]
+"""
+
+import argparse
+import time
+
+from synthetic import COLORS, COMMANDER_NAME, synthetic_index
+
+from mtg_deck_builder.engine.card_pool import CardPool
+from mtg_deck_builder.engine.deck_builder import DeckBuilder
+from mtg_deck_builder.engine.deckbrief import DeckBrief
+from mtg_deck_builder.engine.optimizer import DeckOptimizer
+from mtg_deck_builder.roles.role_engine import RoleEngine
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cards", type=int, default=30000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--budget", type=int, default=250)
+    args = parser.parse_args()
+
+    index = synthetic_index(args.cards)
+    role_engine = RoleEngine()
+    pool = CardPool.load(index, role_engine)
+    brief = DeckBrief(
+        commander=COMMANDER_NAME,
+        color_identity=COLORS,
+        role_targets={"ramp": 10, "card_draw": 10, "interaction": 8, "finisher": 3},
+        soft_budget=args.budget,
+    )
+    optimizer = DeckOptimizer(seed=args.seed)
+
+    print(f"{args.cards} synthetic cards, five-color commander, ${args.budget}")
+    for label, scoring in (("greedy fill", False), ("scored", True)):
+        plain = DeckBuilder(index, role_engine, pool, scoring)
+        start = time.perf_counter()
+        plain.build_deck(brief)
+        build = time.perf_counter() - start
+
+        builder = DeckBuilder(index, role_engine, pool, scoring, optimizer)
+        start = time.perf_counter()
+        result = builder.build_deck(brief)
+        optimized = time.perf_counter() - start
+
+        outcome = result["optimization"]
+        search = optimized - build
+        print(f"  {label}")
+        print(f"    build                {build * 1000:8.2f} ms")
+        print(f"    build + optimize     {optimized * 1000:8.2f} ms")
+        print(
+            f"    objective            {outcome['objective_before']:8.2f} -> "
+            f"{outcome['objective_after']:.2f} ({len(outcome['swaps'])} swaps, "
+            f"{outcome['stopped']})"
+        )
+        print(
+            f"    swaps evaluated      {outcome['iterations']:8d}   "
+            f"(~{search / max(outcome['iterations'], 1) * 1e6:.2f} us each, with setup)"
+        )
+
+
+if __name__ == "__main__":
+    main()
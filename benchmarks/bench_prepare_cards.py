@@ -0,0 +1,63 @@
+"""Benchmark the normalise + extract stage of build_index across workers.
+
+The stage is pure CPU, so throughput should scale with the number of
+worker processes up to the number of cores.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_prepare_cards.py [--cards N]
+        [--workers 1 2 4 8 16]
+"""
+
+import argparse
+import os
+import time
+
+from bench_feature_extraction import synthetic_cards
+
+from mtg_deck_builder.cli import _prepare_cards
+
+
+def scryfall_cards(n_cards: int) -> list[dict]:
+    """Raw Scryfall-shaped card JSON built from synthetic normalised cards."""
+    return [
+        {
+            "id": f"bench-{i}",
+            "name": f"Benchmark Card {i}",
+            "mana_cost": "{2}{G}",
+            "cmc": 3,
+            "colors": ["G"],
+            "color_identity": ["G"],
+            "rarity": "common",
+            "legalities": {"commander": "legal"},
+            "keywords": [],
+            **card,
+        }
+        for i, card in enumerate(synthetic_cards(n_cards))
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cards", type=int, default=30000)
+    parser.add_argument(
+        "--workers", type=int, nargs="+", default=[1, 2, 4, 8, os.cpu_count() or 1]
+    )
+    args = parser.parse_args()
+
+    cards = scryfall_cards(args.cards)
+    print(f"{args.cards} cards, {os.cpu_count()} CPUs")
+    baseline = None
+    for workers in sorted(set(args.workers)):
+        start = time.perf_counter()
+        for _ in _prepare_cards(cards, workers):
+            pass
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(
+            f"  workers={workers:<3} {elapsed * 1000:8.1f} ms   "
+            f"{args.cards / elapsed:10,.0f} cards/s   {baseline / elapsed:5.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Benchmark role candidate selection for a five-color commander.
+
+Compares DeckBuilder._get_role_candidates, which pushes the role predicate
+and limit down into DuckDB (CardIndex.query_role), with the same query over
+materialized card_roles and with the original N+1 pattern (one card_features
+point query per candidate row).
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_role_candidates.py [--cards N]
+"""
+
+import argparse
+import time
+from typing import Any
+
+from synthetic import COLORS, COMMANDER_NAME, synthetic_index
+
+from mtg_deck_builder.engine.deck_builder import DeckBuilder
+from mtg_deck_builder.engine.deckbrief import DeckBrief
+from mtg_deck_builder.roles.materialize import materialize_roles
+from mtg_deck_builder.roles.role_engine import RoleEngine
+
+
+class PointLookupDeckBuilder(DeckBuilder):
+    """DeckBuilder with the per-card feature lookup it used to perform."""
+
+    def _get_role_candidates(
+        self,
+        role_name: str,
+        color_identity: list[str],
+        needed: int,
+        current_deck: list[dict[str, Any]],
+        exclusions: list[str],
+        materialized: bool = False,
+    ) -> list[dict[str, Any]]:
+        placeholders = ",".join("?" * len(current_deck))
+        relation = self.card_index.conn.execute(
+            f"""
+            SELECT c.* FROM cards c
+            JOIN card_features cf ON c.scryfall_id = cf.scryfall_id
+            WHERE c.commander_legal = true
+            AND c.scryfall_id NOT IN ({placeholders})
+            """,
+            [c["scryfall_id"] for c in current_deck],
+        )
+        columns = [col[0] for col in relation.description]
+        all_cards = [dict(zip(columns, row)) for row in relation.fetchall()]
+
+        candidates = []
+        for card in all_cards:
+            feature_relation = self.card_index.conn.execute(
+                "SELECT * FROM card_features WHERE scryfall_id = ?",
+                (card["scryfall_id"],),
+            )
+            feature_cols = [col[0] for col in feature_relation.description]
+            features = {
+                k: bool(v)
+                for k, v in zip(feature_cols, feature_relation.fetchone())
+                if k != "scryfall_id"
+            }
+            if self.role_engine.card_matches_role(features, role_name) and set(
+                card["color_identity"]
+            ).issubset(color_identity):
+                candidates.append(card)
+                if len(candidates) >= needed:
+                    break
+        return candidates
+
+
+def time_build(builder: DeckBuilder, brief: DeckBrief, repeat: int) -> float:
+    """Best wall-clock time of build_deck over several runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        builder.build_deck(brief)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cards", type=int, default=30000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    index = synthetic_index(args.cards)
+    role_engine = RoleEngine()
+    # Large targets so every role scans deep into the candidate pool
+    brief = DeckBrief(
+        commander=COMMANDER_NAME,
+        color_identity=COLORS,
+        role_targets={"ramp": 10, "card_draw": 10, "interaction": 10, "finisher": 5},
+    )
+    # The N+1 path needs roughly one point query per scanned row
+    brief_deep = DeckBrief(
+        commander=COMMANDER_NAME,
+        color_identity=COLORS,
+        role_targets={"finisher": args.cards},
+    )
+
+    print(f"{args.cards} synthetic cards, five-color commander")
+    for label, target in [("typical targets", brief), ("exhaustive scan", brief_deep)]:
+        index.invalidate_roles()
+        joined = time_build(DeckBuilder(index, role_engine), target, args.repeat)
+        materialize_roles(index, role_engine)
+        lookup = time_build(DeckBuilder(index, role_engine), target, args.repeat)
+        point = time_build(PointLookupDeckBuilder(index, role_engine), target, 1)
+        print(
+            f"  {label:16} pushed down {joined * 1000:8.1f} ms   "
+            f"materialized {lookup * 1000:8.1f} ms   "
+            f"N+1 lookups {point * 1000:8.1f} ms   ({point / joined:.0f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Benchmark scoring candidates for each pick of a scored deck build.
+
+Times scoring every candidate of a five-color deck at once (DeckScorer.scores)
+and picking the best one (DeckScorer.best) at each of the spell picks, plus
+a complete scored build against a warm pool.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_scoring.py [--cards N]
+"""
+
+import argparse
+import time
+
+from synthetic import COLORS, COMMANDER_NAME, synthetic_index
+
+from mtg_deck_builder.data.card_index import color_identity_mask
+from mtg_deck_builder.engine.card_pool import CardPool
+from mtg_deck_builder.engine.deck_builder import DeckBuilder
+from mtg_deck_builder.engine.deckbrief import DeckBrief
+from mtg_deck_builder.engine.scoring import DeckScorer
+from mtg_deck_builder.roles.role_engine import RoleEngine
+
+ROLE_TARGETS = {"ramp": 10, "card_draw": 10, "interaction": 8, "finisher": 3}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cards", type=int, default=30000)
+    parser.add_argument("--picks", type=int, default=62)
+    parser.add_argument("--budget", type=int, default=250)
+    args = parser.parse_args()
+
+    index = synthetic_index(args.cards)
+    role_engine = RoleEngine()
+    pool = CardPool.load(index, role_engine)
+    candidates = pool.candidates(color_identity_mask(COLORS), land=False)
+
+    start = time.perf_counter()
+    scorer = DeckScorer(
+        pool, candidates, ROLE_TARGETS, args.picks, soft_budget=args.budget
+    )
+    setup = time.perf_counter() - start
+
+    full = picks = 0.0
+    for _ in range(args.picks):
+        start = time.perf_counter()
+        scorer.scores()
+        full += time.perf_counter() - start
+
+        start = time.perf_counter()
+        best = scorer.best()
+        scorer.add(best)
+        picks += time.perf_counter() - start
+
+    brief = DeckBrief(
+        commander=COMMANDER_NAME,
+        color_identity=COLORS,
+        role_targets=ROLE_TARGETS,
+        soft_budget=args.budget,
+    )
+    builder = DeckBuilder(index, role_engine, pool, scoring=True)
+    start = time.perf_counter()
+    builder.build_deck(brief)
+    build = time.perf_counter() - start
+
+    print(f"{args.cards} synthetic cards, {len(candidates)} candidate spells")
+    print(f"  scorer setup             {setup * 1000:8.2f} ms")
+    print(f"  score all, per pick      {full / args.picks * 1000:8.2f} ms")
+    print(f"  best + add, per pick     {picks / args.picks * 1000:8.3f} ms")
+    print(f"  scored build, warm pool  {build * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
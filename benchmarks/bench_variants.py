@@ -0,0 +1,60 @@
+"""Benchmark deck variant generation against repeated builds.
+
+Builds K variants of a five-color deck with build_deck_variants, which sets
+up the commander, lands and scorer once, and compares it with K scored
+build_deck calls whose exclusions are edited by hand between builds.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_variants.py [--cards N] [-k K]
+"""
+
+import argparse
+import dataclasses
+import time
+
+from synthetic import COLORS, COMMANDER_NAME, synthetic_index
+
+from mtg_deck_builder.engine.card_pool import CardPool
+from mtg_deck_builder.engine.deck_builder import VARIANT_DROP, DeckBuilder
+from mtg_deck_builder.engine.deckbrief import DeckBrief
+from mtg_deck_builder.roles.role_engine import RoleEngine
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cards", type=int, default=30000)
+    parser.add_argument("-k", type=int, default=10)
+    args = parser.parse_args()
+
+    index = synthetic_index(args.cards)
+    role_engine = RoleEngine()
+    pool = CardPool.load(index, role_engine)
+    brief = DeckBrief(
+        commander=COMMANDER_NAME,
+        color_identity=COLORS,
+        role_targets={"ramp": 10, "card_draw": 10, "interaction": 8, "finisher": 3},
+        soft_budget=250,
+    )
+    builder = DeckBuilder(index, role_engine, pool, scoring=True)
+    builder.build_deck(brief)
+
+    start = time.perf_counter()
+    exclusions: list[str] = []
+    for _ in range(args.k):
+        result = builder.build_deck(dataclasses.replace(brief, exclusions=exclusions))
+        marginal = sorted(result["scores"], key=lambda entry: entry["score"])
+        exclusions = exclusions + [entry["name"] for entry in marginal[:VARIANT_DROP]]
+    repeated = time.perf_counter() - start
+
+    start = time.perf_counter()
+    variants = builder.build_deck_variants(brief, args.k)
+    shared = time.perf_counter() - start
+
+    distinct = len({frozenset(c["name"] for c in v["deck"]) for v in variants})
+    print(f"{args.cards} synthetic cards, {args.k} variants of a five-color deck")
+    print(f"  build_deck x {args.k}        {repeated * 1000:8.2f} ms")
+    print(f"  build_deck_variants    {shared * 1000:8.2f} ms   ({distinct} distinct)")
+
+
+if __name__ == "__main__":
+    main()
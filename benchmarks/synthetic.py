@@ -0,0 +1,116 @@
+"""Synthetic card indexes for benchmarks.
+
+Cards are generated deterministically from a seed, with feature rates
+roughly matching the Commander-legal card pool, so timings are comparable
+between runs without network access or a Scryfall bulk file.
+"""
+
+import random
+from itertools import combinations
+from pathlib import Path
+
+from mtg_deck_builder.data.card_index import FEATURE_NAMES, CardIndex
+
+COLORS = ["W", "U", "B", "R", "G"]
+
+# Probability that a generated card has each feature
+FEATURE_RATES = {
+    "produces_mana": 0.12,
+    "draws_cards": 0.15,
+    "removes_creature": 0.10,
+    "removes_noncreature": 0.06,
+    "is_board_wipe": 0.02,
+    "is_tutor": 0.03,
+    "creates_tokens": 0.12,
+    "is_finisher": 0.04,
+    "protects_board": 0.05,
+    "recurs_from_graveyard": 0.06,
+    "is_land_only": 0.08,
+}
+
+COMMANDER_NAME = "Benchmark Commander"
+
+
+def synthetic_cards(
+    n_cards: int, seed: int = 0
+) -> tuple[list[dict], list[dict[str, object]]]:
+    """Generate normalised cards and matching feature rows.
+
+    The first card is a five-color legendary commander named COMMANDER_NAME.
+
+    Args:
+        n_cards: Number of cards to generate (including the commander)
+        seed: Random seed
+
+    Returns:
+        (cards, feature rows) ready for CardIndex bulk inserts
+    """
+    rng = random.Random(seed)
+    # Prices draw from their own stream so the other columns do not depend
+    # on them; most cards are cheap, with a long tail of expensive ones
+    price_rng = random.Random(f"{seed}-prices")
+    identities = [
+        list(combo) for size in range(6) for combo in combinations(COLORS, size)
+    ]
+
+    cards = [
+        {
+            "scryfall_id": "bench-commander",
+            "name": COMMANDER_NAME,
+            "mana_cost": "{W}{U}{B}{R}{G}",
+            "cmc": 5,
+            "type_line": "Legendary Creature — Avatar",
+            "oracle_text": "Flying",
+            "colors": COLORS,
+            "color_identity": COLORS,
+            "rarity": "mythic",
+            "commander_legal": True,
+            "power": "5",
+            "toughness": "5",
+            "keywords": ["Flying"],
+            "produced_mana": [],
+            "price_usd": 12.0,
+        }
+    ]
+    features: list[dict[str, object]] = [{"scryfall_id": "bench-commander"}]
+
+    for i in range(1, n_cards):
+        identity = rng.choice(identities)
+        row: dict[str, object] = {
+            name: rng.random() < FEATURE_RATES[name] for name in FEATURE_NAMES
+        }
+        is_land = bool(row["is_land_only"])
+        cards.append(
+            {
+                "scryfall_id": f"bench-{i}",
+                "name": f"Benchmark Card {i}",
+                "mana_cost": "" if is_land else "{2}",
+                "cmc": 0 if is_land else rng.randint(1, 7),
+                "type_line": "Land" if is_land else "Creature — Construct",
+                "oracle_text": "",
+                "colors": [] if is_land else identity,
+                "color_identity": identity,
+                "rarity": rng.choice(["common", "uncommon", "rare", "mythic"]),
+                "commander_legal": rng.random() < 0.97,
+                "power": None,
+                "toughness": None,
+                "keywords": [],
+                "produced_mana": identity if row["produces_mana"] else [],
+                "price_usd": round(price_rng.lognormvariate(-0.5, 1.5), 2),
+            }
+        )
+        row["scryfall_id"] = f"bench-{i}"
+        features.append(row)
+
+    return cards, features
+
+
+def synthetic_index(
+    n_cards: int, seed: int = 0, db_path: Path | str = ":memory:"
+) -> CardIndex:
+    """Build a CardIndex filled with synthetic cards (see synthetic_cards)."""
+    cards, features = synthetic_cards(n_cards, seed)
+    index = CardIndex(db_path)
+    index.insert_cards_bulk(cards)
+    index.insert_features_bulk(features)
+    return index
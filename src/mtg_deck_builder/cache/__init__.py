@@ -1,6 +1,16 @@
-"""SQLite cache for Scryfall API responses."""
+"""SQLite caches for Scryfall API responses and deck build results."""
 
-from .scryfall_cache import ScryfallCache
+from .build_cache import BuildCache, build_key
+from .rate_limiter import RateLimiter
+from .scryfall_cache import CacheEntry, FreshnessPolicy, ScryfallCache
 from .scryfall_client import ScryfallClient
 
-__all__ = ["ScryfallCache", "ScryfallClient"]
+__all__ = [
+    "BuildCache",
+    "CacheEntry",
+    "FreshnessPolicy",
+    "RateLimiter",
+    "ScryfallCache",
+    "ScryfallClient",
+    "build_key",
+]
@@ -0,0 +1,173 @@
+"""SQLite cache of deck build results.
+
+Results are content-addressed: the key is a hash of everything a build
+depends on (see build_key), i.e. the index snapshot ID, the role definition
+fingerprints, the builder options and the canonical brief. Rebuilding the
+index renews its snapshot ID, so results of the old index are never served
+again; they are dropped on the next write.
+
+The cache keeps at most ``max_entries`` results and evicts the least
+recently used ones first.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import zlib
+from pathlib import Path
+from typing import Any
+
+# Bumped whenever the table layout changes (stored in PRAGMA user_version)
+SCHEMA_VERSION = 1
+
+
+def build_key(**parts: Any) -> str:
+    """Content address of a build: SHA-256 of its inputs as canonical JSON.
+
+    Args:
+        **parts: JSON-serialisable build inputs, e.g. snapshot, roles,
+            options and brief
+
+    Returns:
+        Hex digest
+    """
+    payload = json.dumps(parts, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class BuildCache:
+    """LRU cache of build results in a small SQLite table."""
+
+    def __init__(self, db_path: Path | str = "build_cache.db", max_entries: int = 256):
+        """Open (and create if needed) the cache database.
+
+        Args:
+            db_path: Path to the SQLite database file, or ":memory:"
+            max_entries: Most results kept
+
+        Raises:
+            ValueError: If max_entries is below 1
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        # One connection shared by threads (e.g. Streamlit reruns), one
+        # statement sequence at a time
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(
+            db_path, isolation_level=None, check_same_thread=False
+        )
+        self.conn.execute("PRAGMA busy_timeout = 5000")
+        if str(db_path) != ":memory:":
+            self.conn.execute("PRAGMA journal_mode = WAL")
+        self._init_db()
+
+    def __enter__(self) -> "BuildCache":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _init_db(self) -> None:
+        """Create the results table if it doesn't exist."""
+        with self._lock:
+            version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+            if version < 1:
+                # last_used orders entries by their latest get or put
+                self.conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS build_results (
+                        key TEXT PRIMARY KEY,
+                        snapshot TEXT NOT NULL,
+                        result BLOB NOT NULL,
+                        last_used INTEGER NOT NULL
+                    )
+                    """
+                )
+                self.conn.execute(
+                    "CREATE INDEX IF NOT EXISTS build_results_last_used "
+                    "ON build_results (last_used)"
+                )
+            self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """Stored result for a key, marked as most recently used.
+
+        Returns:
+            A fresh copy of the result, or None on a miss
+        """
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT result FROM build_results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.conn.execute(
+                """
+                UPDATE build_results
+                SET last_used = (SELECT MAX(last_used) FROM build_results) + 1
+                WHERE key = ?
+                """,
+                (key,),
+            )
+            self.hits += 1
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, key: str, snapshot: str, result: dict[str, Any]) -> None:
+        """Store a result, dropping results of other index snapshots and the
+        least recently used ones beyond max_entries.
+
+        Args:
+            key: build_key of the result's inputs
+            snapshot: Snapshot ID of the index it was built from
+            result: JSON-serialisable build result (other values are stored
+                as strings)
+        """
+        raw = json.dumps(result, separators=(",", ":"), default=str)
+        blob = zlib.compress(raw.encode("utf-8"), 6)
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self.conn.execute(
+                    "DELETE FROM build_results WHERE snapshot != ?", (snapshot,)
+                )
+                self.conn.execute(
+                    """
+                    INSERT OR REPLACE INTO build_results
+                    SELECT ?, ?, ?, COALESCE(MAX(last_used), 0) + 1
+                    FROM build_results
+                    """,
+                    (key, snapshot, blob),
+                )
+                self.conn.execute(
+                    """
+                    DELETE FROM build_results WHERE key NOT IN (
+                        SELECT key FROM build_results
+                        ORDER BY last_used DESC LIMIT ?
+                    )
+                    """,
+                    (self.max_entries,),
+                )
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            else:
+                self.conn.execute("COMMIT")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM build_results").fetchone()[0]
+
+    def clear(self) -> None:
+        """Remove every stored result."""
+        with self._lock:
+            self.conn.execute("DELETE FROM build_results")
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self.conn.close()
@@ -0,0 +1,71 @@
+"""Thread-safe token-bucket rate limiter for outgoing API requests."""
+
+import threading
+import time
+from collections.abc import Callable
+
+
+class RateLimiter:
+    """Token bucket shared by every thread issuing requests.
+
+    Tokens refill continuously at ``rate`` per second up to ``burst``; each
+    request consumes one token and waits until one is available.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """Initialize the limiter.
+
+        Args:
+            rate: Sustained requests per second
+            burst: Maximum number of requests allowed back to back
+            clock: Monotonic time source (injectable for tests)
+            sleep: Sleep function (injectable for tests)
+
+        Raises:
+            ValueError: If rate or burst is not positive
+        """
+        if rate <= 0 or burst < 1:
+            raise ValueError("Rate limiter needs rate > 0 and burst >= 1")
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take one token, blocking until it is available.
+
+        Returns:
+            Seconds spent waiting
+        """
+        with self._lock:
+            self._refill()
+            # Reserve the token now so concurrent callers queue up behind us
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every caller for ``seconds`` from now (e.g. after a 429)."""
+        with self._lock:
+            # Refill up to now first, so the time before the pause cannot pay
+            # off part of it
+            self._refill()
+            self._tokens = min(self._tokens, 0.0) - seconds * self.rate
+
+    def _refill(self) -> None:
+        """Add the tokens earned since the last update (caller holds the lock)."""
+        now = self._clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
@@ -1,98 +1,341 @@
 """SQLite cache for Scryfall API responses.
 
 Purpose: stability + offline builds
-- Stores: query, page, response JSON, fetched_at
+- Stores: query, page, codec, response body, fetched_at, HTTP validators
 - Supports: read-through, offline mode
+
+Response bodies are stored as compressed BLOBs; the per-row ``codec`` column
+records how each body was encoded so rows written by older versions (plain
+JSON text) still read back.
+
+Each thread holds one long-lived connection in WAL mode, so readers never
+block the writer (and vice versa) and a full index build does not pay a
+connect/commit cycle per page.
+
+How long a cached page may be served is decided by a FreshnessPolicy
+applied to its ``fetched_at`` age.
 """
 
 import json
+import lzma
 import sqlite3
+import threading
+import zlib
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
+
+# codec name -> (encode, decode) between serialised JSON bytes and stored value
+CODECS: dict[str, tuple[Callable[[bytes], Any], Callable[[Any], bytes]]] = {
+    "json": (
+        lambda raw: raw.decode("utf-8"),
+        lambda stored: stored if isinstance(stored, bytes) else stored.encode(),
+    ),
+    "zlib": (lambda raw: zlib.compress(raw, 6), zlib.decompress),
+    "lzma": (lzma.compress, lzma.decompress),
+}
+
+# Bumped whenever the cache table layout changes (stored in PRAGMA user_version)
+SCHEMA_VERSION = 2
+
+
+@dataclass(frozen=True)
+class FreshnessPolicy:
+    """How long cached responses may be served.
+
+    Attributes:
+        ttl: Seconds a response is served as-is. Older responses are stale:
+            still served, but revalidated in the background. None means
+            responses never go stale.
+        max_age: Seconds after which a response is expired and must be
+            refetched before it can be served. None means never.
+    """
+
+    ttl: float | None = None
+    max_age: float | None = None
+
+    def state(self, age: float) -> str:
+        """Classify a response of the given age as fresh, stale or expired."""
+        if self.max_age is not None and age >= self.max_age:
+            return "expired"
+        if self.ttl is not None and age >= self.ttl:
+            return "stale"
+        return "fresh"
+
+
+@dataclass
+class CacheEntry:
+    """A cached response together with its bookkeeping columns."""
+
+    response: dict[str, Any]
+    fetched_at: datetime
+    etag: str | None = None
+    last_modified: str | None = None
+
+    @property
+    def age(self) -> float:
+        """Seconds since the response was fetched or last revalidated."""
+        return (datetime.now(timezone.utc) - self.fetched_at).total_seconds()
 
 
 class ScryfallCache:
     """SQLite-based cache for Scryfall API responses."""
 
-    def __init__(self, db_path: Path | str = "scryfall_cache.db"):
-        """Initialize the cache database."""
+    # Applied to every connection when it is opened
+    PRAGMAS = {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    }
+
+    def __init__(self, db_path: Path | str = "scryfall_cache.db", codec: str = "zlib"):
+        """Initialize the cache database.
+
+        Args:
+            db_path: Path to the SQLite database file
+            codec: Codec used for newly written responses ("zlib", "lzma" or
+                "json" for uncompressed text)
+
+        Raises:
+            ValueError: If the codec is unknown
+        """
+        if codec not in CODECS:
+            raise ValueError(
+                f"Unknown cache codec '{codec}' (expected one of {sorted(CODECS)})"
+            )
         self.db_path = Path(db_path)
+        self.codec = codec
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
         self._init_db()
 
+    def __enter__(self) -> "ScryfallCache":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
     @property
-    def conn(self):
-        """Get a database connection."""
-        return sqlite3.connect(self.db_path)
+    def conn(self) -> sqlite3.Connection:
+        """Get this thread's database connection (opened on first use)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            self._local.depth = 0
+        return conn
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection with the cache pragmas applied."""
+        # Transactions are managed explicitly in transaction(); the connection
+        # is only used by its owning thread but may be closed from another.
+        conn = sqlite3.connect(
+            self.db_path, isolation_level=None, check_same_thread=False
+        )
+        conn.row_factory = sqlite3.Row
+        for name, value in self.PRAGMAS.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        with self._connections_lock:
+            self._connections.append(conn)
+        return conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run a block of writes as a single transaction.
+
+        Nested calls join the outermost transaction, so wrapping a loop of
+        ``set`` calls commits once instead of once per page. The write lock
+        is taken up front (``BEGIN IMMEDIATE``); in WAL mode readers on
+        other connections keep seeing the last committed state meanwhile.
+        """
+        conn = self.conn
+        if self._local.depth:
+            self._local.depth += 1
+            try:
+                yield conn
+            finally:
+                self._local.depth -= 1
+            return
+
+        conn.execute("BEGIN IMMEDIATE")
+        self._local.depth = 1
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+        finally:
+            self._local.depth = 0
 
     def _init_db(self) -> None:
-        """Create the cache table if it doesn't exist."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS cache (
-                    query TEXT NOT NULL,
-                    page INTEGER NOT NULL DEFAULT 1,
-                    response_json TEXT NOT NULL,
-                    fetched_at TIMESTAMP NOT NULL,
-                    PRIMARY KEY (query, page)
+        """Create the cache table if it doesn't exist, migrating old layouts."""
+        with self.transaction() as conn:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version < 1:
+                legacy = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type='table' AND name='cache'"
+                ).fetchone()
+                if legacy:
+                    conn.execute("ALTER TABLE cache RENAME TO cache_v0")
+                conn.execute(
+                    """
+                    CREATE TABLE cache (
+                        query TEXT NOT NULL,
+                        page INTEGER NOT NULL DEFAULT 1,
+                        codec TEXT NOT NULL DEFAULT 'json',
+                        response BLOB NOT NULL,
+                        fetched_at TIMESTAMP NOT NULL,
+                        PRIMARY KEY (query, page)
+                    )
+                    """
                 )
-                """
-            )
-            conn.commit()
+                if legacy:
+                    conn.execute(
+                        """
+                        INSERT INTO cache (query, page, codec, response, fetched_at)
+                        SELECT query, page, 'json', response_json, fetched_at
+                        FROM cache_v0
+                        """
+                    )
+                    conn.execute("DROP TABLE cache_v0")
+                    self.recompress()
+            if version < 2:
+                # ETag / Last-Modified of the response, for conditional refreshes
+                conn.execute("ALTER TABLE cache ADD COLUMN etag TEXT")
+                conn.execute("ALTER TABLE cache ADD COLUMN last_modified TEXT")
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
 
-    def _init_db(self) -> None:
-        """Create the cache table if it doesn't exist."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS cache (
-                    query TEXT NOT NULL,
-                    page INTEGER NOT NULL DEFAULT 1,
-                    response_json TEXT NOT NULL,
-                    fetched_at TIMESTAMP NOT NULL,
-                    PRIMARY KEY (query, page)
+    def _encode(self, response: dict[str, Any]) -> Any:
+        """Serialise a response with the cache codec."""
+        raw = json.dumps(response, separators=(",", ":")).encode("utf-8")
+        return CODECS[self.codec][0](raw)
+
+    @staticmethod
+    def _decode(codec: str, stored: Any) -> dict[str, Any]:
+        """Deserialise a stored response written with the given codec."""
+        return json.loads(CODECS[codec][1](stored))
+
+    def recompress(self) -> int:
+        """Re-encode every row not already stored with the cache codec.
+
+        Returns:
+            Number of rows rewritten
+        """
+        with self.transaction() as conn:
+            rows = conn.execute(
+                "SELECT query, page, codec, response FROM cache WHERE codec != ?",
+                (self.codec,),
+            ).fetchall()
+            for row in rows:
+                response = self._decode(row["codec"], row["response"])
+                conn.execute(
+                    """
+                    UPDATE cache SET codec = ?, response = ?
+                    WHERE query = ? AND page = ?
+                    """,
+                    (self.codec, self._encode(response), row["query"], row["page"]),
                 )
-                """
-            )
-            conn.commit()
+        return len(rows)
 
     def get(self, query: str, page: int = 1) -> dict[str, Any] | None:
         """Retrieve a cached response."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.execute(
-                "SELECT response_json FROM cache WHERE query = ? AND page = ?",
-                (query, page),
-            )
-            row = cursor.fetchone()
-            if row:
-                return json.loads(row["response_json"])
+        row = self.conn.execute(
+            "SELECT codec, response FROM cache WHERE query = ? AND page = ?",
+            (query, page),
+        ).fetchone()
+        if row:
+            return self._decode(row["codec"], row["response"])
+        return None
+
+    def get_entry(self, query: str, page: int = 1) -> CacheEntry | None:
+        """Retrieve a cached response with its fetch time and validators."""
+        row = self.conn.execute(
+            """
+            SELECT codec, response, fetched_at, etag, last_modified
+            FROM cache WHERE query = ? AND page = ?
+            """,
+            (query, page),
+        ).fetchone()
+        if not row:
             return None
+        fetched_at = datetime.fromisoformat(row["fetched_at"])
+        if fetched_at.tzinfo is None:
+            fetched_at = fetched_at.replace(tzinfo=timezone.utc)
+        return CacheEntry(
+            response=self._decode(row["codec"], row["response"]),
+            fetched_at=fetched_at,
+            etag=row["etag"],
+            last_modified=row["last_modified"],
+        )
+
+    def get_validators(
+        self, query: str, page: int = 1
+    ) -> tuple[str | None, str | None] | None:
+        """Retrieve the (ETag, Last-Modified) stored with a cached response."""
+        row = self.conn.execute(
+            "SELECT etag, last_modified FROM cache WHERE query = ? AND page = ?",
+            (query, page),
+        ).fetchone()
+        if row:
+            return row["etag"], row["last_modified"]
+        return None
 
     def put(self, query: str, data: dict[str, Any]) -> None:
         """Store a response in the cache."""
         self.set(query, data, page=1)
 
-    def set(self, query: str, response: dict[str, Any], page: int = 1) -> None:
-        """Store a response in the cache."""
-        with sqlite3.connect(self.db_path) as conn:
+    def set(
+        self,
+        query: str,
+        response: dict[str, Any],
+        page: int = 1,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> None:
+        """Store a response in the cache, with its HTTP validators if known."""
+        with self.transaction() as conn:
             conn.execute(
                 """
-                INSERT OR REPLACE INTO cache (query, page, response_json, fetched_at)
-                VALUES (?, ?, ?, ?)
+                INSERT OR REPLACE INTO cache (
+                    query, page, codec, response, fetched_at, etag, last_modified
+                ) VALUES (?, ?, ?, ?, ?, ?, ?)
                 """,
                 (
                     query,
                     page,
-                    json.dumps(response),
+                    self.codec,
+                    self._encode(response),
                     datetime.now(timezone.utc).isoformat(),
+                    etag,
+                    last_modified,
                 ),
             )
-            conn.commit()
+
+    def touch(self, query: str, page: int = 1) -> None:
+        """Mark a cached response as freshly revalidated (e.g. after a 304)."""
+        with self.transaction() as conn:
+            conn.execute(
+                "UPDATE cache SET fetched_at = ? WHERE query = ? AND page = ?",
+                (datetime.now(timezone.utc).isoformat(), query, page),
+            )
 
     def clear(self) -> None:
         """Clear all cached entries."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.transaction() as conn:
             conn.execute("DELETE FROM cache")
-            conn.commit()
+
+    def close(self) -> None:
+        """Close every connection opened by this cache."""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
@@ -1,9 +1,22 @@
 """Scryfall API client with caching."""
 
+import logging
+import math
 import requests
+import threading
+import time
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
 from typing import Any
 
-from .scryfall_cache import ScryfallCache
+from requests.adapters import HTTPAdapter
+
+from .rate_limiter import RateLimiter
+from .scryfall_cache import FreshnessPolicy, ScryfallCache
+
+logger = logging.getLogger(__name__)
 
 
 class ScryfallClient:
@@ -11,24 +24,74 @@ class ScryfallClient:
 
     BASE_URL = "https://api.scryfall.com"
 
-    def __init__(self, cache: ScryfallCache | None = None):
+    # Scryfall asks for 50-100 ms between requests
+    REQUESTS_PER_SECOND = 10.0
+
+    def __init__(
+        self,
+        cache: ScryfallCache | None = None,
+        base_url: str | None = None,
+        rate_limiter: RateLimiter | None = None,
+        max_retries: int = 3,
+        policy: FreshnessPolicy | None = None,
+    ):
         """Initialize the client.
 
         Args:
             cache: Optional ScryfallCache instance. If None, creates default cache.
+            base_url: API root (defaults to the public Scryfall API)
+            rate_limiter: Limiter shared by every request this client makes.
+                If None, allows REQUESTS_PER_SECOND.
+            max_retries: Retries for a request answered with 429 Too Many Requests
+            policy: Freshness policy for cached pages. If None, cached pages
+                never go stale.
         """
         self.cache = cache or ScryfallCache()
-        self.base_url = self.BASE_URL
+        self.base_url = base_url or self.BASE_URL
+        self.rate_limiter = rate_limiter or RateLimiter(self.REQUESTS_PER_SECOND)
+        self.max_retries = max_retries
+        self.policy = policy or FreshnessPolicy()
+
+        # Background revalidation of stale pages (created on first use)
+        self._revalidator: ThreadPoolExecutor | None = None
+        self._revalidating: dict[tuple[str, int], Future[dict[str, Any]]] = {}
+        self._revalidating_lock = threading.Lock()
+
+        # Page fetch threads shared by every iter_pages call (created on
+        # first use, grown when a call asks for more workers). Reusing them
+        # keeps one cache connection per thread instead of one per call.
+        self._fetcher: ThreadPoolExecutor | None = None
+        self._fetcher_workers = 0
+        self._fetcher_lock = threading.Lock()
+
+        # One keep-alive pool shared by every page (and every fetch thread)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=16)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
 
     def search_cards(
-        self, query: str, page: int = 1, use_cache: bool = True
+        self,
+        query: str,
+        page: int = 1,
+        use_cache: bool = True,
+        refresh: bool = False,
     ) -> dict[str, Any]:
         """Search for cards using Scryfall API.
 
+        Cached pages are served according to the client's freshness policy:
+        fresh pages directly, stale pages directly while a background thread
+        revalidates them, and expired pages only after a (conditional)
+        refetch.
+
         Args:
             query: Scryfall search query
             page: Page number (default 1)
             use_cache: Whether to use cache (default True)
+            refresh: Revalidate a cached page with the server instead of
+                returning it directly. The request is conditional on the
+                stored ETag / Last-Modified, so an unchanged page costs a
+                304 and is not rewritten.
 
         Returns:
             Scryfall API response JSON
@@ -36,15 +99,28 @@ class ScryfallClient:
         cache_key = f"search:{query}"
 
         # Try cache first
-        if use_cache:
-            cached = self.cache.get(cache_key, page)
-            if cached:
-                return cached
+        headers: dict[str, str] = {}
+        entry = self.cache.get_entry(cache_key, page) if use_cache else None
+        if entry:
+            if not refresh:
+                state = self.policy.state(entry.age)
+                if state == "stale":
+                    self._revalidate_in_background(query, page)
+                if state != "expired":
+                    return entry.response
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
 
         # Fetch from API
-        url = f"{self.BASE_URL}/cards/search"
+        url = f"{self.base_url}/cards/search"
         params = {"q": query, "page": page}
-        response = requests.get(url, params=params, timeout=30)
+        response = self._request(url, params, headers)
+        if response.status_code == 304 and entry:
+            # Unchanged since we cached it
+            self.cache.touch(cache_key, page)
+            return entry.response
         if response.status_code == 404:
             # No results found
             data = {"data": [], "has_more": False}
@@ -54,36 +130,211 @@ class ScryfallClient:
 
         # Cache the response
         if use_cache:
-            self.cache.set(cache_key, data, page)
+            self.cache.set(
+                cache_key,
+                data,
+                page,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+            )
 
         return data
 
+    def _revalidate_in_background(self, query: str, page: int) -> None:
+        """Queue a conditional refresh of a stale page (at most one per page)."""
+        key = (query, page)
+        with self._revalidating_lock:
+            if key in self._revalidating:
+                return
+            if self._revalidator is None:
+                self._revalidator = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="scryfall-revalidate"
+                )
+            future = self._revalidator.submit(
+                self.search_cards, query, page, True, True
+            )
+            self._revalidating[key] = future
+
+        def done(future: Future[dict[str, Any]]) -> None:
+            if not future.cancelled() and future.exception():
+                # The stale copy stays in the cache; retried on next access
+                logger.warning(
+                    "Background refresh of %r page %d failed: %s",
+                    query,
+                    page,
+                    future.exception(),
+                )
+            # Unregistered last, so wait_for_revalidation also waits for this
+            with self._revalidating_lock:
+                self._revalidating.pop(key, None)
+
+        future.add_done_callback(done)
+
+    def wait_for_revalidation(self) -> None:
+        """Block until every queued background revalidation has finished."""
+        while True:
+            with self._revalidating_lock:
+                pending = list(self._revalidating.values())
+            if not pending:
+                return
+            for future in pending:
+                try:
+                    future.result()
+                except Exception:
+                    pass
+
+    def close(self) -> None:
+        """Finish background revalidations and release the HTTP session."""
+        self.wait_for_revalidation()
+        if self._revalidator is not None:
+            self._revalidator.shutdown()
+            self._revalidator = None
+        with self._fetcher_lock:
+            if self._fetcher is not None:
+                self._fetcher.shutdown()
+                self._fetcher = None
+                self._fetcher_workers = 0
+        self.session.close()
+
+    def _request(
+        self, url: str, params: dict[str, Any], headers: dict[str, str] | None = None
+    ) -> requests.Response:
+        """Issue a rate-limited GET, backing off on 429 Too Many Requests."""
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire()
+            response = self.session.get(url, params=params, headers=headers, timeout=30)
+            if response.status_code != 429 or attempt >= self.max_retries:
+                return response
+            attempt += 1
+            # Hold back every thread sharing the limiter, not just this one
+            self.rate_limiter.pause(self._retry_after(response))
+
+    @staticmethod
+    def _retry_after(response: requests.Response) -> float:
+        """Seconds to wait before retrying, from the Retry-After header."""
+        value = response.headers.get("Retry-After")
+        if value is None:
+            return 1.0
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return 1.0
+
+    def _fetch_pool(self, workers: int) -> ThreadPoolExecutor:
+        """The shared page fetch executor, with at least ``workers`` threads."""
+        with self._fetcher_lock:
+            if self._fetcher is None or self._fetcher_workers < workers:
+                if self._fetcher is not None:
+                    self._fetcher.shutdown(wait=False)
+                self._fetcher = ThreadPoolExecutor(
+                    max_workers=workers, thread_name_prefix="scryfall-fetch"
+                )
+                self._fetcher_workers = workers
+            return self._fetcher
+
     def _get_page(self, query: str, page: int):
         """Get a single page of search results."""
         return self.search_cards(query, page)["data"]
 
+    def iter_pages(
+        self,
+        query: str = "is:commander",
+        use_cache: bool = True,
+        workers: int = 1,
+        refresh: bool = False,
+    ) -> Iterator[list[dict[str, Any]]]:
+        """Yield the card list of each result page in order.
+
+        Pages are fetched lazily, so only the current page (plus at most
+        ``2 * workers`` prefetched pages) is held in memory.
+
+        Args:
+            query: Scryfall search query
+            use_cache: Whether to use cache
+            workers: Number of pages fetched concurrently. With more than one
+                worker, the page count is derived from the first page's
+                ``total_cards`` and the remaining pages are fetched in a
+                thread pool; the shared rate limiter still applies.
+            refresh: Conditionally revalidate cached pages (see search_cards)
+
+        Yields:
+            List of card objects for one page
+        """
+        response = self.search_cards(query, 1, use_cache, refresh)
+        yield response.get("data", [])
+        page = 2
+
+        total_cards = response.get("total_cards")
+        page_size = len(response.get("data", []))
+        if workers > 1 and response.get("has_more", False) and total_cards:
+            last_page = math.ceil(total_cards / page_size)
+            pending: deque[Future[dict[str, Any]]] = deque()
+            pool = self._fetch_pool(workers)
+            try:
+                while page <= last_page or pending:
+                    while page <= last_page and len(pending) < 2 * workers:
+                        pending.append(
+                            pool.submit(
+                                self.search_cards, query, page, use_cache, refresh
+                            )
+                        )
+                        page += 1
+                    response = pending.popleft().result()
+                    yield response.get("data", [])
+            finally:
+                for future in pending:
+                    future.cancel()
+
+        # Sequential pagination (also picks up pages beyond a stale total_cards)
+        while response.get("has_more", False):
+            response = self.search_cards(query, page, use_cache, refresh)
+            yield response.get("data", [])
+            page += 1
+
+    def iter_cards(
+        self,
+        query: str = "is:commander",
+        use_cache: bool = True,
+        workers: int = 1,
+        refresh: bool = False,
+    ) -> Iterator[dict[str, Any]]:
+        """Yield every card matching a query, one page at a time.
+
+        Args:
+            query: Scryfall search query
+            use_cache: Whether to use cache
+            workers: Number of pages fetched concurrently (see iter_pages)
+            refresh: Conditionally revalidate cached pages (see search_cards)
+
+        Yields:
+            Card objects in result order
+        """
+        for cards in self.iter_pages(query, use_cache, workers, refresh):
+            yield from cards
+
     def get_all_cards(
-        self, query: str = "is:commander", use_cache: bool = True
+        self,
+        query: str = "is:commander",
+        use_cache: bool = True,
+        workers: int = 1,
+        refresh: bool = False,
     ) -> list[dict[str, Any]]:
         """Get all cards matching a query (handles pagination).
 
+        Prefer iter_cards() for large queries; this materialises every page.
+
         Args:
             query: Scryfall search query
             use_cache: Whether to use cache
+            workers: Number of pages fetched concurrently (see iter_pages)
+            refresh: Conditionally revalidate cached pages (see search_cards)
 
         Returns:
             List of all card objects
         """
-        all_cards = []
-        page = 1
-        has_more = True
-
-        while has_more:
-            response = self.search_cards(query, page=page, use_cache=use_cache)
-            cards = response.get("data", [])
-            all_cards.extend(cards)
-
-            has_more = response.get("has_more", False)
-            page += 1
-
-        return all_cards
+        return list(self.iter_cards(query, use_cache, workers, refresh))
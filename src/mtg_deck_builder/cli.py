@@ -1,22 +1,48 @@
 """CLI entry point for MTG Deck Builder."""
 
 import json
+import multiprocessing
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
 from pathlib import Path
+from typing import Any
 
-from .cache.scryfall_cache import ScryfallCache
+import requests
+
+from .cache.build_cache import BuildCache
+from .cache.scryfall_cache import FreshnessPolicy, ScryfallCache
 from .cache.scryfall_client import ScryfallClient
+from .data.bulk_data import iter_bulk_cards
 from .data.card_index import CardIndex
 from .data.normalise import normalise_card
+from .engine.card_pool import CardPool
 from .engine.deck_builder import DeckBuilder
 from .engine.deckbrief import DeckBrief
-from .features.extract import extract_features
+from .engine.optimizer import DeckOptimizer
+from .features.extract import extract_features, feature_fingerprints
+from .features.reextract import reextract_features, stale_features
+from .features.sql import extract_features_sql
+from .roles.materialize import materialize_roles
 from .roles.role_engine import RoleEngine
 
+# Role targets of the build command, also used for briefs that omit them
+DEFAULT_ROLE_TARGETS = {"ramp": 10, "card_draw": 10, "interaction": 8, "finisher": 3}
+
 
 def build_index(
     cache_path: Path = Path("scryfall_cache.db"),
     index_path: Path = Path("card_index.duckdb"),
     query: str = "game:paper is:commander-legal",
+    fetch_workers: int = 1,
+    refresh: bool = False,
+    policy: FreshnessPolicy | None = None,
+    bulk_path: Path | None = None,
+    batch_size: int = 1000,
+    workers: int = 1,
+    feature_engine: str = "python",
+    roles_path: Path | None = None,
 ) -> CardIndex:
     """Build the card index from Scryfall data.
 
@@ -24,79 +50,115 @@ def build_index(
         cache_path: Path to SQLite cache
         index_path: Path to DuckDB index
         query: Scryfall search query
+        fetch_workers: Number of result pages fetched concurrently
+        refresh: Revalidate cached pages with Scryfall (conditional requests)
+        policy: Freshness policy for cached pages (default: never stale)
+        bulk_path: Local Scryfall bulk-data file to ingest instead of querying
+            the API (query, cache and fetch options are then ignored)
+        batch_size: Number of cards written to the index per bulk insert
+        workers: Processes that normalise cards and extract features. With
+            more than one, chunks of cards are prepared in a process pool
+            while the main process keeps writing to DuckDB in input order.
+        feature_engine: "python" extracts features per card while indexing;
+            "sql" derives them for every indexed card afterwards in one DuckDB
+            statement (see features.sql)
+        roles_path: Role definitions YAML whose roles are materialized in
+            the index (default: built-in roles)
 
     Returns:
         Populated CardIndex
 
     Raises:
+        ValueError: If feature_engine is not "python" or "sql"
         SystemExit: If index building fails
     """
-    print(f"Building card index from Scryfall (query: {query})...")
+    if feature_engine not in ("python", "sql"):
+        raise ValueError(f"Unknown feature engine: {feature_engine}")
+
+    if bulk_path is not None:
+        print(f"Building card index from bulk data file {bulk_path}...")
+    else:
+        print(f"Building card index from Scryfall (query: {query})...")
 
     try:
         # Initialize components
-        cache = ScryfallCache(cache_path)
-        client = ScryfallClient(cache)
+        cache = None
+        client = None
+        if bulk_path is not None:
+            cards = _read_source(iter_bulk_cards(bulk_path))
+        else:
+            cache = ScryfallCache(cache_path)
+            client = ScryfallClient(cache, policy=policy)
+            cards = _read_source(
+                client.iter_cards(
+                    query, use_cache=True, workers=fetch_workers, refresh=refresh
+                )
+            )
         index = CardIndex(index_path)
 
-        # Fetch cards
-        print("Fetching cards from Scryfall API...")
+        # Fetch, normalise and index cards as a stream (one page in memory)
+        if client is None:
+            print("Reading and indexing cards from bulk data...")
+        else:
+            print("Fetching and indexing cards from Scryfall API...")
+        card_count = 0
+        error_count = 0
+        batch: list[IndexRow] = []
+        extract = feature_engine == "python"
+
         try:
-            cards = client.get_all_cards(query, use_cache=True)
-        except Exception as e:
+            for card_json, (status, card, features) in _prepare_cards(
+                cards, workers, extract=extract
+            ):
+                card_count += 1
+                if card_count % 100 == 0:
+                    print(f"  Processed {card_count} cards...")
+
+                if status == "missing":
+                    # Skip if missing required fields
+                    _dump_card(card_json, "missing_required_fields.json")
+                    error_count += 1
+                    continue
+                if status == "error":
+                    error_count += 1
+                    if error_count <= 5:  # Only print first few errors
+                        print(f"  Warning: Error processing card {card_count}: {card}")
+                    _dump_card(card_json, "error_cards.json")
+                    continue
+
+                batch.append((card_json, card, features))
+                if len(batch) >= batch_size:
+                    error_count += _index_batch(index, batch)
+                    batch.clear()
+
+            error_count += _index_batch(index, batch)
+        except _SourceError as e:
+            # Index write failures are reported by the handler below
+            if client is None:
+                print(f"Error: Failed to read bulk data file {bulk_path}: {e}")
+                raise SystemExit(1)
             print(f"Error: Failed to fetch cards from Scryfall API: {e}")
             print("This might be a network issue or invalid query. Try again later.")
             raise SystemExit(1)
-
-        if not cards:
+        finally:
+            # Let stale pages finish revalidating so the next run sees them
+            if client is not None:
+                client.close()
+            if cache is not None:
+                cache.close()
+
+        if card_count == 0:
             print("Warning: No cards found for query. Index will be empty.")
             return index
 
-        print(f"Fetched {len(cards)} cards")
-
-        # Normalise and index
-        print("Normalising and indexing cards...")
-        error_count = 0
-
-        for i, card_json in enumerate(cards):
-            if (i + 1) % 100 == 0:
-                print(f"  Processed {i + 1}/{len(cards)} cards...")
-
-            try:
-                # Normalise card
-                card = normalise_card(card_json)
-
-                # Skip if missing required fields
-                if not card.get("scryfall_id") or not card.get("name"):
-                    output_path = Path("output/missing_required_fields.json")
-                    if not output_path.exists():
-                        output_path.parent.mkdir(parents=True, exist_ok=True)
-                        output_path.touch()
-                    with open(output_path, "a") as f:
-                        json.dump(card_json, f, indent=2)
-
-                    error_count += 1
-                    continue
-
-                # Extract features
-                features = extract_features(card)
-
-                # Insert into index
-                index.insert_card(card)
-                index.insert_features(card["scryfall_id"], features)
-            except Exception as e:
-                error_count += 1
-                if error_count <= 5:  # Only print first few errors
-                    print(f"  Warning: Error processing card {i + 1}: {e}")
-                output_path = Path("output/error_cards.json")
-                if not output_path.exists():
-                    output_path.parent.mkdir(parents=True, exist_ok=True)
-                    output_path.touch()
-                with open(output_path, "a") as f:
-                    json.dump(card_json, f, indent=2)
+        if not extract:
+            print("Extracting features in DuckDB...")
+            extract_features_sql(index)
 
+        index.set_feature_versions(feature_fingerprints())
         index.conn.commit()
-        print(f"Index built: {len(cards) - error_count} cards indexed")
+        materialize_roles(index, RoleEngine(roles_path))
+        print(f"Index built: {card_count - error_count} cards indexed")
         if error_count > 0:
             print(f"  ({error_count} cards skipped due to errors)")
 
@@ -106,12 +168,150 @@ def build_index(
         raise SystemExit(1)
 
 
+# (raw card JSON, normalised card, features) waiting to be written
+IndexRow = tuple[dict[str, Any], dict[str, Any], dict[str, bool] | None]
+
+# Outcome of preparing one card: ("ok", card, features), ("missing", None,
+# None) or ("error", message, None)
+Prepared = tuple[str, Any, dict[str, bool] | None]
+
+
+class _SourceError(Exception):
+    """Failure to read the card source (Scryfall API or bulk data file)."""
+
+
+def _read_source(cards: Iterable[dict[str, Any]]) -> Iterator[dict[str, Any]]:
+    """Pass cards through, wrapping fetch and read errors in _SourceError."""
+    try:
+        yield from cards
+    except (requests.RequestException, OSError, ValueError) as e:
+        raise _SourceError(e) from e
+
+
+def _prepare_card(card_json: dict[str, Any], extract: bool = True) -> Prepared:
+    """Normalise a card and (unless extract is False) extract its features."""
+    try:
+        card = normalise_card(card_json)
+        if not card.get("scryfall_id") or not card.get("name"):
+            return "missing", None, None
+        features = extract_features(card) if extract else None
+    except Exception as e:
+        # Reported as text: exceptions do not always survive pickling
+        return "error", str(e), None
+    # The raw JSON is not indexed; don't ship it back from worker processes
+    card.pop("raw_json", None)
+    return "ok", card, features
+
+
+def _prepare_chunk(chunk: list[dict[str, Any]], extract: bool) -> list[Prepared]:
+    """Prepare a chunk of cards (runs in a worker process)."""
+    return [_prepare_card(card_json, extract) for card_json in chunk]
+
+
+def _prepare_cards(
+    cards: Iterable[dict[str, Any]],
+    workers: int = 1,
+    chunk_size: int = 500,
+    extract: bool = True,
+) -> Iterator[tuple[dict[str, Any], Prepared]]:
+    """Yield each card with its prepared outcome, in input order.
+
+    With more than one worker, chunks are prepared in a process pool with at
+    most ``2 * workers`` chunks in flight, so the input is still consumed as
+    a stream.
+    """
+    if workers <= 1:
+        for card_json in cards:
+            yield card_json, _prepare_card(card_json, extract)
+        return
+
+    iterator = iter(cards)
+    pending: deque[tuple[list[dict[str, Any]], Future[list[Prepared]]]] = deque()
+    # Spawned workers: forking a process that runs fetch threads can deadlock
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        try:
+            while True:
+                while len(pending) < 2 * workers:
+                    chunk = list(islice(iterator, chunk_size))
+                    if not chunk:
+                        break
+                    pending.append((chunk, pool.submit(_prepare_chunk, chunk, extract)))
+                if not pending:
+                    return
+                chunk, future = pending.popleft()
+                yield from zip(chunk, future.result())
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+
+def _index_batch(index: CardIndex, batch: list[IndexRow]) -> int:
+    """Write a batch of normalised cards and their features to the index.
+
+    If the bulk insert fails, cards are inserted one at a time so a single
+    bad card is dumped to output/error_cards.json instead of the whole batch.
+
+    Args:
+        index: Card index to write to
+        batch: (raw card JSON, normalised card, features) tuples; features
+            are None when they are derived in SQL afterwards
+
+    Returns:
+        Number of cards that could not be indexed
+    """
+    if not batch:
+        return 0
+    try:
+        index.insert_cards_bulk([card for _, card, _ in batch])
+        index.insert_features_bulk(
+            [
+                {"scryfall_id": card["scryfall_id"], **f}
+                for _, card, f in batch
+                if f is not None
+            ]
+        )
+        return 0
+    except Exception:
+        pass
+
+    errors = 0
+    for card_json, card, features in batch:
+        try:
+            index.insert_card(card)
+            if features is not None:
+                index.insert_features(card["scryfall_id"], features)
+        except Exception as e:
+            errors += 1
+            if errors <= 5:
+                print(f"  Warning: Error indexing card {card.get('name')}: {e}")
+            _dump_card(card_json, "error_cards.json")
+    # Row-wise inserts leave the snapshot ID to the batch
+    index.new_snapshot()
+    return errors
+
+
+def _dump_card(card_json: dict[str, Any], filename: str) -> None:
+    """Append a card that could not be indexed to a file under output/."""
+    output_path = Path("output") / filename
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, "a") as f:
+        json.dump(card_json, f, indent=2)
+
+
 def build_deck(
     commander: str,
     color_identity: list[str],
     role_targets: dict[str, int],
     index_path: Path = Path("card_index.duckdb"),
     output_path: Path | None = None,
+    roles_path: Path | None = None,
+    scoring: bool = False,
+    soft_budget: int | None = None,
+    optimize: bool = False,
+    seed: int = 0,
+    assign_roles: bool = False,
+    cache_path: Path | None = None,
 ) -> dict:
     """Build a deck from specifications.
 
@@ -121,6 +321,16 @@ def build_deck(
         role_targets: Dictionary of role name to target count
         index_path: Path to DuckDB index
         output_path: Optional path to save deck JSON
+        roles_path: Role definitions YAML (default: built-in roles); roles
+            whose materialization is stale are rebuilt first
+        scoring: Pick spells by score (see DeckScorer)
+        soft_budget: Soft deck budget in USD
+        optimize: Run the swap optimizer on the built deck
+        seed: Optimizer random seed
+        assign_roles: Meet role targets with the fewest cards (see
+            assign_role_cards)
+        cache_path: SQLite build cache (see BuildCache); an identical
+            earlier build of the same index is returned from it
 
     Returns:
         Deck build result dictionary
@@ -139,14 +349,26 @@ def build_deck(
 
         # Initialize components
         index = CardIndex(index_path)
-        role_engine = RoleEngine()
-        builder = DeckBuilder(index, role_engine)
+        role_engine = RoleEngine(roles_path)
+        rebuilt = materialize_roles(index, role_engine)
+        if rebuilt:
+            print(f"Materialized roles: {', '.join(rebuilt)}")
+        cache = BuildCache(cache_path) if cache_path is not None else None
+        builder = DeckBuilder(
+            index,
+            role_engine,
+            scoring=scoring,
+            optimizer=DeckOptimizer(seed=seed) if optimize else None,
+            assign_roles=assign_roles,
+            cache=cache,
+        )
 
         # Create DeckBrief
         brief = DeckBrief(
             commander=commander,
             color_identity=color_identity,
             role_targets=role_targets,
+            soft_budget=soft_budget,
         )
 
         # Build deck
@@ -158,6 +380,11 @@ def build_deck(
         except Exception as e:
             print(f"Error: Failed to build deck: {e}")
             raise SystemExit(1)
+        finally:
+            if cache is not None:
+                cache.close()
+        if cache is not None and cache.hits:
+            print(f"Served from build cache {cache_path}")
 
         # Validate deck size
         deck_size = len(result["deck"])
@@ -192,6 +419,260 @@ def build_deck(
         raise SystemExit(1)
 
 
+def build_batch(
+    briefs_path: Path,
+    output_path: Path,
+    index_path: Path = Path("card_index.duckdb"),
+    workers: int = 1,
+    roles_path: Path | None = None,
+    chunk_size: int = 50,
+    scoring: bool = False,
+    optimize: bool = False,
+    seed: int = 0,
+    assign_roles: bool = False,
+    cache_path: Path | None = None,
+) -> int:
+    """Build one deck per brief of a JSONL file and write the results as JSONL.
+
+    Each worker process opens the index read-only, loads a CardPool once and
+    builds chunks of briefs with DeckBuilder.build_decks. Results are written
+    in input order, one line per brief, so the output is identical for any
+    number of workers.
+
+    Args:
+        briefs_path: JSONL file with one DeckBrief object per line (fields as
+            in DeckBrief; role_targets defaults to DEFAULT_ROLE_TARGETS)
+        output_path: JSONL file receiving one build result per brief; briefs
+            that cannot be built give ``{"error": message}``
+        index_path: Path to DuckDB index
+        workers: Worker processes building decks
+        roles_path: Role definitions YAML (default: built-in roles)
+        chunk_size: Briefs sent to a worker at a time
+        scoring: Pick spells by score (see DeckScorer)
+        optimize: Run the swap optimizer on every deck
+        seed: Optimizer random seed
+        assign_roles: Meet role targets with the fewest cards (see
+            assign_role_cards)
+        cache_path: SQLite build cache shared by the workers (see
+            BuildCache)
+
+    Returns:
+        Number of decks built
+
+    Raises:
+        SystemExit: If the index is missing, a brief is invalid or the batch
+            fails
+    """
+    if not index_path.exists():
+        print(f"Error: Index file not found at {index_path}")
+        print("Please run 'index' command first to build the card index.")
+        raise SystemExit(1)
+
+    try:
+        briefs = _read_briefs(briefs_path)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        raise SystemExit(1)
+
+    optimizer = DeckOptimizer(seed=seed) if optimize else None
+    print(f"Building {len(briefs)} decks with {workers} worker(s)...")
+    built = failed = 0
+    try:
+        with open(output_path, "w") as f:
+            for ok, line in _build_batch(
+                briefs,
+                index_path,
+                roles_path,
+                workers,
+                chunk_size,
+                scoring,
+                optimizer,
+                assign_roles,
+                cache_path,
+            ):
+                f.write(line + "\n")
+                built += ok
+                failed += not ok
+    except Exception as e:
+        print(f"Error: Failed to build batch: {e}")
+        raise SystemExit(1)
+
+    print(f"Built {built} decks to {output_path}")
+    if failed:
+        print(f"  ({failed} briefs could not be built)")
+    return built
+
+
+def _read_briefs(path: Path) -> list[DeckBrief]:
+    """Parse a JSONL file of deck briefs, skipping blank lines."""
+    briefs = []
+    with open(path) as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                data = json.loads(line)
+                if not isinstance(data, dict):
+                    raise ValueError("expected a JSON object")
+                briefs.append(
+                    DeckBrief(**{"role_targets": dict(DEFAULT_ROLE_TARGETS)} | data)
+                )
+            except (TypeError, ValueError) as e:
+                raise ValueError(f"Invalid brief at {path}:{line_number}: {e}")
+    return briefs
+
+
+# Builder of a build_batch worker process (see _init_batch_worker)
+_batch_builder: DeckBuilder | None = None
+
+
+def _batch_deck_builder(
+    index_path: Path,
+    roles_path: Path | None,
+    scoring: bool = False,
+    optimizer: DeckOptimizer | None = None,
+    assign_roles: bool = False,
+    cache_path: Path | None = None,
+) -> DeckBuilder:
+    """Open the index read-only and load its card pool."""
+    index = CardIndex(index_path, read_only=True)
+    role_engine = RoleEngine(roles_path)
+    pool = CardPool.load(index, role_engine)
+    cache = BuildCache(cache_path) if cache_path is not None else None
+    return DeckBuilder(
+        index, role_engine, pool, scoring, optimizer, assign_roles, cache
+    )
+
+
+def _init_batch_worker(
+    index_path: Path,
+    roles_path: Path | None,
+    scoring: bool = False,
+    optimizer: DeckOptimizer | None = None,
+    assign_roles: bool = False,
+    cache_path: Path | None = None,
+) -> None:
+    """Set up the deck builder of a worker process."""
+    global _batch_builder
+    _batch_builder = _batch_deck_builder(
+        index_path, roles_path, scoring, optimizer, assign_roles, cache_path
+    )
+
+
+def _build_chunk(
+    builder: DeckBuilder, chunk: list[DeckBrief]
+) -> list[tuple[bool, str]]:
+    """Build a chunk of briefs into (built, JSON line) pairs."""
+    results = builder.build_decks(chunk, raise_errors=False)
+    return [("error" not in r, json.dumps(r, default=str)) for r in results]
+
+
+def _build_batch_chunk(chunk: list[DeckBrief]) -> list[tuple[bool, str]]:
+    """Build a chunk of briefs (runs in a worker process)."""
+    assert _batch_builder is not None
+    return _build_chunk(_batch_builder, chunk)
+
+
+def _build_batch(
+    briefs: list[DeckBrief],
+    index_path: Path,
+    roles_path: Path | None,
+    workers: int,
+    chunk_size: int,
+    scoring: bool = False,
+    optimizer: DeckOptimizer | None = None,
+    assign_roles: bool = False,
+    cache_path: Path | None = None,
+) -> Iterator[tuple[bool, str]]:
+    """Yield (built, JSON line) for each brief, in input order.
+
+    With more than one worker, chunks are built in a process pool with at
+    most ``2 * workers`` chunks in flight.
+    """
+    chunks = [briefs[i : i + chunk_size] for i in range(0, len(briefs), chunk_size)]
+    if workers <= 1:
+        builder = _batch_deck_builder(
+            index_path, roles_path, scoring, optimizer, assign_roles, cache_path
+        )
+        try:
+            for chunk in chunks:
+                yield from _build_chunk(builder, chunk)
+        finally:
+            builder.card_index.close()
+            if builder.cache is not None:
+                builder.cache.close()
+        return
+
+    iterator = iter(chunks)
+    pending: deque[Future[list[tuple[bool, str]]]] = deque()
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=context,
+        initializer=_init_batch_worker,
+        initargs=(
+            index_path,
+            roles_path,
+            scoring,
+            optimizer,
+            assign_roles,
+            cache_path,
+        ),
+    ) as pool:
+        try:
+            while True:
+                while len(pending) < 2 * workers:
+                    chunk = next(iterator, None)
+                    if chunk is None:
+                        break
+                    pending.append(pool.submit(_build_batch_chunk, chunk))
+                if not pending:
+                    return
+                yield from pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def reextract(
+    index_path: Path = Path("card_index.duckdb"),
+    feature_engine: str = "sql",
+    force: bool = False,
+) -> list[str]:
+    """Recompute the features whose extraction rules changed.
+
+    Args:
+        index_path: Path to DuckDB index
+        feature_engine: "sql" (in DuckDB) or "python" (extract_features)
+        force: Recompute every feature
+
+    Returns:
+        Names of the recomputed features
+
+    Raises:
+        SystemExit: If the index is missing or re-extraction fails
+    """
+    if not index_path.exists():
+        print(f"Error: Index file not found at {index_path}")
+        print("Please run 'index' command first to build the card index.")
+        raise SystemExit(1)
+
+    try:
+        index = CardIndex(index_path)
+        stale = stale_features(index)
+        if not stale and not force:
+            print("All features are up to date.")
+            return []
+
+        print(f"Re-extracting features: {', '.join(stale) if not force else 'all'}")
+        updated = reextract_features(index, engine=feature_engine, force=force)
+        print(f"Updated {len(updated)} features")
+        return updated
+    except Exception as e:
+        print(f"Error: Failed to re-extract features: {e}")
+        raise SystemExit(1)
+
+
 def main() -> None:
     """Main CLI entry point."""
     import argparse
@@ -214,6 +695,65 @@ def main() -> None:
         default="game:paper is:commander-legal",
         help="Scryfall search query (default: all commander-legal cards)",
     )
+    index_parser.add_argument(
+        "--fetch-workers",
+        type=int,
+        default=1,
+        help="Result pages fetched concurrently (rate limit still applies)",
+    )
+    index_parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Revalidate cached pages with Scryfall instead of reusing them",
+    )
+    index_parser.add_argument(
+        "--bulk-file",
+        type=Path,
+        help="Ingest a local Scryfall bulk-data JSON file (e.g. oracle_cards) "
+        "instead of querying the API",
+    )
+    index_parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processes used to normalise cards and extract features",
+    )
+    index_parser.add_argument(
+        "--feature-engine",
+        choices=["python", "sql"],
+        default="python",
+        help="Extract features per card in Python, or in DuckDB after loading",
+    )
+    index_parser.add_argument(
+        "--roles", type=Path, help="Role definitions YAML to materialize"
+    )
+    index_parser.add_argument(
+        "--ttl-days",
+        type=float,
+        help="Age after which cached pages are refreshed in the background",
+    )
+    index_parser.add_argument(
+        "--max-age-days",
+        type=float,
+        help="Age after which cached pages must be refetched before use",
+    )
+
+    # Re-extract features command
+    reextract_parser = subparsers.add_parser(
+        "reextract", help="Recompute features whose rules changed"
+    )
+    reextract_parser.add_argument(
+        "--index", type=Path, default=Path("card_index.duckdb"), help="Index path"
+    )
+    reextract_parser.add_argument(
+        "--feature-engine",
+        choices=["python", "sql"],
+        default="sql",
+        help="Recompute features in DuckDB (default) or with extract_features",
+    )
+    reextract_parser.add_argument(
+        "--force", action="store_true", help="Recompute every feature"
+    )
 
     # Build deck command
     deck_parser = subparsers.add_parser("build", help="Build a deck")
@@ -224,25 +764,132 @@ def main() -> None:
         required=True,
         help="Color identity (e.g., W U B)",
     )
-    deck_parser.add_argument("--ramp", type=int, default=10, help="Target ramp count")
     deck_parser.add_argument(
-        "--draw", type=int, default=10, help="Target card draw count"
+        "--ramp",
+        type=int,
+        default=DEFAULT_ROLE_TARGETS["ramp"],
+        help="Target ramp count",
     )
     deck_parser.add_argument(
-        "--interaction", type=int, default=8, help="Target interaction count"
+        "--draw",
+        type=int,
+        default=DEFAULT_ROLE_TARGETS["card_draw"],
+        help="Target card draw count",
     )
     deck_parser.add_argument(
-        "--finisher", type=int, default=3, help="Target finisher count"
+        "--interaction",
+        type=int,
+        default=DEFAULT_ROLE_TARGETS["interaction"],
+        help="Target interaction count",
+    )
+    deck_parser.add_argument(
+        "--finisher",
+        type=int,
+        default=DEFAULT_ROLE_TARGETS["finisher"],
+        help="Target finisher count",
     )
     deck_parser.add_argument(
         "--index", type=Path, default=Path("card_index.duckdb"), help="Index path"
     )
     deck_parser.add_argument("--output", type=Path, help="Output JSON path")
+    deck_parser.add_argument(
+        "--roles", type=Path, help="Role definitions YAML (default: built-in)"
+    )
+    deck_parser.add_argument(
+        "--score",
+        action="store_true",
+        help="Pick spells by role deficit, curve and budget score",
+    )
+    deck_parser.add_argument("--budget", type=int, help="Soft deck budget in USD")
+    deck_parser.add_argument(
+        "--optimize",
+        action="store_true",
+        help="Improve the built deck with seeded swap local search",
+    )
+    deck_parser.add_argument(
+        "--seed", type=int, default=0, help="Optimizer random seed (default: 0)"
+    )
+    deck_parser.add_argument(
+        "--assign-roles",
+        action="store_true",
+        help="Meet role targets with the fewest cards, counting multi-role cards",
+    )
+    deck_parser.add_argument(
+        "--build-cache",
+        type=Path,
+        help="SQLite cache of build results, reused until the index changes",
+    )
+
+    # Build many decks command
+    batch_parser = subparsers.add_parser(
+        "build-batch", help="Build one deck per brief of a JSONL file"
+    )
+    batch_parser.add_argument("briefs", type=Path, help="JSONL file of deck briefs")
+    batch_parser.add_argument(
+        "--output", type=Path, required=True, help="Output JSONL path"
+    )
+    batch_parser.add_argument(
+        "--index", type=Path, default=Path("card_index.duckdb"), help="Index path"
+    )
+    batch_parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processes building decks, each with a read-only index connection",
+    )
+    batch_parser.add_argument(
+        "--roles", type=Path, help="Role definitions YAML (default: built-in)"
+    )
+    batch_parser.add_argument(
+        "--score",
+        action="store_true",
+        help="Pick spells by role deficit, curve and budget score",
+    )
+    batch_parser.add_argument(
+        "--optimize",
+        action="store_true",
+        help="Improve each built deck with seeded swap local search",
+    )
+    batch_parser.add_argument(
+        "--seed", type=int, default=0, help="Optimizer random seed (default: 0)"
+    )
+    batch_parser.add_argument(
+        "--assign-roles",
+        action="store_true",
+        help="Meet role targets with the fewest cards, counting multi-role cards",
+    )
+    batch_parser.add_argument(
+        "--build-cache",
+        type=Path,
+        help="SQLite cache of build results, reused until the index changes",
+    )
 
     args = parser.parse_args()
 
     if args.command == "index":
-        build_index(cache_path=args.cache, index_path=args.index, query=args.query)
+        build_index(
+            cache_path=args.cache,
+            index_path=args.index,
+            query=args.query,
+            fetch_workers=args.fetch_workers,
+            refresh=args.refresh,
+            policy=FreshnessPolicy(
+                ttl=args.ttl_days * 86400 if args.ttl_days is not None else None,
+                max_age=(
+                    args.max_age_days * 86400 if args.max_age_days is not None else None
+                ),
+            ),
+            bulk_path=args.bulk_file,
+            workers=args.workers,
+            feature_engine=args.feature_engine,
+            roles_path=args.roles,
+        )
+    elif args.command == "reextract":
+        reextract(
+            index_path=args.index,
+            feature_engine=args.feature_engine,
+            force=args.force,
+        )
     elif args.command == "build":
         role_targets = {
             "ramp": args.ramp,
@@ -256,6 +903,26 @@ def main() -> None:
             role_targets=role_targets,
             index_path=args.index,
             output_path=args.output,
+            roles_path=args.roles,
+            scoring=args.score,
+            soft_budget=args.budget,
+            optimize=args.optimize,
+            seed=args.seed,
+            assign_roles=args.assign_roles,
+            cache_path=args.build_cache,
+        )
+    elif args.command == "build-batch":
+        build_batch(
+            briefs_path=args.briefs,
+            output_path=args.output,
+            index_path=args.index,
+            workers=args.workers,
+            roles_path=args.roles,
+            scoring=args.score,
+            optimize=args.optimize,
+            seed=args.seed,
+            assign_roles=args.assign_roles,
+            cache_path=args.build_cache,
         )
     else:
         parser.print_help()
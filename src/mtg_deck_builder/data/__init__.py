@@ -1,6 +1,7 @@
 """Data layer: card normalisation and DuckDB index."""
 
-from .card_index import CardIndex
+from .bulk_data import iter_bulk_cards
+from .card_index import CardIndex, color_identity_mask
 from .normalise import normalise_card
 
-__all__ = ["CardIndex", "normalise_card"]
+__all__ = ["CardIndex", "color_identity_mask", "iter_bulk_cards", "normalise_card"]
@@ -0,0 +1,108 @@
+"""Streaming reader for Scryfall bulk-data files.
+
+Bulk files (e.g. ``oracle_cards``) are one JSON array of card objects that
+can exceed 100 MB. Cards are decoded one at a time from a sliding text
+buffer, so the whole array is never materialised.
+"""
+
+import gzip
+import json
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any, TextIO
+
+_WHITESPACE = " \t\n\r"
+
+# Decode errors this close to the buffer end may be a token cut off by the
+# chunk boundary (e.g. "tru" or a partial \uXXXX escape) rather than bad JSON
+_TRUNCATION_MARGIN = 16
+
+
+def iter_bulk_cards(
+    path: Path | str, chunk_size: int = 1 << 20
+) -> Iterator[dict[str, Any]]:
+    """Yield the card objects of a Scryfall bulk-data file in file order.
+
+    Args:
+        path: Path to the bulk JSON file (``.gz`` files are decompressed)
+        chunk_size: Characters read from the file at a time
+
+    Yields:
+        Raw Scryfall card JSON objects
+
+    Raises:
+        ValueError: If the file is not a JSON array or is truncated
+    """
+    path = Path(path)
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        yield from _iter_array(f, chunk_size)
+
+
+def _iter_array(f: TextIO, chunk_size: int) -> Iterator[Any]:
+    """Incrementally decode the elements of a top-level JSON array."""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+
+    def fill() -> bool:
+        """Drop the consumed prefix and append the next chunk."""
+        nonlocal buffer, pos, eof
+        chunk = f.read(chunk_size)
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        eof = not chunk
+        return bool(chunk)
+
+    def skip(chars: str) -> None:
+        """Advance past any of the given characters, reading as needed."""
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in chars:
+                pos += 1
+            if pos < len(buffer) or not fill():
+                return
+
+    def decode() -> Any:
+        """Decode the element at pos, reading more when it is incomplete."""
+        nonlocal pos
+        while True:
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as err:
+                # Only a value cut off by the buffer end can be completed by
+                # reading more; an error before that is malformed input
+                near_end = err.pos >= len(buffer) - _TRUNCATION_MARGIN
+                if eof or not (near_end or err.msg.startswith("Unterminated")):
+                    raise
+                fill()
+                continue
+            # A value ending exactly at the buffer end may continue in the
+            # next chunk (e.g. a number), so only accept it once more is read
+            if end == len(buffer) and not eof:
+                fill()
+                continue
+            pos = end
+            return value
+
+    skip(_WHITESPACE)
+    if buffer[pos : pos + 1] != "[":
+        raise ValueError("Bulk data file must contain a JSON array")
+    pos += 1
+    skip(_WHITESPACE)
+    if buffer[pos : pos + 1] == "]":
+        return
+
+    while True:
+        yield decode()
+
+        skip(_WHITESPACE)
+        if pos >= len(buffer):
+            raise ValueError("Bulk data file ended before the array was closed")
+        if buffer[pos] == "]":
+            return
+        if buffer[pos] != ",":
+            raise ValueError(f"Expected ',' or ']' in bulk data, got {buffer[pos]!r}")
+        pos += 1
+        skip(_WHITESPACE)
@@ -1,17 +1,93 @@
 """DuckDB card index for fast deterministic filtering and evaluation."""
 
 import duckdb
+import json
+import uuid
+from collections.abc import Iterable, Mapping, Sequence
 from pathlib import Path
 from typing import Any
 
+# Column name -> DuckDB type, in table order (used by the bulk insert path)
+CARD_COLUMNS = {
+    "scryfall_id": "VARCHAR",
+    "name": "VARCHAR",
+    "mana_cost": "VARCHAR",
+    "cmc": "INTEGER",
+    "type_line": "VARCHAR",
+    "oracle_text": "TEXT",
+    "colors": "VARCHAR[]",
+    "color_identity": "VARCHAR[]",
+    "rarity": "VARCHAR",
+    "commander_legal": "BOOLEAN",
+    "power": "VARCHAR",
+    "toughness": "VARCHAR",
+    "keywords": "VARCHAR[]",
+    "produced_mana": "VARCHAR[]",
+    # Derived from color_identity at insert time (see color_identity_mask)
+    "ci_mask": "UTINYINT",
+    # Scryfall prices.usd; NULL when Scryfall lists no price
+    "price_usd": "DOUBLE",
+}
+
+# Bit of each color in ci_mask; a card fits a deck when
+# ci_mask & ~deck_mask = 0
+COLOR_BITS = {"W": 1, "U": 2, "B": 4, "R": 8, "G": 16}
+
+# SQL equivalent of color_identity_mask, used to backfill older indexes
+_CI_MASK_SQL = (
+    "coalesce(list_sum(list_transform(color_identity, c -> CASE c "
+    + " ".join(f"WHEN '{color}' THEN {bit}" for color, bit in COLOR_BITS.items())
+    + " ELSE 0 END)), 0)"
+)
+
+FEATURE_NAMES = [
+    "produces_mana",
+    "draws_cards",
+    "removes_creature",
+    "removes_noncreature",
+    "is_board_wipe",
+    "is_tutor",
+    "creates_tokens",
+    "is_finisher",
+    "protects_board",
+    "recurs_from_graveyard",
+    "is_land_only",
+]
+
+# A batch of rows: list of row dicts, dict of column lists, or an Arrow table
+Batch = Sequence[Mapping[str, Any]] | Mapping[str, Sequence[Any]] | Any
+
+
+def color_identity_mask(color_identity: Iterable[str] | None) -> int:
+    """Encode a color identity as a 5-bit mask (see COLOR_BITS).
+
+    Args:
+        color_identity: Color symbols, e.g. ['W', 'U']; unknown symbols are
+            ignored
+
+    Returns:
+        Bitmask with one bit per color
+    """
+    mask = 0
+    for color in color_identity or ():
+        mask |= COLOR_BITS.get(color, 0)
+    return mask
+
 
 class CardIndex:
     """DuckDB-based card index for fast queries."""
 
-    def __init__(self, db_path: Path | str = ":memory:"):
-        """Initialize the DuckDB connection."""
-        self.conn = duckdb.connect(str(db_path))
-        self._init_tables()
+    def __init__(self, db_path: Path | str = ":memory:", read_only: bool = False):
+        """Initialize the DuckDB connection.
+
+        Args:
+            db_path: Path to the DuckDB file, or ":memory:"
+            read_only: Open an existing index read-only, so several processes
+                can share it; tables are then neither created nor migrated
+        """
+        self.conn = duckdb.connect(str(db_path), read_only=read_only)
+        if not read_only:
+            self._init_tables()
 
     def _init_tables(self) -> None:
         """Create the cards and card_features tables."""
@@ -32,11 +108,35 @@ class CardIndex:
                 power VARCHAR,
                 toughness VARCHAR,
                 keywords VARCHAR[],
-                produced_mana VARCHAR[]
+                produced_mana VARCHAR[],
+                ci_mask UTINYINT NOT NULL DEFAULT 0,
+                price_usd DOUBLE
             )
             """
         )
 
+        # Indexes built before ci_mask existed: add and backfill it
+        has_ci_mask = self.conn.execute(
+            """
+            SELECT COUNT(*) FROM information_schema.columns
+            WHERE table_name = 'cards' AND column_name = 'ci_mask'
+            """
+        ).fetchone()
+        if has_ci_mask == (0,):
+            self.conn.execute("ALTER TABLE cards ADD COLUMN ci_mask UTINYINT DEFAULT 0")
+            self.conn.execute(f"UPDATE cards SET ci_mask = {_CI_MASK_SQL}")
+
+        # Indexes built before price_usd existed: prices stay unknown until
+        # the cards are indexed again
+        has_price = self.conn.execute(
+            """
+            SELECT COUNT(*) FROM information_schema.columns
+            WHERE table_name = 'cards' AND column_name = 'price_usd'
+            """
+        ).fetchone()
+        if has_price == (0,):
+            self.conn.execute("ALTER TABLE cards ADD COLUMN price_usd DOUBLE")
+
         # Card features table (derived features)
         self.conn.execute(
             """
@@ -58,10 +158,55 @@ class CardIndex:
             """
         )
 
+        # Fingerprint of the rules each stored feature was extracted with
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS feature_versions (
+                feature VARCHAR PRIMARY KEY,
+                fingerprint VARCHAR NOT NULL
+            )
+            """
+        )
+
+        # Materialized role membership (see roles.materialize); a role's rows
+        # are current only while role_versions holds its definition's
+        # fingerprint, which any feature write clears
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS card_roles (
+                role VARCHAR NOT NULL,
+                scryfall_id VARCHAR NOT NULL,
+                PRIMARY KEY (role, scryfall_id)
+            )
+            """
+        )
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS role_versions (
+                role VARCHAR PRIMARY KEY,
+                fingerprint VARCHAR NOT NULL
+            )
+            """
+        )
+
+        # ID of the current contents of cards and card_features, renewed by
+        # every write to them (see snapshot_id)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS index_snapshot (id VARCHAR NOT NULL)"
+        )
+        if self.conn.execute("SELECT COUNT(*) FROM index_snapshot").fetchone() == (0,):
+            self.conn.execute(
+                "INSERT INTO index_snapshot VALUES (?)", (uuid.uuid4().hex,)
+            )
+
         self.conn.commit()
 
     def insert_card(self, card: dict[str, Any]) -> None:
-        """Insert a normalised card into the index."""
+        """Insert a normalised card into the index.
+
+        Row-wise writers renew the snapshot ID once per batch (see
+        new_snapshot), not once per card.
+        """
         # Delete existing card if present, then insert (simple upsert for v1)
         self.conn.execute(
             "DELETE FROM cards WHERE scryfall_id = ?",
@@ -72,8 +217,8 @@ class CardIndex:
             INSERT INTO cards (
                 scryfall_id, name, mana_cost, cmc, type_line, oracle_text,
                 colors, color_identity, rarity, commander_legal,
-                power, toughness, keywords, produced_mana
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                power, toughness, keywords, produced_mana, ci_mask, price_usd
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """,
             (
                 card["scryfall_id"],
@@ -90,11 +235,13 @@ class CardIndex:
                 card["toughness"],
                 card["keywords"],
                 card["produced_mana"],
+                color_identity_mask(card["color_identity"]),
+                card.get("price_usd"),
             ),
         )
 
     def insert_features(self, scryfall_id: str, features: dict[str, bool]) -> None:
-        """Insert card features into the index."""
+        """Insert card features into the index (see insert_card)."""
         # Delete existing features if present, then insert (simple upsert for v1)
         self.conn.execute(
             "DELETE FROM card_features WHERE scryfall_id = ?",
@@ -123,6 +270,255 @@ class CardIndex:
                 features.get("is_land_only", False),
             ),
         )
+        self.invalidate_roles()
+
+    def insert_cards_bulk(self, cards: Batch) -> int:
+        """Upsert a batch of normalised cards with one set-based statement.
+
+        Features already stored for these cards reference the old rows, so
+        they are removed first; insert fresh ones with insert_features_bulk.
+        Must not be called inside an explicit transaction (DuckDB checks the
+        foreign key per statement only in autocommit mode).
+
+        Args:
+            cards: List of card dicts, dict of column lists, or Arrow table
+
+        Returns:
+            Number of cards written
+        """
+        columns = self._batch_columns(cards, CARD_COLUMNS)
+        columns["ci_mask"] = [
+            color_identity_mask(ci) for ci in columns["color_identity"]
+        ]
+        ids = columns["scryfall_id"]
+        if not ids:
+            return 0
+
+        self.conn.execute(
+            """
+            DELETE FROM card_features
+            WHERE scryfall_id IN (SELECT UNNEST(from_json(?, '["VARCHAR"]')))
+            """,
+            [json.dumps(ids)],
+        )
+        self._upsert_columns("cards", CARD_COLUMNS, columns)
+        self.new_snapshot()
+        return len(ids)
+
+    def insert_features_bulk(self, features: Batch) -> int:
+        """Upsert a batch of card features with one set-based statement.
+
+        Args:
+            features: Rows keyed by ``scryfall_id`` plus feature names (missing
+                features default to False), as a list of dicts, dict of column
+                lists, or Arrow table
+
+        Returns:
+            Number of feature rows written
+        """
+        feature_columns = {"scryfall_id": "VARCHAR"} | {
+            name: "BOOLEAN" for name in FEATURE_NAMES
+        }
+        columns = self._batch_columns(features, feature_columns, default=False)
+        if not columns["scryfall_id"]:
+            return 0
+
+        self._upsert_columns("card_features", feature_columns, columns)
+        self.invalidate_roles()
+        self.new_snapshot()
+        return len(columns["scryfall_id"])
+
+    def update_features_bulk(self, features: Batch, names: Sequence[str]) -> int:
+        """Overwrite selected feature columns of existing feature rows.
+
+        Args:
+            features: Rows keyed by ``scryfall_id`` (see insert_features_bulk)
+            names: Feature columns to overwrite; other columns are untouched
+
+        Returns:
+            Number of rows in the batch
+
+        Raises:
+            ValueError: If a name is not a known feature
+        """
+        unknown = set(names) - set(FEATURE_NAMES)
+        if unknown:
+            raise ValueError(f"Unknown features: {', '.join(sorted(unknown))}")
+        column_types = {"scryfall_id": "VARCHAR"} | {name: "BOOLEAN" for name in names}
+        columns = self._batch_columns(features, column_types, default=False)
+        if not columns["scryfall_id"] or not names:
+            return 0
+
+        rows, payload = self._json_rows(column_types, columns)
+        assignments = ", ".join(f"{name} = batch_rows.{name}" for name in names)
+        self.conn.execute(
+            f"""
+            UPDATE card_features SET {assignments}
+            FROM ({rows}) AS batch_rows
+            WHERE card_features.scryfall_id = batch_rows.scryfall_id
+            """,
+            [payload],
+        )
+        self.invalidate_roles()
+        self.new_snapshot()
+        return len(columns["scryfall_id"])
+
+    def get_feature_versions(self) -> dict[str, str]:
+        """Fingerprints of the rules the stored features were extracted with.
+
+        Returns:
+            Feature name to fingerprint (features never recorded are absent)
+        """
+        rows = self.conn.execute(
+            "SELECT feature, fingerprint FROM feature_versions"
+        ).fetchall()
+        return dict(rows)
+
+    def set_feature_versions(self, fingerprints: Mapping[str, str]) -> None:
+        """Record the rule fingerprints of freshly extracted features."""
+        for feature, fingerprint in fingerprints.items():
+            self.conn.execute(
+                "INSERT OR REPLACE INTO feature_versions VALUES (?, ?)",
+                (feature, fingerprint),
+            )
+
+    def get_role_versions(self) -> dict[str, str]:
+        """Fingerprints of the role definitions materialized in card_roles.
+
+        Returns:
+            Role name to fingerprint (roles not currently materialized are
+            absent)
+        """
+        rows = self.conn.execute(
+            "SELECT role, fingerprint FROM role_versions"
+        ).fetchall()
+        return dict(rows)
+
+    def materialize_role(self, role: str, predicate: str, fingerprint: str) -> int:
+        """Replace the stored members of a role.
+
+        Args:
+            role: Role name
+            predicate: SQL predicate over card_features aliased ``cf`` (see
+                RoleEngine.role_predicate)
+            fingerprint: Fingerprint of the role definition
+
+        Returns:
+            Number of cards in the role
+        """
+        self.conn.execute("DELETE FROM card_roles WHERE role = ?", (role,))
+        row = self.conn.execute(
+            f"""
+            INSERT INTO card_roles
+            SELECT ?, cf.scryfall_id FROM card_features cf WHERE {predicate}
+            """,
+            (role,),
+        ).fetchone()
+        self.conn.execute(
+            "INSERT OR REPLACE INTO role_versions VALUES (?, ?)", (role, fingerprint)
+        )
+        return row[0] if row else 0
+
+    def prune_roles(self, keep: Sequence[str]) -> None:
+        """Remove the materialized members of every role not in keep."""
+        for table in ("card_roles", "role_versions"):
+            self.conn.execute(
+                f"""
+                DELETE FROM {table}
+                WHERE role NOT IN (SELECT UNNEST(from_json(?, '["VARCHAR"]')))
+                """,
+                [json.dumps(list(keep))],
+            )
+
+    def invalidate_roles(self) -> None:
+        """Mark every materialized role stale after a feature change."""
+        self.conn.execute("DELETE FROM role_versions")
+
+    def snapshot_id(self) -> str | None:
+        """ID of the current index contents.
+
+        Every batch of writes to the cards or their features renews it
+        (bulk writes do so themselves), so anything derived from the index
+        (e.g. cached deck builds) can be keyed on it.
+
+        Returns:
+            The ID, or None for an index opened read-only that was built
+            before snapshot IDs existed
+        """
+        try:
+            row = self.conn.execute("SELECT id FROM index_snapshot").fetchone()
+        except duckdb.CatalogException:
+            return None
+        return row[0] if row else None
+
+    def new_snapshot(self) -> None:
+        """Give the index contents a new snapshot ID after a write."""
+        self.conn.execute("UPDATE index_snapshot SET id = ?", (uuid.uuid4().hex,))
+
+    @staticmethod
+    def materialized_role_predicate(role: str) -> str:
+        """Predicate for query_role that looks a role up in card_roles.
+
+        Args:
+            role: Name of a materialized role
+
+        Returns:
+            SQL predicate over card_features aliased ``cf``
+        """
+        literal = "'" + role.replace("'", "''") + "'"
+        return (
+            "cf.scryfall_id IN "
+            f"(SELECT scryfall_id FROM card_roles WHERE role = {literal})"
+        )
+
+    @staticmethod
+    def _batch_columns(
+        batch: Batch, column_types: Mapping[str, str], default: Any = None
+    ) -> dict[str, list[Any]]:
+        """Convert a batch in any supported shape to one list per column."""
+        if hasattr(batch, "to_pydict"):
+            # Arrow table (or record batch)
+            batch = batch.to_pydict()
+
+        if isinstance(batch, Mapping):
+            size = len(batch["scryfall_id"])
+            columns = {
+                name: list(batch[name]) if name in batch else [default] * size
+                for name in column_types
+            }
+            if any(len(values) != size for values in columns.values()):
+                raise ValueError("Bulk insert columns must all have the same length")
+            return columns
+
+        return {
+            name: [row.get(name, default) for row in batch] for name in column_types
+        }
+
+    def _upsert_columns(
+        self,
+        table: str,
+        column_types: Mapping[str, str],
+        columns: Mapping[str, list[Any]],
+    ) -> None:
+        """INSERT OR REPLACE parallel column lists zipped by UNNEST."""
+        names = ", ".join(column_types)
+        rows, payload = self._json_rows(column_types, columns)
+        self.conn.execute(f"INSERT OR REPLACE INTO {table} ({names}) {rows}", [payload])
+
+    @staticmethod
+    def _json_rows(
+        column_types: Mapping[str, str], columns: Mapping[str, list[Any]]
+    ) -> tuple[str, str]:
+        """A SELECT yielding one row per batch entry, and its JSON parameter.
+
+        The batch travels as a single JSON document decoded inside DuckDB;
+        binding Python lists as parameters converts every element one by one
+        and is an order of magnitude slower.
+        """
+        schema = json.dumps({name: f"{t}[]" for name, t in column_types.items()})
+        values = ", ".join(f"UNNEST(batch.{name}) AS {name}" for name in column_types)
+        rows = f"SELECT {values} FROM (SELECT from_json(?, '{schema}') AS batch)"
+        return rows, json.dumps({name: columns[name] for name in column_types})
 
     def query_cards(
         self,
@@ -130,7 +526,16 @@ class CardIndex:
         commander_legal: bool = True,
         **kwargs: Any,
     ) -> list[dict[str, Any]]:
-        """Query cards with filters."""
+        """Query cards with filters.
+
+        Args:
+            color_identity: Only return cards whose color identity is a subset
+                of this one ([] means colorless only, None means any)
+            commander_legal: Only return Commander-legal cards
+
+        Returns:
+            List of card dicts
+        """
         query = "SELECT * FROM cards WHERE 1=1"
         params: list[Any] = []
 
@@ -138,17 +543,65 @@ class CardIndex:
             query += " AND commander_legal = ?"
             params.append(True)
 
-        if color_identity:
-            # Filter by color identity (card's color_identity must be subset of provided)
-            query += " AND array_length(color_identity) <= ?"
-            params.append(len(color_identity))
-            # This is a simplified check; full implementation would check subset
+        if color_identity is not None:
+            # Card's color identity must be a subset of the provided one
+            query += " AND (ci_mask & ~?) = 0"
+            params.append(color_identity_mask(color_identity))
 
         relation = self.conn.execute(query, params)
         result = relation.fetchall()
         columns = [col[0] for col in relation.description]
         return [dict(zip(columns, row)) for row in result]
 
+    def query_role(
+        self,
+        role: str,
+        ci_mask: int,
+        exclusions: Sequence[str] = (),
+        limit: int | None = None,
+        exclude_ids: Sequence[str] = (),
+    ) -> list[dict[str, Any]]:
+        """Query Commander-legal cards matching a role predicate.
+
+        The role filter, color identity check and limit all run in DuckDB,
+        so only the returned cards are fetched.
+
+        Args:
+            role: SQL predicate over card_features aliased ``cf``, e.g. from
+                RoleEngine.role_predicate
+            ci_mask: Deck color identity mask (see color_identity_mask)
+            exclusions: Card names to leave out
+            limit: Maximum number of cards to return (default: all)
+            exclude_ids: Scryfall IDs to leave out, e.g. cards already chosen
+
+        Returns:
+            List of card dicts with the CARD_COLUMNS keys
+        """
+        select = ", ".join(f"c.{name}" for name in CARD_COLUMNS)
+        query = f"""
+            SELECT {select} FROM cards c
+            JOIN card_features cf ON c.scryfall_id = cf.scryfall_id
+            WHERE c.commander_legal = true
+            AND (c.ci_mask & ~?) = 0
+            AND ({role})
+        """
+        params: list[Any] = [ci_mask]
+
+        if exclusions:
+            placeholders = ",".join("?" * len(exclusions))
+            query += f" AND c.name NOT IN ({placeholders})"
+            params.extend(exclusions)
+        if exclude_ids:
+            placeholders = ",".join("?" * len(exclude_ids))
+            query += f" AND c.scryfall_id NOT IN ({placeholders})"
+            params.extend(exclude_ids)
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        rows = self.conn.execute(query, params).fetchall()
+        return [dict(zip(CARD_COLUMNS, row)) for row in rows]
+
     def close(self) -> None:
         """Close the database connection."""
         self.conn.close()
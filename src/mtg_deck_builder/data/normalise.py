@@ -35,6 +35,9 @@ def normalise_card(scryfall_card: dict[str, Any]) -> dict[str, Any]:
     # Extract produced mana (from mana_produced field if available, or parse oracle text)
     produced_mana = _extract_produced_mana(scryfall_card)
 
+    # Scryfall prices are decimal strings, or null when unknown
+    price_usd = (scryfall_card.get("prices") or {}).get("usd")
+
     return {
         "scryfall_id": scryfall_id,
         "name": name,
@@ -50,6 +53,7 @@ def normalise_card(scryfall_card: dict[str, Any]) -> dict[str, Any]:
         "toughness": toughness,
         "keywords": keywords,
         "produced_mana": produced_mana,
+        "price_usd": float(price_usd) if price_usd is not None else None,
         # Store raw JSON for feature extraction
         "raw_json": scryfall_card,
     }
@@ -1,6 +1,22 @@
 """Deck assembly engine."""
 
+from .assignment import assign_role_cards, cover_roles
+from .card_pool import CardPool, CardRecord
 from .deck_builder import DeckBuilder
 from .deckbrief import DeckBrief
+from .optimizer import DeckOptimizer, OptimizationResult, Swap
+from .scoring import DeckScorer, ScoreBreakdown
 
-__all__ = ["DeckBuilder", "DeckBrief"]
+__all__ = [
+    "assign_role_cards",
+    "cover_roles",
+    "CardPool",
+    "CardRecord",
+    "DeckBuilder",
+    "DeckBrief",
+    "DeckOptimizer",
+    "DeckScorer",
+    "OptimizationResult",
+    "ScoreBreakdown",
+    "Swap",
+]
@@ -0,0 +1,216 @@
+"""Role assignment: the fewest cards that meet every role target.
+
+A card counts toward every role it fills, so picking role cards is a
+covering problem: choose the fewest cards such that each role has at least
+its target among them. For this purpose cards only differ by their set of
+targeted roles, so the integer program is solved over role-set types with
+availability bounds. A dynamic program over the remaining deficits handles
+the multi-role types exactly, and single-role types are settled in closed
+form afterwards.
+"""
+
+from collections.abc import Iterable, Mapping
+
+from .card_pool import CardPool
+
+# Largest deficit state space solved exactly; beyond it cover_roles falls
+# back to greedy covering
+MAX_STATES = 200_000
+
+
+def cover_roles(
+    available: Mapping[int, int], targets: Mapping[int, int]
+) -> dict[int, int]:
+    """Number of cards of each role set to take to meet every role target.
+
+    Minimises the total shortfall against the targets, then the number of
+    cards.
+
+    Args:
+        available: Role bits of a card type to the number of such cards;
+            bits outside targets are ignored
+        targets: Single role bit to its target count
+
+    Returns:
+        Role bits, restricted to the roles with a positive target, to the
+        number of such cards to take (zero counts left out)
+    """
+    bits = [bit for bit, target in targets.items() if target > 0]
+    mask = 0
+    for bit in bits:
+        mask |= bit
+
+    # Merge types that differ only in untargeted roles
+    by_roles: dict[int, int] = {}
+    for role_bits, count in available.items():
+        if role_bits & mask and count > 0:
+            by_roles[role_bits & mask] = by_roles.get(role_bits & mask, 0) + count
+    start = tuple(targets[bit] for bit in bits)
+
+    # A role set is never needed when a strict superset has enough cards to
+    # meet all of its own targets: any of its cards can be exchanged for one
+    # of the superset's (which fills at least the same roles)
+    saturated = [
+        roles
+        for roles, count in by_roles.items()
+        if count >= max(targets[bit] for bit in bits if roles & bit)
+    ]
+    by_roles = {
+        roles: count
+        for roles, count in by_roles.items()
+        if not any(other != roles and other & roles == roles for other in saturated)
+    }
+
+    # Targets beyond what all cards together can fill are clipped, which
+    # fixes the shortfall; what is left is to minimise the number of cards
+    start = tuple(
+        min(target, sum(c for roles, c in by_roles.items() if roles & bit))
+        for bit, target in zip(bits, start)
+    )
+    greedy = _greedy_cover(by_roles, bits, start)
+    states = 1
+    for target in start:
+        states *= target + 1
+    if states > MAX_STATES:
+        return greedy
+
+    singles = [by_roles.get(bit, 0) for bit in bits]
+    multi = sorted(
+        (roles for roles in by_roles if roles.bit_count() > 1),
+        key=lambda roles: (-roles.bit_count(), roles),
+    )
+    # capacities[k][j]: cards filling role j among the types after multi[k]
+    capacities = []
+    for k in range(len(multi)):
+        capacities.append(
+            [
+                singles[j]
+                + sum(by_roles[roles] for roles in multi[k + 1 :] if roles & bit)
+                for j, bit in enumerate(bits)
+            ]
+        )
+    # Most roles filled by one card of the types after multi[k]
+    widths = [roles.bit_count() for roles in multi[1:]] + [1]
+
+    def finishable(state: tuple[int, ...]) -> bool:
+        return all(d <= s for d, s in zip(state, singles))
+
+    # Upper bound on the cards of an optimal plan, lowered whenever a state
+    # can be finished with single-role cards; states whose lower bound
+    # exceeds it are dropped
+    bound = sum(greedy.values())
+    if finishable(start):
+        bound = min(bound, sum(start))
+
+    # layers[k][state] = (cards, previous state, cards of multi[k] taken)
+    layers: list[dict[tuple[int, ...], tuple[int, tuple[int, ...], int]]] = []
+    costs = {start: 0}
+    for roles, capacity, width in zip(multi, capacities, widths):
+        members = [j for j, bit in enumerate(bits) if roles & bit]
+        others = [j for j in range(len(bits)) if j not in members]
+        layer: dict[tuple[int, ...], tuple[int, tuple[int, ...], int]] = {}
+        for state, cost in costs.items():
+            if any(state[j] > capacity[j] for j in others):
+                continue
+            least = max(0, *(state[j] - capacity[j] for j in members))
+            most = min(by_roles[roles], max(state[j] for j in members), bound - cost)
+            for taken in range(least, most + 1):
+                new = list(state)
+                for j in members:
+                    new[j] = max(new[j] - taken, 0)
+                # Lower bound: every remaining card fills at most width roles
+                rest = max(max(new), -(-sum(new) // width))
+                if cost + taken + rest > bound:
+                    continue
+                key = tuple(new)
+                best = layer.get(key)
+                if best is None or cost + taken < best[0]:
+                    layer[key] = (cost + taken, state, taken)
+        layers.append(layer)
+        costs = {state: entry[0] for state, entry in layer.items()}
+        for state, cost in costs.items():
+            if finishable(state):
+                bound = min(bound, cost + sum(state))
+
+    # Single-role cards fill the rest; states they cannot finish are dropped
+    finished = {
+        state: cost + sum(state) for state, cost in costs.items() if finishable(state)
+    }
+    if not finished:
+        return greedy
+    state = min(finished, key=lambda s: (finished[s], s))
+    if finished[state] >= sum(greedy.values()):
+        return greedy
+    plan = {bits[j]: deficit for j, deficit in enumerate(state) if deficit}
+    for roles, layer in zip(reversed(multi), reversed(layers)):
+        _, state, taken = layer[state]
+        if taken:
+            plan[roles] = taken
+    return plan
+
+
+def _greedy_cover(
+    by_roles: dict[int, int], bits: list[int], deficits: tuple[int, ...]
+) -> dict[int, int]:
+    """Greedy covering: repeatedly take a card of the type that fills the
+    most remaining deficits."""
+    remaining = dict(by_roles)
+    needed = list(deficits)
+    plan: dict[int, int] = {}
+    while True:
+        best, best_gain = None, 0
+        for roles in sorted(remaining):
+            if not remaining[roles]:
+                continue
+            gain = sum(1 for j, bit in enumerate(bits) if roles & bit and needed[j])
+            if gain > best_gain:
+                best, best_gain = roles, gain
+        if best is None:
+            return plan
+        remaining[best] -= 1
+        plan[best] = plan.get(best, 0) + 1
+        for j, bit in enumerate(bits):
+            if best & bit and needed[j]:
+                needed[j] -= 1
+
+
+def role_bit_targets(pool: CardPool, role_targets: Mapping[str, int]) -> dict[int, int]:
+    """Role targets keyed by the pool's role bits (unknown roles dropped)."""
+    return {
+        1 << pool.role_names.index(name): target
+        for name, target in role_targets.items()
+        if name in pool.role_names
+    }
+
+
+def assign_role_cards(
+    pool: CardPool, candidates: Iterable[int], role_targets: Mapping[str, int]
+) -> list[int]:
+    """The fewest candidates that meet the role targets (see cover_roles).
+
+    Within a role set, candidates are taken in the given order.
+
+    Args:
+        pool: Card pool the positions refer to
+        candidates: Pool positions that may be taken
+        role_targets: Role name to target count
+
+    Returns:
+        Pool positions of the chosen cards, in candidate order
+    """
+    targets = role_bit_targets(pool, role_targets)
+    mask = 0
+    for bit, target in targets.items():
+        if target > 0:
+            mask |= bit
+
+    candidates = list(candidates)
+    by_roles: dict[int, list[int]] = {}
+    for i in candidates:
+        roles = pool.role_bits[i] & mask
+        if roles:
+            by_roles.setdefault(roles, []).append(i)
+
+    plan = cover_roles({roles: len(c) for roles, c in by_roles.items()}, targets)
+    chosen = {i for roles, count in plan.items() for i in by_roles[roles][:count]}
+    return [i for i in candidates if i in chosen]
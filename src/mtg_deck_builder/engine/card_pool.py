@@ -0,0 +1,325 @@
+"""In-memory card pool: a columnar snapshot of a card index.
+
+A CardPool holds the Commander-legal cards of an index as parallel columns
+(typed ``array`` storage for the numeric ones) with packed feature and role
+bitsets, so every deck-building phase runs in memory instead of querying
+DuckDB. Full card dicts are only built for the cards a deck uses.
+
+The pool is a snapshot: changes to the index after loading are not seen.
+"""
+
+from array import array
+from collections.abc import Collection, Iterator, Sequence
+from typing import Any
+
+from ..data.card_index import CARD_COLUMNS, FEATURE_NAMES, CardIndex
+from ..roles.role_engine import FEATURE_BITS, RoleEngine
+
+# Set in feature_bits when the card has a card_features row; cards without
+# one are skipped by the land, role and filler phases (as the SQL joins do)
+HAS_FEATURES = 1 << len(FEATURE_NAMES)
+
+_LAND_ONLY = FEATURE_BITS["is_land_only"]
+_MAX_ROLES = 64
+
+
+class CardRecord:
+    """Read-only view of one card in a CardPool."""
+
+    __slots__ = ("pool", "index")
+
+    def __init__(self, pool: "CardPool", index: int):
+        self.pool = pool
+        self.index = index
+
+    @property
+    def scryfall_id(self) -> str:
+        return self.pool.ids[self.index]
+
+    @property
+    def name(self) -> str:
+        return self.pool.names[self.index]
+
+    @property
+    def cmc(self) -> int:
+        return self.pool.cmc[self.index]
+
+    @property
+    def price(self) -> float:
+        return self.pool.prices[self.index]
+
+    @property
+    def ci_mask(self) -> int:
+        return self.pool.ci_masks[self.index]
+
+    @property
+    def feature_bits(self) -> int:
+        return self.pool.feature_bits[self.index]
+
+    @property
+    def roles(self) -> list[str]:
+        """Names of the roles the card matches."""
+        bits = self.pool.role_bits[self.index]
+        return [name for r, name in enumerate(self.pool.role_names) if bits >> r & 1]
+
+    def to_dict(self) -> dict[str, Any]:
+        """Full card dict, as returned by the index queries."""
+        return self.pool.card(self.index)
+
+    def __repr__(self) -> str:
+        return f"CardRecord({self.name!r})"
+
+
+class CardPool:
+    """Columnar in-memory snapshot of the Commander-legal cards of an index.
+
+    Attributes:
+        ids: Scryfall IDs
+        names: Card names
+        cmc: Mana values
+        prices: USD prices (0.0 when unknown)
+        ci_masks: Color identity masks (see color_identity_mask)
+        feature_bits: Packed features (see pack_features) plus HAS_FEATURES
+        role_bits: Bit r set when the card matches ``role_names[r]``
+        role_names: Roles of the engine the pool was loaded with
+        snapshot_id: Snapshot ID of the index the pool was loaded from (see
+            CardIndex.snapshot_id), or None if unknown
+    """
+
+    __slots__ = (
+        "ids",
+        "names",
+        "cmc",
+        "prices",
+        "ci_masks",
+        "feature_bits",
+        "role_bits",
+        "role_names",
+        "snapshot_id",
+        "_rows",
+        "_by_name",
+        "_by_id",
+        "_fitting",
+        "_candidates",
+    )
+
+    def __init__(
+        self,
+        rows: Sequence[tuple[Any, ...]],
+        feature_bits: Sequence[int],
+        role_engine: RoleEngine,
+        snapshot_id: str | None = None,
+    ):
+        """Build a pool from card rows.
+
+        Args:
+            rows: Card tuples in CARD_COLUMNS order
+            feature_bits: Packed features of each card, with HAS_FEATURES set
+                for cards that have a card_features row
+            role_engine: Role engine whose roles are precomputed per card
+            snapshot_id: Snapshot ID of the index the rows come from
+
+        Raises:
+            ValueError: If the engine defines more than 64 roles
+        """
+        if len(role_engine.compiled) > _MAX_ROLES:
+            raise ValueError(f"CardPool supports at most {_MAX_ROLES} roles")
+
+        columns = list(CARD_COLUMNS)
+        id_col, name_col = columns.index("scryfall_id"), columns.index("name")
+        cmc_col, ci_col = columns.index("cmc"), columns.index("ci_mask")
+        price_col = columns.index("price_usd")
+
+        self.snapshot_id = snapshot_id
+        self._rows = list(rows)
+        self.ids = [row[id_col] for row in self._rows]
+        self.names = [row[name_col] for row in self._rows]
+        self.cmc = array("i", (row[cmc_col] or 0 for row in self._rows))
+        self.prices = array("d", (row[price_col] or 0.0 for row in self._rows))
+        self.ci_masks = array("B", (row[ci_col] for row in self._rows))
+        self.feature_bits = array("H", feature_bits)
+
+        self.role_names = list(role_engine.compiled)
+        role_bits = [0] * len(self._rows)
+        for r, name in enumerate(self.role_names):
+            matches = role_engine.match_many(self.feature_bits, name)
+            for i, matched in enumerate(matches):
+                if matched:
+                    role_bits[i] |= 1 << r
+        self.role_bits = array("Q", role_bits)
+
+        self._by_name: dict[str, list[int]] = {}
+        for i, name in enumerate(self.names):
+            self._by_name.setdefault(name, []).append(i)
+        self._by_id = {scryfall_id: i for i, scryfall_id in enumerate(self.ids)}
+        self._fitting: dict[int, list[int]] = {}
+        self._candidates: dict[tuple[int, str | None, bool | None], list[int]] = {}
+
+    @classmethod
+    def load(cls, index: CardIndex, role_engine: RoleEngine) -> "CardPool":
+        """Load the Commander-legal cards of an index with one query.
+
+        Args:
+            index: Card index to snapshot
+            role_engine: Role engine whose roles are precomputed per card
+
+        Returns:
+            CardPool in index storage order
+        """
+        # Read before the rows: a write in between leaves an older ID, which
+        # current builds never share
+        snapshot_id = index.snapshot_id()
+        select = ", ".join(f"c.{name}" for name in CARD_COLUMNS)
+        bitset = " | ".join(
+            f"(cf.{name}::INTEGER << {i})" for i, name in enumerate(FEATURE_NAMES)
+        )
+        rows = index.conn.execute(
+            f"""
+            SELECT {select},
+                CASE WHEN cf.scryfall_id IS NULL THEN 0
+                ELSE ({bitset}) | {HAS_FEATURES} END
+            FROM cards c
+            LEFT JOIN card_features cf ON c.scryfall_id = cf.scryfall_id
+            WHERE c.commander_legal = true
+            ORDER BY c.rowid
+            """
+        ).fetchall()
+        return cls(
+            [row[:-1] for row in rows],
+            [row[-1] for row in rows],
+            role_engine,
+            snapshot_id,
+        )
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __getitem__(self, index: int) -> CardRecord:
+        if not -len(self._rows) <= index < len(self._rows):
+            raise IndexError("CardPool index out of range")
+        return CardRecord(self, index % len(self._rows))
+
+    def __iter__(self) -> Iterator[CardRecord]:
+        return (CardRecord(self, i) for i in range(len(self._rows)))
+
+    def card(self, index: int) -> dict[str, Any]:
+        """Full card dict of the card at a pool position."""
+        return dict(zip(CARD_COLUMNS, self._rows[index]))
+
+    def position(self, scryfall_id: str) -> int | None:
+        """Pool position of a card by Scryfall ID, or None if not in the pool."""
+        return self._by_id.get(scryfall_id)
+
+    def find(self, name: str, ci_mask: int, exact: bool = False) -> int | None:
+        """Position of the first card with a name that fits a color identity.
+
+        Args:
+            name: Card name
+            ci_mask: Deck color identity mask
+            exact: Require the card's color identity to equal the mask
+                instead of being a subset of it
+
+        Returns:
+            Pool position, or None if no card matches
+        """
+        for i in self._by_name.get(name, ()):
+            card_mask = self.ci_masks[i]
+            if card_mask == ci_mask if exact else not card_mask & ~ci_mask:
+                return i
+        return None
+
+    def fitting(self, ci_mask: int) -> list[int]:
+        """Positions of the cards within a color identity, in pool order.
+
+        Computed once per mask and cached, so decks of the same colors share
+        the scan (see release).
+        """
+        positions = self._fitting.get(ci_mask)
+        if positions is None:
+            outside = ~ci_mask
+            positions = [
+                i for i, mask in enumerate(self.ci_masks) if not mask & outside
+            ]
+            self._fitting[ci_mask] = positions
+        return positions
+
+    def candidates(
+        self, ci_mask: int, role: str | None = None, land: bool | None = None
+    ) -> list[int]:
+        """Positions of the cards with features that fit a filter, in pool order.
+
+        Computed once per filter and cached, so decks of the same colors
+        share their candidate lists (see release).
+
+        Args:
+            ci_mask: Deck color identity mask
+            role: Only cards matching this role (none for an unknown role)
+            land: Only land-only cards (True) or only other cards (False)
+
+        Returns:
+            Pool positions of the candidates
+        """
+        key = (ci_mask, role, land)
+        positions = self._candidates.get(key)
+        if positions is not None:
+            return positions
+
+        if role is not None and role not in self.role_names:
+            positions = []
+        else:
+            required = HAS_FEATURES | (_LAND_ONLY if land else 0)
+            checked = required | (_LAND_ONLY if land is not None else 0)
+            role_bit = 0 if role is None else 1 << self.role_names.index(role)
+            feature_bits, role_bits = self.feature_bits, self.role_bits
+            positions = [
+                i
+                for i in self.fitting(ci_mask)
+                if feature_bits[i] & checked == required
+                and (not role_bit or role_bits[i] & role_bit)
+            ]
+        self._candidates[key] = positions
+        return positions
+
+    def release(self, ci_mask: int) -> None:
+        """Drop the cached position lists of a color identity."""
+        self._fitting.pop(ci_mask, None)
+        for key in [key for key in self._candidates if key[0] == ci_mask]:
+            del self._candidates[key]
+
+    def select(
+        self,
+        ci_mask: int,
+        limit: int,
+        *,
+        role: str | None = None,
+        land: bool | None = None,
+        exclude_names: Collection[str] = (),
+        exclude_ids: Collection[str] = (),
+    ) -> list[int]:
+        """Select cards with features within a color identity, in pool order.
+
+        Args:
+            ci_mask: Deck color identity mask
+            limit: Maximum number of cards
+            role: Only cards matching this role (none for an unknown role)
+            land: Only land-only cards (True) or only other cards (False)
+            exclude_names: Card names to leave out
+            exclude_ids: Scryfall IDs to leave out
+
+        Returns:
+            Pool positions of the selected cards
+        """
+        if limit <= 0:
+            return []
+
+        names, ids = self.names, self.ids
+        selected: list[int] = []
+        for i in self.candidates(ci_mask, role, land):
+            if exclude_names and names[i] in exclude_names:
+                continue
+            if exclude_ids and ids[i] in exclude_ids:
+                continue
+            selected.append(i)
+            if len(selected) >= limit:
+                break
+        return selected
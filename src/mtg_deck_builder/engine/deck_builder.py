@@ -1,26 +1,69 @@
 """Deck assembly engine: builds decks from DeckBrief."""
 
+from collections.abc import Iterable, Sequence
+from dataclasses import asdict, replace
 from typing import Any
 
-from ..data.card_index import CardIndex
+from .. import __version__
+from ..cache.build_cache import BuildCache, build_key
+from ..data.card_index import CardIndex, color_identity_mask
 
 # from ..features.extract import extract_features
+from ..roles.materialize import fresh_roles
 from ..roles.role_engine import RoleEngine
+from .assignment import assign_role_cards, cover_roles, role_bit_targets
+from .card_pool import CardPool
 from .deckbrief import DeckBrief
+from .optimizer import DeckOptimizer
+from .scoring import DeckScorer
+
+DECK_SIZE = 99
+# Minimum land count for Commander
+LAND_TARGET = 37
+# Lowest-scoring picks of a deck variant excluded from the next variants
+VARIANT_DROP = 5
 
 
 class DeckBuilder:
     """Builds Commander decks from DeckBrief specifications."""
 
-    def __init__(self, card_index: CardIndex, role_engine: RoleEngine):
+    def __init__(
+        self,
+        card_index: CardIndex,
+        role_engine: RoleEngine,
+        pool: CardPool | None = None,
+        scoring: bool = False,
+        optimizer: DeckOptimizer | None = None,
+        assign_roles: bool = False,
+        cache: BuildCache | None = None,
+    ):
         """Initialize the deck builder.
 
         Args:
             card_index: DuckDB card index
             role_engine: Role composition engine
+            pool: In-memory snapshot of card_index loaded with role_engine
+                (see CardPool.load); when given, every phase runs against it
+                instead of querying DuckDB
+            scoring: Pick spells one at a time by score (see DeckScorer)
+                instead of filling role buckets with the first matches; a
+                pool is loaded on the first build if none is given
+            optimizer: Local search run on every built deck (see
+                DeckOptimizer); also needs a pool, loaded as for scoring
+            assign_roles: Meet the role targets with the fewest cards,
+                counting a card toward every role it fills (see
+                assign_role_cards), before the remaining slots are filled;
+                also needs a pool, loaded as for scoring
+            cache: Cache of build_deck results, keyed by the index snapshot,
+                the role definitions, these options and the brief
         """
         self.card_index = card_index
         self.role_engine = role_engine
+        self.pool = pool
+        self.scoring = scoring
+        self.optimizer = optimizer
+        self.assign_roles = assign_roles
+        self.cache = cache
 
     def build_deck(self, brief: DeckBrief) -> dict[str, Any]:
         """Build a deck from a DeckBrief.
@@ -34,9 +77,70 @@ class DeckBuilder:
                 - commander: Commander card
                 - role_counts: Dictionary of role name to count
                 - explanation: List of explanation strings
+                - scores: With scoring, the score breakdown of each picked
+                  spell (see ScoreBreakdown.to_dict) plus its name
+                - optimization: With an optimizer, the search outcome and
+                  its swaps; role_counts then count every deck card with
+                  the role
+              With assign_roles, role_counts count every assigned card with
+              the role as well.
+        """
+        key = self._cache_key(brief)
+        if key is not None:
+            assert self.cache is not None
+            cached = self.cache.get(key[0])
+            if cached is not None:
+                return cached
+
+        if self.scoring:
+            result = self._build_scored_deck(brief)
+        else:
+            result = self._build_filled_deck(brief)
+        if self.optimizer is not None:
+            result = self._optimize(brief, result)
+
+        if key is not None:
+            assert self.cache is not None
+            self.cache.put(*key, result)
+        return result
+
+    def _cache_key(self, brief: DeckBrief) -> tuple[str, str] | None:
+        """Cache key of a build and the index snapshot it belongs to, or None
+        without a cache or an index snapshot ID.
+
+        Builds from a pool use the snapshot the pool was loaded from, so a
+        pool loaded before an index rebuild never stores its decks under the
+        rebuilt index's snapshot.
         """
+        if self.cache is None:
+            return None
+        if self.pool is not None:
+            snapshot = self.pool.snapshot_id
+        else:
+            snapshot = self.card_index.snapshot_id()
+        if snapshot is None:
+            return None
+        key = build_key(
+            version=__version__,
+            snapshot=snapshot,
+            roles=self.role_engine.role_fingerprints(),
+            options={
+                "scoring": self.scoring,
+                "assign_roles": self.assign_roles,
+                "optimizer": (
+                    None if self.optimizer is None else asdict(self.optimizer)
+                ),
+            },
+            brief=brief.canonical(),
+        )
+        return key, snapshot
+
+    def _build_filled_deck(self, brief: DeckBrief) -> dict[str, Any]:
+        """Build a deck filling role buckets with the first matches."""
         deck: list[dict[str, Any]] = []
         explanation: list[str] = []
+        if self.assign_roles:
+            self._load_pool()
 
         # 1. Add commander
         commander = self._get_commander(brief.commander, brief.color_identity)
@@ -46,14 +150,23 @@ class DeckBuilder:
         explanation.append(f"Added commander: {commander['name']}")
 
         # 2. Add lands (minimum target: ~37 for Commander)
-        land_target = 37
-        lands = self._get_lands(brief.color_identity, land_target, brief.exclusions)
+        lands = self._get_lands(brief.color_identity, LAND_TARGET, brief.exclusions)
         deck.extend(lands)
         explanation.append(f"Added {len(lands)} lands")
 
         # 3. Add role buckets (in fixed priority order)
         role_priority = ["ramp", "card_draw", "interaction", "finisher"]
         role_counts: dict[str, int] = {}
+        materialized = (
+            fresh_roles(self.card_index, self.role_engine)
+            if self.pool is None
+            else set()
+        )
+
+        if self.assign_roles:
+            role_counts = self._assign_role_cards(brief, deck, explanation)
+            # Every role target is met (as far as the pool allows) already
+            role_priority = []
 
         for role_name in role_priority:
             if role_name not in brief.role_targets:
@@ -65,7 +178,12 @@ class DeckBuilder:
             if current_count < target_count:
                 needed = target_count - current_count
                 candidates = self._get_role_candidates(
-                    role_name, brief.color_identity, needed, deck, brief.exclusions
+                    role_name,
+                    brief.color_identity,
+                    needed,
+                    deck,
+                    brief.exclusions,
+                    materialized=role_name in materialized,
                 )
                 deck.extend(candidates)
                 role_counts[role_name] = len(candidates)
@@ -74,7 +192,7 @@ class DeckBuilder:
                 )
 
         # 4. Fill to 99 if needed
-        remaining = 99 - len(deck)
+        remaining = DECK_SIZE - len(deck)
         if remaining > 0:
             fillers = self._get_filler_cards(
                 brief.color_identity, remaining, deck, brief.exclusions
@@ -90,9 +208,17 @@ class DeckBuilder:
                     deck.append(card)
                     explanation.append(f"Added must-include: {card_name}")
 
-        # Trim to exactly 99 if over
-        if len(deck) > 99:
-            deck = deck[:99]
+        # Trim to exactly 99 if over, dropping the last cards added but
+        # never the commander or a must-include
+        if len(deck) > DECK_SIZE:
+            excess = len(deck) - DECK_SIZE
+            must_includes = set(brief.must_includes)
+            for position in range(len(deck) - 1, 0, -1):
+                if deck[position]["name"] not in must_includes:
+                    del deck[position]
+                    excess -= 1
+                    if not excess:
+                        break
             explanation.append("Trimmed deck to exactly 99 cards")
 
         return {
@@ -102,65 +228,454 @@ class DeckBuilder:
             "explanation": explanation,
         }
 
+    def build_decks(
+        self, briefs: Sequence[DeckBrief], raise_errors: bool = True
+    ) -> list[dict[str, Any]]:
+        """Build many decks against one shared in-memory card pool.
+
+        Briefs are grouped by color identity so each group's candidate lists
+        are computed once, shared by its decks, and released afterwards.
+
+        Args:
+            briefs: DeckBrief specifications
+            raise_errors: Raise on a brief that cannot be built; otherwise its
+                result is ``{"error": message}``
+
+        Returns:
+            One build_deck result per brief, in input order
+
+        Raises:
+            ValueError: If a commander is not found and raise_errors is set
+        """
+        pool = self.pool
+        if pool is None:
+            pool = CardPool.load(self.card_index, self.role_engine)
+        builder = DeckBuilder(
+            self.card_index,
+            self.role_engine,
+            pool,
+            self.scoring,
+            self.optimizer,
+            self.assign_roles,
+            self.cache,
+        )
+
+        groups: dict[int, list[int]] = {}
+        for position, brief in enumerate(briefs):
+            mask = color_identity_mask(brief.color_identity)
+            groups.setdefault(mask, []).append(position)
+
+        results: list[dict[str, Any]] = [{} for _ in briefs]
+        for mask, positions in groups.items():
+            for position in positions:
+                try:
+                    results[position] = builder.build_deck(briefs[position])
+                except ValueError as e:
+                    if raise_errors:
+                        raise
+                    results[position] = {"error": str(e)}
+            pool.release(mask)
+        return results
+
+    def build_deck_variants(
+        self, brief: DeckBrief, k: int, drop: int = VARIANT_DROP
+    ) -> list[dict[str, Any]]:
+        """Build up to k distinct high-scoring decks for one brief.
+
+        Variants are always picked by score (as with scoring). The commander,
+        lands and grouped candidates are set up once and shared by every
+        variant; each variant then excludes the drop lowest-scoring picks of
+        all earlier variants, so it differs from each of them. With an
+        optimizer, every variant is optimized as in build_deck.
+
+        Args:
+            brief: DeckBrief specification
+            k: Number of variants
+            drop: Lowest-scoring picks of each variant excluded from the
+                next variants
+
+        Returns:
+            build_deck results, the first being the plain scored build, each
+            with "variant" (its rank from 0) and "excluded" (names of the
+            cards excluded for it); fewer than k when a variant has no
+            scored picks left to exclude
+
+        Raises:
+            ValueError: If k or drop is below 1 or the commander is not found
+        """
+        if k < 1 or drop < 1:
+            raise ValueError("k and drop must be at least 1")
+        pool = self._load_pool()
+        start = self._start_scored_deck(brief)
+
+        variants: list[dict[str, Any]] = []
+        excluded: list[int] = []
+        for variant in range(k):
+            result = self._build_scored_deck(brief, start, excluded)
+            names = [pool.names[i] for i in excluded]
+            if self.optimizer is not None:
+                result = self._optimize(
+                    replace(brief, exclusions=[*brief.exclusions, *names]), result
+                )
+            result["variant"] = variant
+            result["excluded"] = names
+            variants.append(result)
+
+            # Marginal picks: the scored picks still in the deck, lowest first
+            scores = {entry["name"]: entry["score"] for entry in result["scores"]}
+            picks = [
+                i
+                for i in (pool.position(card["scryfall_id"]) for card in result["deck"])
+                if i is not None and pool.names[i] in scores
+            ]
+            if not picks:
+                break
+            excluded.extend(
+                sorted(picks, key=lambda i: (scores[pool.names[i]], i))[:drop]
+            )
+        return variants
+
+    def _start_scored_deck(
+        self, brief: DeckBrief
+    ) -> tuple[list[int], DeckScorer, list[str]]:
+        """Commander and lands of a scored build, a scorer over the spell
+        candidates, and the explanation so far."""
+        pool = self._load_pool()
+        ci_mask = color_identity_mask(brief.color_identity)
+        explanation: list[str] = []
+
+        commander = pool.find(brief.commander, ci_mask, exact=True)
+        if commander is None:
+            raise ValueError(f"Commander '{brief.commander}' not found or illegal")
+        picked = [commander]
+        explanation.append(f"Added commander: {pool.names[commander]}")
+
+        exclusions = set(brief.exclusions)
+        lands = pool.select(ci_mask, LAND_TARGET, land=True, exclude_names=exclusions)
+        picked.extend(lands)
+        explanation.append(f"Added {len(lands)} lands")
+
+        scorer = DeckScorer(
+            pool,
+            (
+                i
+                for i in pool.candidates(ci_mask, land=False)
+                if i != commander and pool.names[i] not in exclusions
+            ),
+            brief.role_targets,
+            slots=DECK_SIZE - len(picked),
+            soft_budget=brief.soft_budget,
+            spent=sum(pool.prices[i] for i in picked),
+        )
+        return picked, scorer, explanation
+
+    def _build_scored_deck(
+        self,
+        brief: DeckBrief,
+        start: tuple[list[int], DeckScorer, list[str]] | None = None,
+        excluded: Iterable[int] = (),
+    ) -> dict[str, Any]:
+        """Build a deck picking each spell by score (see build_deck).
+
+        Commander, lands and must-includes are added first; every remaining
+        slot then takes the highest-scoring candidate for the deck so far.
+        With assign_roles, the role sets that meet the remaining role targets
+        with the fewest cards are picked first, each by the same score.
+
+        Args:
+            brief: DeckBrief specification
+            start: _start_scored_deck result for the brief to build from; it
+                is copied, not modified
+            excluded: Pool positions of further candidates not to pick
+        """
+        pool = self._load_pool()
+        ci_mask = color_identity_mask(brief.color_identity)
+        if start is None:
+            picked, scorer, explanation = self._start_scored_deck(brief)
+        else:
+            picked, scorer, explanation = (
+                list(start[0]),
+                start[1].copy(),
+                list(start[2]),
+            )
+        commander = picked[0]
+        excluded = list(excluded)
+        for i in excluded:
+            scorer.exclude(i)
+        if excluded:
+            explanation.append(f"Excluded {len(excluded)} picks of earlier variants")
+
+        for card_name in brief.must_includes:
+            if any(pool.names[i] == card_name for i in picked):
+                continue
+            i = pool.find(card_name, ci_mask)
+            if i is not None:
+                scorer.add(i)
+                picked.append(i)
+                explanation.append(f"Added must-include: {card_name}")
+
+        scores: list[dict[str, Any]] = []
+        plan: list[int] = []
+        role_mask = 0
+        if self.assign_roles:
+            plan, role_mask = self._plan_roles(
+                scorer, brief.role_targets, {*picked, *excluded}
+            )
+            explanation.append(f"Assigning {len(plan)} cards to role targets")
+        while len(picked) < DECK_SIZE:
+            i = scorer.best(plan.pop(0), role_mask) if plan else scorer.best()
+            if i is None:
+                break
+            breakdown = scorer.breakdown(i)
+            scorer.add(i)
+            picked.append(i)
+            scores.append({"name": pool.names[i], **breakdown.to_dict()})
+            roles = f" [{', '.join(breakdown.roles)}]" if breakdown.roles else ""
+            explanation.append(
+                f"Added {pool.names[i]}: score {breakdown.score:.2f} "
+                f"(roles +{breakdown.role_deficit_bonus:.2f}{roles}, "
+                f"curve +{breakdown.curve_bonus:.2f}, "
+                f"budget -{breakdown.budget_penalty:.2f})"
+            )
+
+        return {
+            "deck": [pool.card(i) for i in picked],
+            "commander": pool.card(commander),
+            "role_counts": self._role_counts(picked[1:], brief.role_targets),
+            "explanation": explanation,
+            "scores": scores,
+        }
+
+    def _assign_role_cards(
+        self,
+        brief: DeckBrief,
+        deck: list[dict[str, Any]],
+        explanation: list[str],
+    ) -> dict[str, int]:
+        """Add the fewest candidates that meet the role targets to a deck.
+
+        Returns:
+            Role name to the number of added cards with the role
+        """
+        pool = self._load_pool()
+        in_deck = {card["scryfall_id"] for card in deck}
+        exclusions = set(brief.exclusions)
+        candidates = (
+            i
+            for i in pool.candidates(
+                color_identity_mask(brief.color_identity), land=False
+            )
+            if pool.ids[i] not in in_deck and pool.names[i] not in exclusions
+        )
+        chosen = assign_role_cards(pool, candidates, brief.role_targets)
+        deck.extend(pool.card(i) for i in chosen)
+        role_counts = self._role_counts(chosen, brief.role_targets)
+        explanation.append(
+            f"Assigned {len(chosen)} cards to roles "
+            f"({', '.join(f'{n} {c}' for n, c in role_counts.items())})"
+        )
+        return role_counts
+
+    def _plan_roles(
+        self, scorer: DeckScorer, role_targets: dict[str, int], taken: set[int]
+    ) -> tuple[list[int], int]:
+        """Role sets of the fewest remaining candidates (those not in taken)
+        that meet the role targets the scorer's deck still misses.
+
+        Returns:
+            One role set per card to pick, and the roles they are made of
+        """
+        pool = self._load_pool()
+        targets = role_bit_targets(
+            pool,
+            {
+                name: target - scorer.role_counts.get(name, 0)
+                for name, target in role_targets.items()
+            },
+        )
+        available: dict[int, int] = {}
+        for i in scorer.candidates:
+            if i not in taken:
+                available[pool.role_bits[i]] = available.get(pool.role_bits[i], 0) + 1
+        plan = cover_roles(available, targets)
+        role_mask = 0
+        for bit, target in targets.items():
+            if target > 0:
+                role_mask |= bit
+        role_sets = [
+            role_bits
+            for role_bits in sorted(plan, key=lambda bits: (-bits.bit_count(), bits))
+            for _ in range(plan[role_bits])
+        ]
+        return role_sets, role_mask
+
+    def _optimize(self, brief: DeckBrief, result: dict[str, Any]) -> dict[str, Any]:
+        """Run the optimizer on a built deck (see build_deck).
+
+        The commander, lands and must-includes stay put; every other spell
+        may be swapped for a candidate the deck could have picked.
+        """
+        assert self.optimizer is not None
+        pool = self._load_pool()
+        ci_mask = color_identity_mask(brief.color_identity)
+        positions = [pool.position(card["scryfall_id"]) for card in result["deck"]]
+
+        spells = pool.candidates(ci_mask, land=False)
+        spell_set = set(spells)
+        in_deck = set(positions)
+        exclusions = set(brief.exclusions)
+        must_includes = set(brief.must_includes)
+        # Deck slots holding spells; slot 0 is the commander
+        added = [slot for slot, i in enumerate(positions) if slot and i in spell_set]
+        added_set = set(added)
+
+        scorer = DeckScorer(
+            pool,
+            (i for i in spells if i not in in_deck and pool.names[i] not in exclusions),
+            brief.role_targets,
+            slots=len(added),
+            soft_budget=brief.soft_budget,
+            spent=sum(
+                pool.prices[i]
+                for slot, i in enumerate(positions)
+                if i is not None and slot not in added_set
+            ),
+        )
+        for slot in added:
+            scorer.add(positions[slot])
+
+        swappable = [
+            slot for slot in added if pool.names[positions[slot]] not in must_includes
+        ]
+        deck = [positions[slot] for slot in swappable]
+        outcome = self.optimizer.optimize(scorer, deck)
+        for slot, i in zip(swappable, deck):
+            positions[slot] = i
+
+        explanation = list(result["explanation"])
+        for swap in outcome.swaps:
+            explanation.append(
+                f"Swapped {pool.names[swap.out]} for {pool.names[swap.into]} "
+                f"(+{swap.gain:.2f})"
+            )
+        explanation.append(
+            f"Optimized with seed {self.optimizer.seed}: {len(outcome.swaps)} "
+            f"swaps, objective {outcome.objective_before:.2f} -> "
+            f"{outcome.objective_after:.2f} ({outcome.stopped})"
+        )
+
+        optimized = dict(result)
+        optimized["deck"] = [
+            card if i is None else pool.card(i)
+            for card, i in zip(result["deck"], positions)
+        ]
+        optimized["role_counts"] = self._role_counts(
+            [i for i in positions[1:] if i is not None], brief.role_targets
+        )
+        optimized["explanation"] = explanation
+        optimized["optimization"] = {
+            "seed": self.optimizer.seed,
+            "objective_before": outcome.objective_before,
+            "objective_after": outcome.objective_after,
+            "iterations": outcome.iterations,
+            "stopped": outcome.stopped,
+            "swaps": [
+                {
+                    "out": pool.names[swap.out],
+                    "in": pool.names[swap.into],
+                    "gain": swap.gain,
+                }
+                for swap in outcome.swaps
+            ],
+        }
+        if "scores" in result:
+            names = {card["name"] for card in optimized["deck"]}
+            optimized["scores"] = [s for s in result["scores"] if s["name"] in names]
+        return optimized
+
+    def _load_pool(self) -> CardPool:
+        """The builder's card pool, loaded from the index on first use."""
+        if self.pool is None:
+            self.pool = CardPool.load(self.card_index, self.role_engine)
+        return self.pool
+
+    def _role_counts(
+        self, positions: Sequence[int], role_targets: dict[str, int]
+    ) -> dict[str, int]:
+        """Number of cards with each targeted role among pool positions."""
+        assert self.pool is not None
+        role_counts = {}
+        for role_name in role_targets:
+            if role_name not in self.pool.role_names:
+                role_counts[role_name] = 0
+                continue
+            bit = 1 << self.pool.role_names.index(role_name)
+            role_counts[role_name] = sum(
+                1 for i in positions if self.pool.role_bits[i] & bit
+            )
+        return role_counts
+
     def _get_commander(
         self, commander_name: str, color_identity: list[str]
     ) -> dict[str, Any] | None:
         """Get the commander card."""
-        # Query for commander by name and color identity
-        query = "SELECT * FROM cards WHERE name = ? AND commander_legal = true"
-        relation = self.card_index.conn.execute(query, (commander_name,))
+        if self.pool is not None:
+            i = self.pool.find(
+                commander_name, color_identity_mask(color_identity), exact=True
+            )
+            return None if i is None else self.pool.card(i)
+
+        # Query for commander by name; its color identity must match exactly
+        query = """
+            SELECT * FROM cards
+            WHERE name = ? AND commander_legal = true AND ci_mask = ?
+        """
+        relation = self.card_index.conn.execute(
+            query, (commander_name, color_identity_mask(color_identity))
+        )
         result = relation.fetchone()
 
         if result:
             columns = [col[0] for col in relation.description]
-            card = dict(zip(columns, result))
-            # Verify color identity matches
-            card_colors = set(card.get("color_identity", []))
-            brief_colors = set(color_identity)
-            if card_colors == brief_colors:
-                return card
+            return dict(zip(columns, result))
         return None
 
     def _get_lands(
         self, color_identity: list[str], target: int, exclusions: list[str]
     ) -> list[dict[str, Any]]:
         """Get land cards."""
-        # Query for basic lands and lands matching color identity
+        if self.pool is not None:
+            positions = self.pool.select(
+                color_identity_mask(color_identity),
+                target,
+                land=True,
+                exclude_names=set(exclusions),
+            )
+            return [self.pool.card(i) for i in positions]
+
+        # Query for lands within the color identity
         # Join with card_features to check is_land_only
+        query = """
+            SELECT c.* FROM cards c
+            JOIN card_features cf ON c.scryfall_id = cf.scryfall_id
+            WHERE cf.is_land_only = true
+            AND c.commander_legal = true
+            AND (c.ci_mask & ~?) = 0
+        """
+        params: list[Any] = [color_identity_mask(color_identity)]
         if exclusions:
             # Use proper parameterization for IN clause
             placeholders = ",".join("?" * len(exclusions))
-            query = f"""
-                SELECT c.* FROM cards c
-                JOIN card_features cf ON c.scryfall_id = cf.scryfall_id
-                WHERE cf.is_land_only = true
-                AND c.commander_legal = true
-                AND c.name NOT IN ({placeholders})
-                LIMIT ?
-            """
-            params = list(exclusions) + [target]
-        else:
-            query = """
-                SELECT c.* FROM cards c
-                JOIN card_features cf ON c.scryfall_id = cf.scryfall_id
-                WHERE cf.is_land_only = true
-                AND c.commander_legal = true
-                LIMIT ?
-            """
-            params = [target]
+            query += f" AND c.name NOT IN ({placeholders})"
+            params.extend(exclusions)
+        query += " LIMIT ?"
+        params.append(target)
 
         try:
             relation = self.card_index.conn.execute(query, params)
             result = relation.fetchall()
             columns = [col[0] for col in relation.description]
-            lands = [dict(zip(columns, row)) for row in result]
-            # Filter by color identity
-            lands = [
-                land
-                for land in lands
-                if self._card_matches_color_identity(land, color_identity)
-            ]
-            return lands
+            return [dict(zip(columns, row)) for row in result]
         except Exception as e:
             # Return empty list on error rather than crashing
             print(f"Warning: Error fetching lands: {e}")
@@ -173,91 +688,40 @@ class DeckBuilder:
         needed: int,
         current_deck: list[dict[str, Any]],
         exclusions: list[str],
+        materialized: bool = False,
     ) -> list[dict[str, Any]]:
-        """Get candidates for a specific role."""
-        # Get all cards matching the role
-        # Join cards with card_features to filter by role
-        # Use proper parameterization for IN clauses
-        if exclusions and current_deck:
-            exclusion_placeholders = ",".join("?" * len(exclusions))
-            deck_placeholders = ",".join("?" * len(current_deck))
-            query = f"""
-                SELECT c.* FROM cards c
-                JOIN card_features cf ON c.scryfall_id = cf.scryfall_id
-                WHERE c.commander_legal = true
-                AND c.name NOT IN ({exclusion_placeholders})
-                AND c.scryfall_id NOT IN ({deck_placeholders})
-            """
-            params = list(exclusions) + [c["scryfall_id"] for c in current_deck]
-        elif exclusions:
-            exclusion_placeholders = ",".join("?" * len(exclusions))
-            query = f"""
-                SELECT c.* FROM cards c
-                JOIN card_features cf ON c.scryfall_id = cf.scryfall_id
-                WHERE c.commander_legal = true
-                AND c.name NOT IN ({exclusion_placeholders})
-            """
-            params = list(exclusions)
-        elif current_deck:
-            deck_placeholders = ",".join("?" * len(current_deck))
-            query = f"""
-                SELECT c.* FROM cards c
-                JOIN card_features cf ON c.scryfall_id = cf.scryfall_id
-                WHERE c.commander_legal = true
-                AND c.scryfall_id NOT IN ({deck_placeholders})
-            """
-            params = [c["scryfall_id"] for c in current_deck]
-        else:
-            query = """
-                SELECT c.* FROM cards c
-                JOIN card_features cf ON c.scryfall_id = cf.scryfall_id
-                WHERE c.commander_legal = true
-            """
-            params = []
+        """Get candidates for a specific role.
 
+        The role filter, exclusions and limit are pushed down into one
+        DuckDB query, so only the chosen cards are fetched. Materialized
+        roles are looked up in card_roles instead of evaluated per card.
+        """
+        if self.pool is not None:
+            positions = self.pool.select(
+                color_identity_mask(color_identity),
+                needed,
+                role=role_name,
+                exclude_names=set(exclusions),
+                exclude_ids={c["scryfall_id"] for c in current_deck},
+            )
+            return [self.pool.card(i) for i in positions]
+
+        if materialized:
+            predicate = CardIndex.materialized_role_predicate(role_name)
+        else:
+            predicate = self.role_engine.role_predicate(role_name)
         try:
-            relation = self.card_index.conn.execute(query, params)
-            result = relation.fetchall()
-            columns = [col[0] for col in relation.description]
-            all_cards = [dict(zip(columns, row)) for row in result]
+            return self.card_index.query_role(
+                predicate,
+                color_identity_mask(color_identity),
+                exclusions,
+                limit=needed,
+                exclude_ids=[c["scryfall_id"] for c in current_deck],
+            )
         except Exception as e:
             print(f"Warning: Error fetching role candidates: {e}")
             return []
 
-        # Filter by role using role engine
-        # Need to get features for each card
-        candidates = []
-        for card in all_cards:
-            try:
-                # Get features from card_features table
-                feature_query = "SELECT * FROM card_features WHERE scryfall_id = ?"
-                feature_relation = self.card_index.conn.execute(
-                    feature_query, (card["scryfall_id"],)
-                )
-                feature_row = feature_relation.fetchone()
-
-                if feature_row:
-                    feature_cols = [col[0] for col in feature_relation.description]
-                    features_dict = dict(zip(feature_cols, feature_row))
-                    # Convert to boolean dict (excluding scryfall_id)
-                    features = {
-                        k: bool(v)
-                        for k, v in features_dict.items()
-                        if k != "scryfall_id"
-                    }
-
-                    if self.role_engine.card_matches_role(features, role_name):
-                        # Check color identity
-                        if self._card_matches_color_identity(card, color_identity):
-                            candidates.append(card)
-                            if len(candidates) >= needed:
-                                break
-            except Exception as e:
-                print(f"Warning: Error fetching features for card {card['name']}: {e}")
-                continue
-
-        return candidates
-
     def _get_filler_cards(
         self,
         color_identity: list[str],
@@ -266,60 +730,61 @@ class DeckBuilder:
         exclusions: list[str],
     ) -> list[dict[str, Any]]:
         """Get filler cards to reach 99."""
-        # Simple filler: any legal card not already in deck
-        # Join with card_features to exclude lands
-        used_ids = {c["scryfall_id"] for c in current_deck}
-        excluded_names = set(exclusions)
+        if self.pool is not None:
+            positions = self.pool.select(
+                color_identity_mask(color_identity),
+                needed,
+                land=False,
+                exclude_names=set(exclusions),
+                exclude_ids={c["scryfall_id"] for c in current_deck},
+            )
+            return [self.pool.card(i) for i in positions]
 
+        # Simple filler: any legal card within the color identity not already
+        # in deck; join with card_features to exclude lands
         query = """
             SELECT c.* FROM cards c
             JOIN card_features cf ON c.scryfall_id = cf.scryfall_id
             WHERE c.commander_legal = true
             AND cf.is_land_only = false
+            AND (c.ci_mask & ~?) = 0
         """
-        params = []
+        params: list[Any] = [color_identity_mask(color_identity)]
 
         if exclusions:
             placeholders = ",".join("?" * len(exclusions))
             query += f" AND c.name NOT IN ({placeholders})"
             params.extend(exclusions)
+        if current_deck:
+            placeholders = ",".join("?" * len(current_deck))
+            query += f" AND c.scryfall_id NOT IN ({placeholders})"
+            params.extend(c["scryfall_id"] for c in current_deck)
+        query += " LIMIT ?"
+        params.append(needed)
 
         relation = self.card_index.conn.execute(query, params)
         result = relation.fetchall()
         columns = [col[0] for col in relation.description]
-        all_fillers = [dict(zip(columns, row)) for row in result]
-
-        # Filter by color identity and not used
-        fillers = [
-            card
-            for card in all_fillers
-            if self._card_matches_color_identity(card, color_identity)
-            and card["scryfall_id"] not in used_ids
-            and card["name"] not in excluded_names
-        ]
-
-        return fillers[:needed]
+        return [dict(zip(columns, row)) for row in result]
 
     def _get_card_by_name(
         self, card_name: str, color_identity: list[str]
     ) -> dict[str, Any] | None:
         """Get a card by name."""
-        query = "SELECT * FROM cards WHERE name = ? AND commander_legal = true"
-        relation = self.card_index.conn.execute(query, (card_name,))
+        if self.pool is not None:
+            i = self.pool.find(card_name, color_identity_mask(color_identity))
+            return None if i is None else self.pool.card(i)
+
+        query = """
+            SELECT * FROM cards
+            WHERE name = ? AND commander_legal = true AND (ci_mask & ~?) = 0
+        """
+        relation = self.card_index.conn.execute(
+            query, (card_name, color_identity_mask(color_identity))
+        )
         result = relation.fetchone()
 
         if result:
             columns = [col[0] for col in relation.description]
-            card = dict(zip(columns, result))
-            # Check color identity
-            if self._card_matches_color_identity(card, color_identity):
-                return card
+            return dict(zip(columns, result))
         return None
-
-    def _card_matches_color_identity(
-        self, card: dict[str, Any], deck_color_identity: list[str]
-    ) -> bool:
-        """Check if a card's color identity is a subset of the deck's color identity."""
-        card_ci = set(card.get("color_identity", []))
-        deck_ci = set(deck_color_identity)
-        return card_ci.issubset(deck_ci)
@@ -1,6 +1,7 @@
 """DeckBrief: minimal required inputs for deck building."""
 
 from dataclasses import dataclass, field
+from typing import Any
 
 
 @dataclass
@@ -22,3 +23,19 @@ class DeckBrief:
     soft_budget: int | None = None
     exclusions: list[str] = field(default_factory=list)
     must_includes: list[str] = field(default_factory=list)
+
+    def canonical(self) -> dict[str, Any]:
+        """JSON-ready form of the brief in which equivalent briefs are equal.
+
+        Color identity and exclusions are order-insensitive sets. The order
+        of role targets (which orders role_counts) and of must_includes
+        (added in that order) is kept.
+        """
+        return {
+            "commander": self.commander,
+            "color_identity": sorted(set(self.color_identity)),
+            "role_targets": [[role, n] for role, n in self.role_targets.items()],
+            "soft_budget": self.soft_budget,
+            "exclusions": sorted(set(self.exclusions)),
+            "must_includes": list(self.must_includes),
+        }
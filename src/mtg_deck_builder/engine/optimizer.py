@@ -0,0 +1,133 @@
+"""Deck optimizer: seeded swap-based local search over a built deck.
+
+Starting from an assembled deck, the optimizer repeatedly swaps a deck spell
+for a candidate when that raises DeckScorer.objective, e.g. trading a card
+that overshoots one role for one that fills another. Each swap is evaluated
+with DeckScorer.swap_delta in constant time.
+"""
+
+import random
+import time
+from dataclasses import dataclass, field
+
+from .scoring import DeckScorer
+
+# Minimum objective gain of a swap, so float noise never causes swap cycles
+_MIN_GAIN = 1e-9
+
+
+@dataclass(frozen=True)
+class Swap:
+    """One accepted swap.
+
+    Attributes:
+        out: Pool position of the card taken out
+        into: Pool position of the card put in
+        gain: Objective gain of the swap
+    """
+
+    out: int
+    into: int
+    gain: float
+
+
+@dataclass(frozen=True)
+class OptimizationResult:
+    """Outcome of DeckOptimizer.optimize.
+
+    Attributes:
+        objective_before: Objective of the starting deck
+        objective_after: Objective of the optimized deck
+        iterations: Swaps evaluated
+        stopped: Why the search ended: "converged" (no improving swap left),
+            "iterations" or "time"
+        swaps: Accepted swaps, in order
+    """
+
+    objective_before: float
+    objective_after: float
+    iterations: int
+    stopped: str
+    swaps: list[Swap] = field(default_factory=list)
+
+
+@dataclass(frozen=True)
+class DeckOptimizer:
+    """Swap-based local search with a fixed seed and a search budget.
+
+    Each round visits the deck slots in a seeded random order and swaps each
+    slot's card for the best improving candidate, until a round makes no
+    swap or the budget runs out. Candidates are the best card of each
+    (roles, curve bin) group of the scorer, as any other card of a group
+    can only be worse.
+
+    The same deck, candidates and seed give the same swaps as long as the
+    iteration budget, not the wall-clock budget, ends the search; the time
+    budget only guards slow machines.
+
+    Attributes:
+        seed: Random seed for the slot and candidate orders
+        max_iterations: Maximum number of swaps evaluated
+        time_budget: Maximum search time in seconds
+    """
+
+    seed: int = 0
+    max_iterations: int = 50_000
+    time_budget: float = 2.0
+
+    def optimize(self, scorer: DeckScorer, deck: list[int]) -> OptimizationResult:
+        """Improve a deck in place.
+
+        Args:
+            scorer: Scorer to which every card of the deck has been added;
+                it is updated with the accepted swaps
+            deck: Pool positions of the swappable cards (cards added to the
+                scorer but missing here, e.g. must-includes, stay put)
+
+        Returns:
+            The search outcome, including the accepted swaps
+        """
+        rng = random.Random(self.seed)
+        deadline = time.perf_counter() + self.time_budget
+        before = scorer.objective()
+        swaps: list[Swap] = []
+        iterations = 0
+        stopped = "converged"
+
+        improved = True
+        while improved and stopped == "converged":
+            improved = False
+            slots = list(range(len(deck)))
+            rng.shuffle(slots)
+            for slot in slots:
+                if iterations >= self.max_iterations:
+                    stopped = "iterations"
+                    break
+                if time.perf_counter() > deadline:
+                    stopped = "time"
+                    break
+
+                heads = scorer.heads()
+                rng.shuffle(heads)
+                heads = heads[: self.max_iterations - iterations]
+                iterations += len(heads)
+
+                out = deck[slot]
+                best, best_gain = None, _MIN_GAIN
+                for candidate in heads:
+                    gain = scorer.swap_delta(out, candidate)
+                    if gain > best_gain:
+                        best, best_gain = candidate, gain
+                if best is not None:
+                    scorer.swap(out, best)
+                    deck[slot] = best
+                    swaps.append(Swap(out, best, best_gain))
+                    improved = True
+
+        return OptimizationResult(
+            objective_before=before,
+            objective_after=scorer.objective(),
+            iterations=iterations,
+            stopped=stopped,
+            swaps=swaps,
+        )
@@ -0,0 +1,409 @@
+"""Deck scoring: role deficit bonus + curve bonus - budget penalty.
+
+Implements the V1 score of docs/plan.md §5.3 over the columns of a CardPool.
+A candidate's score only depends on the targeted roles it fills, its coarse
+curve bin and its price, so candidates are grouped by (roles, bin) and each
+group is kept sorted by price. Scoring every candidate for a pick then costs
+one evaluation per group, and adding a card only re-scores the groups that
+share a role or the bin with it.
+
+The same terms summed over a whole deck give its objective (see
+DeckScorer.objective), whose change for a swap only depends on the two cards
+involved, so local search can evaluate a swap in constant time.
+"""
+
+import copy
+from array import array
+from bisect import bisect_left
+from math import ceil
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from typing import Any
+
+from .card_pool import CardPool
+
+# Highest mana value of each coarse curve bin; the last bin is open-ended
+CURVE_BINS = (1, 2, 3, 4, 5)
+# Share of the spell slots each bin should take (0-1, 2, 3, 4, 5, 6+)
+CURVE_SHARES = (0.12, 0.2, 0.22, 0.18, 0.14, 0.14)
+
+# Each role still short of its target is worth at least ROLE_WEIGHT, so a
+# card filling a deficit outscores any card that only fits the curve
+ROLE_WEIGHT = 10.0
+CURVE_WEIGHT = 3.0
+BUDGET_WEIGHT = 5.0
+
+
+def curve_bin(cmc: int) -> int:
+    """Coarse curve bin of a mana value (index into CURVE_SHARES)."""
+    return bisect_left(CURVE_BINS, cmc)
+
+
+def _role_value(count: int, target: int) -> float:
+    """Sum of the role deficit bonuses of the first ``count`` cards of a role."""
+    n = min(count, target)
+    return ROLE_WEIGHT * (n + (n * target - n * (n - 1) / 2) / target)
+
+
+def _curve_value(count: int, target: float) -> float:
+    """Sum of the curve bonuses of the first ``count`` cards of a bin."""
+    n = min(count, ceil(target))
+    return CURVE_WEIGHT * (n * target - n * (n - 1) / 2) / target if n else 0.0
+
+
+@dataclass(frozen=True)
+class ScoreBreakdown:
+    """Components of a card's score, as used in explanations.
+
+    Attributes:
+        role_deficit_bonus: Bonus for the targeted roles still short of their
+            target that the card fills
+        curve_bonus: Bonus for filling a curve bin below its share
+        budget_penalty: Penalty for the price above the per-slot budget
+        roles: Roles in deficit that the card fills
+    """
+
+    role_deficit_bonus: float
+    curve_bonus: float
+    budget_penalty: float
+    roles: tuple[str, ...] = ()
+
+    @property
+    def score(self) -> float:
+        return self.role_deficit_bonus + self.curve_bonus - self.budget_penalty
+
+    def to_dict(self) -> dict[str, Any]:
+        """Breakdown as a JSON-serialisable dict, including the score."""
+        return {
+            "score": self.score,
+            "role_deficit_bonus": self.role_deficit_bonus,
+            "curve_bonus": self.curve_bonus,
+            "budget_penalty": self.budget_penalty,
+            "roles": list(self.roles),
+        }
+
+
+class DeckScorer:
+    """Scores the candidate spells of a deck as cards are added to it.
+
+    Attributes:
+        pool: Card pool the positions refer to
+        candidates: Pool positions being scored, in the order of scores()
+        slots: Spell slots of the deck, including cards added with add()
+        soft_budget: Budget for the deck in USD, or None for no penalty
+        spent: USD spent so far (see add)
+        added: Number of cards added
+        role_counts: Cards added per targeted role
+        curve_counts: Cards added per curve bin
+    """
+
+    def __init__(
+        self,
+        pool: CardPool,
+        candidates: Iterable[int],
+        role_targets: Mapping[str, int],
+        slots: int,
+        soft_budget: float | None = None,
+        spent: float = 0.0,
+    ):
+        """Group the candidates and score them for an empty deck.
+
+        Args:
+            pool: Card pool loaded with the roles to target
+            candidates: Pool positions that may be picked
+            role_targets: Role name to target count; roles unknown to the
+                pool are ignored
+            slots: Spell slots to fill, which sets the curve targets and the
+                per-slot budget
+            soft_budget: Budget for the whole deck in USD
+            spent: USD already spent on cards outside the spell slots
+        """
+        self.pool = pool
+        self.candidates = list(candidates)
+        self.slots = slots
+        self.soft_budget = soft_budget
+        self.spent = spent
+        self.added = 0
+
+        self._targets = [
+            (1 << pool.role_names.index(name), name, target)
+            for name, target in role_targets.items()
+            if target > 0 and name in pool.role_names
+        ]
+        self._target_mask = 0
+        for bit, _, _ in self._targets:
+            self._target_mask |= bit
+        self.role_counts = {name: 0 for _, name, _ in self._targets}
+        self._curve_targets = [share * slots for share in CURVE_SHARES]
+        self.curve_counts = [0] * len(CURVE_SHARES)
+
+        # Group members sorted by price then pool order: the head of a group
+        # is its best remaining candidate whatever the budget
+        members: dict[tuple[int, int], list[int]] = {}
+        for i in self.candidates:
+            members.setdefault(self._key(i), []).append(i)
+        self._keys = list(members)
+        self._groups = [
+            sorted(group, key=lambda i: (pool.prices[i], i))
+            for group in members.values()
+        ]
+        group_of = {key: g for g, key in enumerate(self._keys)}
+        self._candidate_groups = array(
+            "I", (group_of[self._key(i)] for i in self.candidates)
+        )
+        self._prices = array("d", (pool.prices[i] for i in self.candidates))
+        self._positions = {i: p for p, i in enumerate(self.candidates)}
+        self._heads = [0] * len(self._groups)
+        self._removed: set[int] = set()
+        self._group_scores = [self._group_score(*key) for key in self._keys]
+
+    def _key(self, i: int) -> tuple[int, int]:
+        """Group of a pool position: (targeted role bits, curve bin)."""
+        return self.pool.role_bits[i] & self._target_mask, curve_bin(self.pool.cmc[i])
+
+    def _role_bonus(self, role_bits: int) -> tuple[float, tuple[str, ...]]:
+        """Role deficit bonus of some role bits, with the roles it counts."""
+        bonus = 0.0
+        roles = []
+        for bit, name, target in self._targets:
+            deficit = target - self.role_counts[name]
+            if role_bits & bit and deficit > 0:
+                bonus += ROLE_WEIGHT * (1 + deficit / target)
+                roles.append(name)
+        return bonus, tuple(roles)
+
+    def _curve_bonus(self, bin_: int) -> float:
+        """Curve bonus of a curve bin."""
+        target = self._curve_targets[bin_]
+        deficit = target - self.curve_counts[bin_]
+        return CURVE_WEIGHT * deficit / target if deficit > 0 else 0.0
+
+    def _group_score(self, role_bits: int, bin_: int) -> float:
+        """Score of a group before its budget penalty."""
+        return self._role_bonus(role_bits)[0] + self._curve_bonus(bin_)
+
+    def allowance(self) -> float | None:
+        """USD each remaining slot may cost, or None without a budget."""
+        if self.soft_budget is None:
+            return None
+        remaining = max(self.soft_budget - self.spent, 0.0)
+        return remaining / max(self.slots - self.added, 1)
+
+    @staticmethod
+    def _penalty(price: float, allowance: float | None) -> float:
+        """Budget penalty of a price: the overshoot relative to the allowance."""
+        if allowance is None or price <= allowance:
+            return 0.0
+        return BUDGET_WEIGHT * (price - allowance) / max(allowance, 1.0)
+
+    def breakdown(self, i: int) -> ScoreBreakdown:
+        """Score components of a pool position for the current deck."""
+        role_bits, bin_ = self._key(i)
+        role_bonus, roles = self._role_bonus(role_bits)
+        return ScoreBreakdown(
+            role_deficit_bonus=role_bonus,
+            curve_bonus=self._curve_bonus(bin_),
+            budget_penalty=self._penalty(self.pool.prices[i], self.allowance()),
+            roles=roles,
+        )
+
+    def scores(self) -> array:
+        """Score of every candidate, aligned with candidates.
+
+        Candidates already added score ``-inf``.
+        """
+        allowance = self.allowance()
+        group_scores = self._group_scores
+        if allowance is None:
+            values = array("d", [group_scores[g] for g in self._candidate_groups])
+        else:
+            floor = max(allowance, 1.0)
+            values = array(
+                "d",
+                [
+                    group_scores[g] - BUDGET_WEIGHT * (price - allowance) / floor
+                    if price > allowance
+                    else group_scores[g]
+                    for g, price in zip(self._candidate_groups, self._prices)
+                ],
+            )
+        for i in self._removed:
+            position = self._positions.get(i)
+            if position is not None:
+                values[position] = float("-inf")
+        return values
+
+    def _head(self, g: int) -> int | None:
+        """Best remaining member of a group, skipping added cards."""
+        group, head = self._groups[g], self._heads[g]
+        while head < len(group) and group[head] in self._removed:
+            head += 1
+        self._heads[g] = head
+        return group[head] if head < len(group) else None
+
+    def best(self, role_bits: int | None = None, role_mask: int = -1) -> int | None:
+        """Highest-scoring remaining candidate.
+
+        Ties go to the cheaper card, then to pool order.
+
+        Args:
+            role_bits: Only consider candidates whose targeted roles among
+                role_mask are exactly these role bits
+            role_mask: Role bits that role_bits is matched on (default: all)
+
+        Returns:
+            Pool position, or None when every candidate has been added
+        """
+        allowance = self.allowance()
+        prices = self.pool.prices
+        best: int | None = None
+        best_key: tuple[float, float, int] | None = None
+        for g, group_score in enumerate(self._group_scores):
+            if role_bits is not None and self._keys[g][0] & role_mask != role_bits:
+                continue
+            i = self._head(g)
+            if i is None:
+                continue
+            price = prices[i]
+            key = (self._penalty(price, allowance) - group_score, price, i)
+            if best_key is None or key < best_key:
+                best, best_key = i, key
+        return best
+
+    def heads(self) -> list[int]:
+        """Best remaining candidate of every group.
+
+        Any other remaining candidate has the roles and curve bin of one of
+        these at no lower price, so it never scores higher.
+        """
+        heads = (self._head(g) for g in range(len(self._groups)))
+        return [i for i in heads if i is not None]
+
+    def add(self, i: int) -> None:
+        """Add a card to the deck and re-score the groups it affects.
+
+        Args:
+            i: Pool position; need not be a candidate (e.g. a must-include),
+                but it then still takes a slot
+        """
+        self._count(i, 1)
+        self._removed.add(i)
+
+    def exclude(self, i: int) -> None:
+        """Stop a candidate from being picked without adding it to the deck.
+
+        Args:
+            i: Pool position; it must not be added or removed afterwards
+        """
+        self._removed.add(i)
+
+    def copy(self) -> "DeckScorer":
+        """Independent copy of the deck state.
+
+        The candidate groups are shared rather than rebuilt, so several decks
+        can be built from one scorer set up once.
+        """
+        clone = copy.copy(self)
+        clone.role_counts = dict(self.role_counts)
+        clone.curve_counts = list(self.curve_counts)
+        clone._heads = list(self._heads)
+        clone._removed = set(self._removed)
+        clone._group_scores = list(self._group_scores)
+        return clone
+
+    def remove(self, i: int) -> None:
+        """Take an added card back out of the deck.
+
+        Args:
+            i: Pool position passed to add; a candidate can be picked again
+        """
+        self._count(i, -1)
+        self._removed.discard(i)
+        position = self._positions.get(i)
+        if position is not None:
+            g = self._candidate_groups[position]
+            prices = self.pool.prices
+            rank = bisect_left(
+                self._groups[g], (prices[i], i), key=lambda j: (prices[j], j)
+            )
+            self._heads[g] = min(self._heads[g], rank)
+
+    def swap(self, out: int, in_: int) -> None:
+        """Replace an added card with a candidate (see swap_delta)."""
+        self.remove(out)
+        self.add(in_)
+
+    def _count(self, i: int, step: int) -> None:
+        """Update the deck counts for a card and re-score affected groups."""
+        role_bits, bin_ = self._key(i)
+        for bit, name, _ in self._targets:
+            if role_bits & bit:
+                self.role_counts[name] += step
+        self.curve_counts[bin_] += step
+        self.spent += step * self.pool.prices[i]
+        self.added += step
+
+        for g, key in enumerate(self._keys):
+            if key[0] & role_bits or key[1] == bin_:
+                self._group_scores[g] = self._group_score(*key)
+
+    def _overspend_penalty(self, spent: float) -> float:
+        """Deck budget penalty: the overspend in per-slot allowances."""
+        if self.soft_budget is None or spent <= self.soft_budget:
+            return 0.0
+        allowance = max(self.soft_budget / max(self.slots, 1), 1.0)
+        return BUDGET_WEIGHT * (spent - self.soft_budget) / allowance
+
+    def objective(self) -> float:
+        """Objective of the deck so far: total role and curve bonuses earned
+        by its cards, minus the penalty for spending over the budget.
+
+        Adding a card raises the role and curve terms by exactly its
+        breakdown's bonuses, so greedy picks climb the same objective.
+        """
+        roles = sum(
+            _role_value(self.role_counts[name], target)
+            for _, name, target in self._targets
+        )
+        curve = sum(
+            _curve_value(count, target)
+            for count, target in zip(self.curve_counts, self._curve_targets)
+        )
+        return roles + curve - self._overspend_penalty(self.spent)
+
+    def swap_delta(self, out: int, in_: int) -> float:
+        """Change of objective() if an added card were swapped for another.
+
+        Only the roles and curve bins the two cards differ in are looked at,
+        so the cost does not depend on the deck or candidate count.
+
+        Args:
+            out: Pool position of an added card
+            in_: Pool position of a card not in the deck
+        """
+        out_bits, out_bin = self._key(out)
+        in_bits, in_bin = self._key(in_)
+        delta = 0.0
+        changed = out_bits ^ in_bits
+        if changed:
+            for bit, name, target in self._targets:
+                if changed & bit:
+                    count = self.role_counts[name]
+                    new = count + 1 if in_bits & bit else count - 1
+                    delta += _role_value(new, target) - _role_value(count, target)
+        if out_bin != in_bin:
+            counts, targets = self.curve_counts, self._curve_targets
+            out_count, in_count = counts[out_bin], counts[in_bin]
+            delta += _curve_value(out_count - 1, targets[out_bin]) - _curve_value(
+                out_count, targets[out_bin]
+            )
+            delta += _curve_value(in_count + 1, targets[in_bin]) - _curve_value(
+                in_count, targets[in_bin]
+            )
+        if self.soft_budget is not None:
+            prices = self.pool.prices
+            spent = self.spent - prices[out] + prices[in_]
+            delta -= self._overspend_penalty(spent) - self._overspend_penalty(
+                self.spent
+            )
+        return delta
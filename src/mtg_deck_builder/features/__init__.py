@@ -1,5 +1,6 @@
 """Feature extraction: atomic, testable card features."""
 
-from .extract import extract_features
+from .extract import extract_features, extract_features_batch
+from .sql import extract_features_sql
 
-__all__ = ["extract_features"]
+__all__ = ["extract_features", "extract_features_batch", "extract_features_sql"]
@@ -1,201 +1,204 @@
 """Feature extraction: pure, deterministic functions.
 
 Features are facts, not opinions.
+
+Each text feature is one precompiled alternation of its patterns, matched
+once against the lowercased oracle text; the board-wipe check is evaluated
+once per card and shared with creature removal.
 """
 
+import hashlib
+import json
 import re
+from collections.abc import Iterable
 from typing import Any
 
 
-def extract_features(card: dict[str, Any]) -> dict[str, bool]:
-    """Extract atomic features from a normalised card.
-
-    Args:
-        card: Normalised card dictionary
+def _compile(*patterns: str) -> re.Pattern[str]:
+    """Merge a feature's patterns into one precompiled alternation.
 
-    Returns:
-        Dictionary of feature names to boolean values
+    Patterns are matched case-sensitively against lowercased text, which is
+    several times faster than re.IGNORECASE.
     """
-    oracle_text = card.get("oracle_text", "").lower()
-    type_line = card.get("type_line", "").lower()
-    produced_mana = card.get("produced_mana", [])
-
-    features = {
-        "produces_mana": _produces_mana(card, produced_mana, oracle_text),
-        "draws_cards": _draws_cards(oracle_text),
-        "removes_creature": _removes_creature(oracle_text, type_line),
-        "removes_noncreature": _removes_noncreature(oracle_text, type_line),
-        "is_board_wipe": _is_board_wipe(oracle_text, type_line),
-        "is_tutor": _is_tutor(oracle_text),
-        "creates_tokens": _creates_tokens(oracle_text),
-        "is_finisher": _is_finisher(oracle_text, type_line, card),
-        "protects_board": _protects_board(oracle_text),
-        "recurs_from_graveyard": _recurs_from_graveyard(oracle_text),
-        "is_land_only": _is_land_only(type_line),
-    }
+    return re.compile("|".join(f"(?:{pattern})" for pattern in patterns))
 
-    return features
 
+# The only characters that lower() leaves alone but re.IGNORECASE matches to
+# an ASCII letter; folding them keeps results identical to IGNORECASE
+IGNORECASE_FOLD = {"ı": "i", "ſ": "s"}
+_IGNORECASE_FOLD = str.maketrans(IGNORECASE_FOLD)
 
-def _produces_mana(
-    card: dict[str, Any], produced_mana: list[str], oracle_text: str
-) -> bool:
-    """Check if card produces mana."""
-    # If card has produced_mana field, it produces mana
-    if produced_mana:
-        return True
 
-    # Check oracle text for mana production
-    mana_patterns = [
+# Oracle-text patterns per feature; a card has the feature if any matches.
+# Shared with the SQL engine (features.sql), so keep them RE2-compatible.
+TEXT_PATTERNS: dict[str, tuple[str, ...]] = {
+    "produces_mana": (
         r"add \{[wubrgc]",
         r"adds? \{[wubrgc]",
         r"tap.*add.*mana",
         r"produces?.*mana",
-    ]
-    for pattern in mana_patterns:
-        if re.search(pattern, oracle_text, re.IGNORECASE):
-            return True
-
-    return False
-
-
-def _draws_cards(oracle_text: str) -> bool:
-    """Check if card draws cards."""
-    draw_patterns = [
+    ),
+    "draws_cards": (
         r"draw.*card",
         r"draws? \d+ card",
-    ]
-    for pattern in draw_patterns:
-        if re.search(pattern, oracle_text, re.IGNORECASE):
-            return True
-    return False
-
-
-def _removes_creature(oracle_text: str, type_line: str) -> bool:
-    """Check if card removes creatures."""
-    # Exclude board wipes (handled separately)
-    if _is_board_wipe(oracle_text, type_line):
-        return False
-
-    removal_patterns = [
+    ),
+    "removes_creature": (
         r"destroy target creature",
         r"exile target creature",
         r"destroy.*creature",
         r"exile.*creature",
         r"deal.*damage.*creature",
-    ]
-    for pattern in removal_patterns:
-        if re.search(pattern, oracle_text, re.IGNORECASE):
-            return True
-    return False
-
-
-def _removes_noncreature(oracle_text: str, type_line: str) -> bool:
-    """Check if card removes noncreature permanents."""
-    removal_patterns = [
+    ),
+    "removes_noncreature": (
         r"destroy target (artifact|enchantment|planeswalker|land)",
         r"exile target (artifact|enchantment|planeswalker|land)",
         r"destroy.*(artifact|enchantment|planeswalker)",
-    ]
-    for pattern in removal_patterns:
-        if re.search(pattern, oracle_text, re.IGNORECASE):
-            return True
-    return False
-
-
-def _is_board_wipe(oracle_text: str, type_line: str) -> bool:
-    """Check if card is a board wipe."""
-    wipe_patterns = [
+    ),
+    "is_board_wipe": (
         r"destroy all (creatures|permanents)",
         r"exile all (creatures|permanents)",
         r"destroy each (creature|permanent)",
         r"all creatures get -x/-x",
         r"deal.*damage to each creature",
-    ]
-    for pattern in wipe_patterns:
-        if re.search(pattern, oracle_text, re.IGNORECASE):
-            return True
-    return False
-
-
-def _is_tutor(oracle_text: str) -> bool:
-    """Check if card is a tutor (searches library)."""
-    tutor_patterns = [
+    ),
+    "is_tutor": (
         r"search your library",
         r"search.*library.*card",
-    ]
-    for pattern in tutor_patterns:
-        if re.search(pattern, oracle_text, re.IGNORECASE):
-            return True
-    return False
-
-
-def _creates_tokens(oracle_text: str) -> bool:
-    """Check if card creates tokens."""
-    token_patterns = [
+    ),
+    "creates_tokens": (
         r"create.*token",
         r"put.*token.*onto the battlefield",
-    ]
-    for pattern in token_patterns:
-        if re.search(pattern, oracle_text, re.IGNORECASE):
-            return True
-    return False
-
-
-def _is_finisher(oracle_text: str, type_line: str, card: dict[str, Any]) -> bool:
-    """Check if card is a finisher (high damage/power, game-ending effect)."""
-    # High power creatures (6+)
-    power = card.get("power")
-    if power:
-        try:
-            if int(power) >= 6:
-                return True
-        except (ValueError, TypeError):
-            pass
-
-    # Cards with "you win the game" or similar
-    if re.search(r"win the game|you win", oracle_text, re.IGNORECASE):
-        return True
-
-    # High damage dealing
-    if re.search(r"deal \d{2,} damage", oracle_text, re.IGNORECASE):
-        return True
-
-    return False
-
-
-def _protects_board(oracle_text: str) -> bool:
-    """Check if card protects the board (hexproof, indestructible, etc.)."""
-    protection_patterns = [
+    ),
+    # Cards with "you win the game" or similar, or high damage dealing
+    "is_finisher": (
+        r"win the game|you win",
+        r"deal \d{2,} damage",
+    ),
+    "protects_board": (
         r"hexproof",
         r"indestructible",
         r"can't be destroyed",
         r"protection from",
-    ]
-    for pattern in protection_patterns:
-        if re.search(pattern, oracle_text, re.IGNORECASE):
-            return True
-    return False
-
-
-def _recurs_from_graveyard(oracle_text: str) -> bool:
-    """Check if card recurs from graveyard."""
-    recursion_patterns = [
+    ),
+    "recurs_from_graveyard": (
         r"return.*from.*graveyard",
         r"return.*from.*yard",
         r"return target.*card.*from.*graveyard",
         r"put.*from.*graveyard.*battlefield",
         r"put target.*card.*from.*graveyard",
-    ]
-    for pattern in recursion_patterns:
-        if re.search(pattern, oracle_text, re.IGNORECASE):
-            return True
+    ),
+}
+
+_SEARCH = {name: _compile(*patterns).search for name, patterns in TEXT_PATTERNS.items()}
+
+# Power at or above which a creature counts as a finisher
+FINISHER_POWER = 6
+
+NONLAND_TYPES = ("creature", "artifact", "enchantment", "planeswalker")
+
+# Bump a feature's version when its logic in extract_features (or its SQL in
+# features.sql) changes; edits to TEXT_PATTERNS and the constants above are
+# picked up by feature_fingerprints() automatically
+FEATURE_VERSIONS = {
+    "produces_mana": 1,
+    "draws_cards": 1,
+    "removes_creature": 1,
+    "removes_noncreature": 1,
+    "is_board_wipe": 1,
+    "is_tutor": 1,
+    "creates_tokens": 1,
+    "is_finisher": 1,
+    "protects_board": 1,
+    "recurs_from_graveyard": 1,
+    "is_land_only": 1,
+}
+
+
+def extract_features(card: dict[str, Any]) -> dict[str, bool]:
+    """Extract atomic features from a normalised card.
+
+    Args:
+        card: Normalised card dictionary
+
+    Returns:
+        Dictionary of feature names to boolean values
+    """
+    oracle_text = card.get("oracle_text", "").lower()
+    if not oracle_text.isascii():
+        oracle_text = oracle_text.translate(_IGNORECASE_FOLD)
+    type_line = card.get("type_line", "").lower()
+
+    search = _SEARCH
+
+    # Board wipes are excluded from creature removal, so match them once
+    is_board_wipe = search["is_board_wipe"](oracle_text) is not None
+
+    return {
+        # If card has produced_mana field, it produces mana
+        "produces_mana": bool(card.get("produced_mana", []))
+        or search["produces_mana"](oracle_text) is not None,
+        "draws_cards": search["draws_cards"](oracle_text) is not None,
+        "removes_creature": not is_board_wipe
+        and search["removes_creature"](oracle_text) is not None,
+        "removes_noncreature": search["removes_noncreature"](oracle_text) is not None,
+        "is_board_wipe": is_board_wipe,
+        "is_tutor": search["is_tutor"](oracle_text) is not None,
+        "creates_tokens": search["creates_tokens"](oracle_text) is not None,
+        "is_finisher": _has_high_power(card)
+        or search["is_finisher"](oracle_text) is not None,
+        "protects_board": search["protects_board"](oracle_text) is not None,
+        "recurs_from_graveyard": search["recurs_from_graveyard"](oracle_text)
+        is not None,
+        "is_land_only": _is_land_only(type_line),
+    }
+
+
+def feature_fingerprints() -> dict[str, str]:
+    """Fingerprint each feature's extraction rules.
+
+    A fingerprint covers the feature's version and every pattern or constant
+    it reads, so editing one regex only changes the features that use it.
+
+    Returns:
+        Feature name to a short hex digest
+    """
+    inputs: dict[str, list[Any]] = {
+        name: [version, TEXT_PATTERNS.get(name), IGNORECASE_FOLD]
+        for name, version in FEATURE_VERSIONS.items()
+    }
+    inputs["removes_creature"].append(TEXT_PATTERNS["is_board_wipe"])
+    inputs["is_finisher"].append(FINISHER_POWER)
+    inputs["is_land_only"] = [FEATURE_VERSIONS["is_land_only"], NONLAND_TYPES]
+    return {
+        name: hashlib.sha256(json.dumps(value).encode()).hexdigest()[:16]
+        for name, value in inputs.items()
+    }
+
+
+def extract_features_batch(cards: Iterable[dict[str, Any]]) -> list[dict[str, bool]]:
+    """Extract features for many cards.
+
+    Args:
+        cards: Normalised card dictionaries
+
+    Returns:
+        One feature dictionary per card, in input order
+    """
+    return [extract_features(card) for card in cards]
+
+
+def _has_high_power(card: dict[str, Any]) -> bool:
+    """Check for a high power creature (FINISHER_POWER+)."""
+    power = card.get("power")
+    if power:
+        try:
+            return int(power) >= FINISHER_POWER
+        except (ValueError, TypeError):
+            pass
     return False
 
 
 def _is_land_only(type_line: str) -> bool:
     """Check if card is land only (no other types)."""
-    return "land" in type_line.lower() and not any(
-        t in type_line.lower()
-        for t in ["creature", "artifact", "enchantment", "planeswalker"]
-    )
+    type_line = type_line.lower()
+    return "land" in type_line and not any(t in type_line for t in NONLAND_TYPES)
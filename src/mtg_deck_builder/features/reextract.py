@@ -0,0 +1,98 @@
+"""Targeted re-extraction of features whose rules changed.
+
+The index records a fingerprint of the rules each feature was extracted
+with (see ``feature_fingerprints``). After a rule change only the features
+with a different fingerprint are recomputed, from the oracle text and type
+line already stored in the cards table.
+"""
+
+from ..data.card_index import FEATURE_NAMES, CardIndex
+from .extract import extract_features_batch, feature_fingerprints
+from .sql import update_features_sql
+
+
+def stale_features(index: CardIndex) -> list[str]:
+    """List the features whose stored fingerprint differs from the rules.
+
+    Args:
+        index: Card index to inspect
+
+    Returns:
+        Stale feature names in FEATURE_NAMES order (all of them for an index
+        that never recorded fingerprints)
+    """
+    stored = index.get_feature_versions()
+    current = feature_fingerprints()
+    return [name for name in FEATURE_NAMES if stored.get(name) != current[name]]
+
+
+def reextract_features(
+    index: CardIndex,
+    engine: str = "sql",
+    force: bool = False,
+    batch_size: int = 5000,
+) -> list[str]:
+    """Recompute stale feature columns and record their new fingerprints.
+
+    Args:
+        index: Card index to update
+        engine: "sql" to recompute inside DuckDB, "python" to run
+            extract_features on the stored cards
+        force: Recompute every feature, not just the stale ones
+        batch_size: Cards per update batch (python engine)
+
+    Returns:
+        Names of the recomputed features
+
+    Raises:
+        ValueError: If engine is not "sql" or "python"
+    """
+    if engine not in ("sql", "python"):
+        raise ValueError(f"Unknown feature engine: {engine}")
+
+    names = list(FEATURE_NAMES) if force else stale_features(index)
+    if not names:
+        return []
+
+    if engine == "sql":
+        update_features_sql(index, names)
+    else:
+        _update_features_python(index, names, batch_size)
+
+    fingerprints = feature_fingerprints()
+    index.set_feature_versions({name: fingerprints[name] for name in names})
+    index.conn.commit()
+    return names
+
+
+def _update_features_python(
+    index: CardIndex, names: list[str], batch_size: int
+) -> None:
+    """Recompute feature columns with extract_features, batch by batch."""
+    relation = index.conn.execute(
+        """
+        SELECT
+            c.scryfall_id,
+            coalesce(c.oracle_text, '') AS oracle_text,
+            coalesce(c.type_line, '') AS type_line,
+            c.power,
+            c.produced_mana
+        FROM cards c
+        JOIN card_features cf ON c.scryfall_id = cf.scryfall_id
+        """
+    )
+    columns = [col[0] for col in relation.description]
+    # Fetch everything first: updating on the same connection would
+    # invalidate a partially consumed result
+    cards = [dict(zip(columns, row)) for row in relation.fetchall()]
+
+    for start in range(0, len(cards), batch_size):
+        chunk = cards[start : start + batch_size]
+        index.update_features_bulk(
+            [
+                {"scryfall_id": card["scryfall_id"]}
+                | {name: features[name] for name in names}
+                for card, features in zip(chunk, extract_features_batch(chunk))
+            ],
+            names,
+        )
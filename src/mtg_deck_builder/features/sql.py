@@ -0,0 +1,154 @@
+"""Feature extraction inside DuckDB.
+
+Computes the same features as ``extract_features`` with one
+``INSERT ... SELECT`` over the cards table, so DuckDB's vectorized,
+multi-threaded executor does the regex work. The expressions are generated
+from the patterns in ``features.extract`` and reproduce Python's matching
+rules where RE2 differs:
+
+- ``\\d`` is Unicode-aware in Python but ASCII-only in RE2 (use ``\\p{Nd}``)
+- Python lowercases ``İ`` to ``i`` plus a combining dot; DuckDB drops the dot
+- ``int(power)`` rejects decimals that ``TRY_CAST`` would round
+"""
+
+import json
+from collections.abc import Sequence
+
+from ..data.card_index import FEATURE_NAMES, CardIndex
+from .extract import FINISHER_POWER, IGNORECASE_FOLD, NONLAND_TYPES, TEXT_PATTERNS
+
+
+def _literal(value: str) -> str:
+    """Quote a string as a SQL literal."""
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _regex(patterns: Sequence[str]) -> str:
+    """One RE2 alternation equivalent to the Python patterns."""
+    alternation = "|".join(f"(?:{pattern})" for pattern in patterns)
+    return _literal(alternation.replace(r"\d", r"\p{Nd}"))
+
+
+def _lower(column: str, fold: bool = False) -> str:
+    """SQL for Python's ``column.lower()``, optionally with IGNORECASE_FOLD."""
+    expr = f"lower(replace(coalesce({column}, ''), 'İ', 'i̇'))"
+    if fold:
+        for char, folded in IGNORECASE_FOLD.items():
+            expr = f"replace({expr}, {_literal(char)}, {_literal(folded)})"
+    return expr
+
+
+def feature_expressions() -> dict[str, str]:
+    """SQL boolean expression for each feature.
+
+    Expressions refer to the columns ``text`` (lowercased oracle text),
+    ``type_line`` (lowercased), ``power`` and ``produced_mana``.
+
+    Returns:
+        Feature name to SQL expression, in FEATURE_NAMES order
+    """
+
+    def matches(name: str) -> str:
+        return f"regexp_matches(text, {_regex(TEXT_PATTERNS[name])})"
+
+    # int() semantics: optional sign, digits with single underscores between
+    # them, surrounding whitespace allowed
+    high_power = (
+        r"(regexp_full_match(power, '\s*[+-]?[0-9]+(_[0-9]+)*\s*') AND "
+        r"TRY_CAST(regexp_replace(power, '[\s_]', '', 'g') AS HUGEINT) >= "
+        f"{FINISHER_POWER})"
+    )
+    nonland = " OR ".join(f"contains(type_line, '{t}')" for t in NONLAND_TYPES)
+    expressions = {name: matches(name) for name in TEXT_PATTERNS}
+    expressions.update(
+        produces_mana=(
+            f"(coalesce(len(produced_mana), 0) > 0 OR {matches('produces_mana')})"
+        ),
+        removes_creature=(
+            f"(NOT {matches('is_board_wipe')} AND {matches('removes_creature')})"
+        ),
+        is_finisher=f"(coalesce({high_power}, false) OR {matches('is_finisher')})",
+        is_land_only=f"(contains(type_line, 'land') AND NOT ({nonland}))",
+    )
+    return {name: expressions[name] for name in FEATURE_NAMES}
+
+
+def _features_query(names: Sequence[str], where: str = "") -> str:
+    """SELECT of scryfall_id plus the named features for rows of cards."""
+    expressions = feature_expressions()
+    values = ", ".join(
+        ["scryfall_id", *(f"{expressions[name]} AS {name}" for name in names)]
+    )
+    return f"""
+        SELECT {values} FROM (
+            SELECT
+                scryfall_id,
+                {_lower("oracle_text", fold=True)} AS text,
+                {_lower("type_line")} AS type_line,
+                power,
+                produced_mana
+            FROM cards
+            {where}
+        )
+    """
+
+
+def extract_features_sql(
+    index: CardIndex, scryfall_ids: Sequence[str] | None = None
+) -> int:
+    """Derive card_features from the cards table in one SQL statement.
+
+    Args:
+        index: Card index whose cards are read and whose features are replaced
+        scryfall_ids: Only derive features for these cards (default: all)
+
+    Returns:
+        Number of feature rows written
+    """
+    params: list[str] = []
+    where = ""
+    if scryfall_ids is not None:
+        where = "WHERE scryfall_id IN (SELECT UNNEST(from_json(?, '[\"VARCHAR\"]')))"
+        params.append(json.dumps(list(scryfall_ids)))
+
+    names = ", ".join(["scryfall_id", *FEATURE_NAMES])
+    row = index.conn.execute(
+        f"INSERT OR REPLACE INTO card_features ({names}) "
+        + _features_query(FEATURE_NAMES, where),
+        params,
+    ).fetchone()
+    index.invalidate_roles()
+    index.new_snapshot()
+    return row[0] if row else 0
+
+
+def update_features_sql(index: CardIndex, names: Sequence[str]) -> int:
+    """Recompute selected feature columns of every stored feature row.
+
+    Args:
+        index: Card index to update
+        names: Feature columns to recompute; other columns are untouched
+
+    Returns:
+        Number of feature rows updated
+
+    Raises:
+        ValueError: If a name is not a known feature
+    """
+    unknown = set(names) - set(FEATURE_NAMES)
+    if unknown:
+        raise ValueError(f"Unknown features: {', '.join(sorted(unknown))}")
+    if not names:
+        return 0
+
+    assignments = ", ".join(f"{name} = derived.{name}" for name in names)
+    row = index.conn.execute(
+        f"""
+        UPDATE card_features SET {assignments}
+        FROM ({_features_query(names)}) AS derived
+        WHERE card_features.scryfall_id = derived.scryfall_id
+        """
+    ).fetchone()
+    index.invalidate_roles()
+    index.new_snapshot()
+    return row[0] if row else 0
@@ -1,5 +1,13 @@
 """Role composition system: roles as compositions of features."""
 
-from .role_engine import RoleEngine
+from .materialize import fresh_roles, materialize_roles, stale_roles
+from .role_engine import CompiledRole, RoleEngine, pack_features
 
-__all__ = ["RoleEngine"]
+__all__ = [
+    "CompiledRole",
+    "RoleEngine",
+    "fresh_roles",
+    "materialize_roles",
+    "pack_features",
+    "stale_roles",
+]
@@ -0,0 +1,64 @@
+"""Materialized role membership in the card index.
+
+Each role's members are stored in the card_roles table together with a
+fingerprint of its definition (see ``RoleEngine.role_fingerprints``), so
+deck builds look roles up instead of evaluating them per card. A role is
+stale when its definition changed or any card features were rewritten
+since it was materialized.
+"""
+
+from ..data.card_index import CardIndex
+from .role_engine import RoleEngine
+
+
+def stale_roles(index: CardIndex, engine: RoleEngine) -> list[str]:
+    """List the roles whose materialization is missing or out of date.
+
+    Args:
+        index: Card index to inspect
+        engine: Role engine with the current definitions
+
+    Returns:
+        Stale role names in definition order
+    """
+    stored = index.get_role_versions()
+    return [
+        name
+        for name, fingerprint in engine.role_fingerprints().items()
+        if stored.get(name) != fingerprint
+    ]
+
+
+def fresh_roles(index: CardIndex, engine: RoleEngine) -> set[str]:
+    """Roles whose materialized members can be used as they are.
+
+    Args:
+        index: Card index to inspect
+        engine: Role engine with the current definitions
+
+    Returns:
+        Names of the up-to-date roles
+    """
+    return set(engine.roles) - set(stale_roles(index, engine))
+
+
+def materialize_roles(
+    index: CardIndex, engine: RoleEngine, force: bool = False
+) -> list[str]:
+    """Rebuild stale roles in card_roles and drop roles no longer defined.
+
+    Args:
+        index: Card index to update
+        engine: Role engine with the current definitions
+        force: Rebuild every role, not just the stale ones
+
+    Returns:
+        Names of the rebuilt roles
+    """
+    names = list(engine.roles) if force else stale_roles(index, engine)
+    fingerprints = engine.role_fingerprints()
+    for name in names:
+        index.materialize_role(name, engine.role_predicate(name), fingerprints[name])
+    index.prune_roles(list(fingerprints))
+    index.conn.commit()
+    return names
@@ -1,10 +1,65 @@
-"""Role composition engine: roles as logical groupings of features."""
+"""Role composition engine: roles as logical groupings of features.
 
+Role definitions are compiled once into integer masks over a packed feature
+bitset (bit ``i`` is ``FEATURE_NAMES[i]``), so matching a card is three
+bitwise operations instead of a walk over feature lists.
+"""
+
+import hashlib
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
 import yaml
 
+from ..data.card_index import FEATURE_NAMES
+
+FEATURE_BITS = {name: 1 << i for i, name in enumerate(FEATURE_NAMES)}
+
+_ROLE_KEYS = ("requires", "requires_any", "excludes", "optional")
+
+
+def pack_features(features: Mapping[str, bool]) -> int:
+    """Pack a feature dictionary into a bitset.
+
+    Args:
+        features: Dictionary of feature names to boolean values; missing
+            features count as False
+
+    Returns:
+        Integer with bit ``i`` set when ``FEATURE_NAMES[i]`` is true
+    """
+    bits = 0
+    for name, bit in FEATURE_BITS.items():
+        if features.get(name, False):
+            bits |= bit
+    return bits
+
+
+@dataclass(frozen=True)
+class CompiledRole:
+    """A role definition compiled to masks over a packed feature bitset.
+
+    Attributes:
+        requires: Bits that must all be set
+        requires_any: Bits of which at least one must be set, or None when
+            the role has no ``requires_any`` clause
+        excludes: Bits that must all be clear
+    """
+
+    requires: int
+    requires_any: int | None
+    excludes: int
+
+    def matches(self, bits: int) -> bool:
+        """Check a packed feature bitset against the role."""
+        return (
+            bits & self.requires == self.requires
+            and not bits & self.excludes
+            and (self.requires_any is None or bits & self.requires_any != 0)
+        )
+
 
 class RoleEngine:
     """Manages role definitions and card-to-role assignment."""
@@ -14,6 +69,9 @@ class RoleEngine:
 
         Args:
             roles_config: Path to YAML file, dict of roles, or None for defaults
+
+        Raises:
+            ValueError: If a role refers to an unknown feature
         """
         if roles_config is None:
             self.roles = self._default_roles()
@@ -23,6 +81,11 @@ class RoleEngine:
         else:
             self.roles = roles_config
 
+        self.compiled = {
+            name: self._compile_role(name, role_def or {})
+            for name, role_def in self.roles.items()
+        }
+
     def _default_roles(self) -> dict[str, Any]:
         """Return default role definitions."""
         return {
@@ -46,6 +109,28 @@ class RoleEngine:
             },
         }
 
+    @staticmethod
+    def _compile_role(role_name: str, role_def: dict[str, Any]) -> CompiledRole:
+        """Compile one role definition into masks.
+
+        Raises:
+            ValueError: If the definition names an unknown feature
+        """
+        masks: dict[str, int] = {}
+        for key in _ROLE_KEYS:
+            unknown = [f for f in role_def.get(key, []) if f not in FEATURE_BITS]
+            if unknown:
+                raise ValueError(
+                    f"Role '{role_name}' {key} unknown features: {', '.join(unknown)}"
+                )
+            masks[key] = pack_features(dict.fromkeys(role_def.get(key, []), True))
+
+        return CompiledRole(
+            requires=masks["requires"],
+            requires_any=masks["requires_any"] if "requires_any" in role_def else None,
+            excludes=masks["excludes"],
+        )
+
     def card_matches_role(self, features: dict[str, bool], role_name: str) -> bool:
         """Check if a card matches a role definition.
 
@@ -56,29 +141,78 @@ class RoleEngine:
         Returns:
             True if card matches the role
         """
-        if role_name not in self.roles:
+        role = self.compiled.get(role_name)
+        if role is None:
             return False
+        return role.matches(pack_features(features))
 
-        role_def = self.roles[role_name]
+    def match_many(self, bitsets: Iterable[int], role_name: str) -> list[bool]:
+        """Check many packed feature bitsets against a role.
 
-        # Check required features
-        if "requires" in role_def:
-            for feature in role_def["requires"]:
-                if not features.get(feature, False):
-                    return False
+        Args:
+            bitsets: Card feature bitsets (see pack_features)
+            role_name: Name of the role to check
 
-        # Check requires_any (at least one must be true)
-        if "requires_any" in role_def:
-            if not any(features.get(f, False) for f in role_def["requires_any"]):
-                return False
+        Returns:
+            One match flag per bitset, in input order (all False for an
+            unknown role)
+        """
+        role = self.compiled.get(role_name)
+        if role is None:
+            return [False for _ in bitsets]
+
+        required, excluded = role.requires, role.excludes
+        if required & excluded:
+            return [False for _ in bitsets]
+        # Fold the exclude check into the require check: a card matches when
+        # its required and excluded bits equal exactly the required bits
+        checked = required | excluded
+        if role.requires_any is None:
+            return [bits & checked == required for bits in bitsets]
+        any_of = role.requires_any
+        return [bits & checked == required and bits & any_of != 0 for bits in bitsets]
+
+    def role_predicate(self, role_name: str, alias: str = "cf") -> str:
+        """SQL predicate selecting the card_features rows that match a role.
 
-        # Check excludes (none should be true)
-        if "excludes" in role_def:
-            for feature in role_def["excludes"]:
-                if features.get(feature, False):
-                    return False
+        Args:
+            role_name: Name of the role
+            alias: Table alias of card_features in the query
+
+        Returns:
+            Boolean SQL expression, e.g. ``cf.produces_mana AND NOT
+            cf.is_land_only`` ("false" for an unknown role)
+        """
+        role = self.compiled.get(role_name)
+        if role is None or role.requires & role.excludes:
+            return "false"
 
-        return True
+        def columns(mask: int) -> list[str]:
+            return [
+                f"{alias}.{name}" for name, bit in FEATURE_BITS.items() if mask & bit
+            ]
+
+        terms = columns(role.requires)
+        if role.requires_any is not None:
+            terms.append(
+                "(" + (" OR ".join(columns(role.requires_any)) or "false") + ")"
+            )
+        terms.extend(f"NOT {column}" for column in columns(role.excludes))
+        return " AND ".join(terms) or "true"
+
+    def role_fingerprints(self) -> dict[str, str]:
+        """Fingerprint each role definition.
+
+        A fingerprint covers exactly what decides membership (the role's SQL
+        predicate), so reordering or annotating a definition keeps it.
+
+        Returns:
+            Role name to a short hex digest
+        """
+        return {
+            name: hashlib.sha256(self.role_predicate(name).encode()).hexdigest()[:16]
+            for name in self.compiled
+        }
 
     def get_card_roles(self, features: dict[str, bool]) -> list[str]:
         """Get all roles that a card matches.
@@ -89,8 +223,5 @@ class RoleEngine:
         Returns:
             List of role names the card matches
         """
-        matching_roles = []
-        for role_name in self.roles:
-            if self.card_matches_role(features, role_name):
-                matching_roles.append(role_name)
-        return matching_roles
+        bits = pack_features(features)
+        return [name for name, role in self.compiled.items() if role.matches(bits)]
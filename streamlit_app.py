@@ -262,10 +262,12 @@ def main():
 
         with st.spinner("Building deck..."):
             try:
+                # Resubmitting the same form is served from the build cache
                 result = build_deck(
                     commander=commander,
                     color_identity=colors,
                     role_targets=role_targets,
+                    cache_path=Path("build_cache.db"),
                 )
 
                 # Store result in session state for persistence
@@ -4,8 +4,9 @@ import pytest
 import tempfile
 from pathlib import Path
 
-from mtg_deck_builder.data.card_index import CardIndex
-from mtg_deck_builder.roles.role_engine import RoleEngine
+from mtg_deck_builder.data.card_index import CARD_COLUMNS, CardIndex
+from mtg_deck_builder.engine.card_pool import HAS_FEATURES, CardPool
+from mtg_deck_builder.roles.role_engine import RoleEngine, pack_features
 
 
 @pytest.fixture
@@ -146,6 +147,23 @@ def role_engine():
     return RoleEngine()
 
 
+@pytest.fixture
+def make_pool():
+    """Factory for pools of (name, cmc, price, features) colorless cards."""
+
+    def make(cards):
+        rows = []
+        for i, (name, cmc, price, _) in enumerate(cards):
+            card = dict.fromkeys(CARD_COLUMNS)
+            card.update(scryfall_id=f"card-{i}", name=name, cmc=cmc, price_usd=price)
+            card["ci_mask"] = 0
+            rows.append(tuple(card[column] for column in CARD_COLUMNS))
+        bits = [pack_features(features) | HAS_FEATURES for *_, features in cards]
+        return CardPool(rows, bits, RoleEngine())
+
+    return make
+
+
 @pytest.fixture
 def sample_scryfall_card():
     """Sample Scryfall card data."""
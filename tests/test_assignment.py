@@ -0,0 +1,105 @@
+"""Tests for role assignment."""
+
+import itertools
+import random
+
+from mtg_deck_builder.engine import assignment
+from mtg_deck_builder.engine.assignment import assign_role_cards, cover_roles
+
+RAMP = {"produces_mana": True}
+DRAW = {"draws_cards": True}
+REMOVAL = {"removes_creature": True}
+
+
+def _shortfall(plan, targets):
+    """Total shortfall of a plan against the targets."""
+    return sum(
+        max(target - sum(c for roles, c in plan.items() if roles & bit), 0)
+        for bit, target in targets.items()
+    )
+
+
+def _brute_force(available, targets):
+    """(shortfall, cards) of the best plan, by trying every plan."""
+    types = list(available)
+    return min(
+        (_shortfall(dict(zip(types, counts)), targets), sum(counts))
+        for counts in itertools.product(*(range(available[t] + 1) for t in types))
+    )
+
+
+class TestCoverRoles:
+    """Test the role covering solver."""
+
+    def test_multi_role_cards_count_twice(self):
+        """Test that a two-role card is preferred over two single-role ones."""
+        plan = cover_roles({1: 5, 2: 5, 3: 2}, {1: 3, 2: 3})
+
+        assert plan == {3: 2, 1: 1, 2: 1}
+
+    def test_shortfall_when_roles_run_out(self):
+        """Test that unreachable targets take every card that helps."""
+        plan = cover_roles({1: 2, 3: 1}, {1: 5, 2: 4})
+
+        assert plan == {3: 1, 1: 2}
+
+    def test_untargeted_roles_are_merged(self):
+        """Test that roles without a positive target are masked out."""
+        plan = cover_roles({1: 1, 3: 1, 5: 2}, {1: 3, 2: 0})
+
+        assert plan == {1: 3}
+
+    def test_matches_brute_force(self):
+        """Test optimality against exhaustive search on small instances."""
+        rng = random.Random(1)
+        for _ in range(300):
+            bits = [1 << j for j in range(rng.randint(1, 4))]
+            targets = {bit: rng.randint(0, 5) for bit in bits}
+            types = rng.sample(
+                range(1, 1 << len(bits)), rng.randint(1, min(5, (1 << len(bits)) - 1))
+            )
+            available = {t: rng.randint(0, 4) for t in types}
+
+            plan = cover_roles(available, targets)
+
+            mask = sum(bit for bit, target in targets.items() if target > 0)
+            for roles, count in plan.items():
+                assert count <= sum(
+                    c for t, c in available.items() if t & mask == roles
+                )
+            assert (_shortfall(plan, targets), sum(plan.values())) == _brute_force(
+                available, targets
+            )
+
+    def test_greedy_fallback(self, monkeypatch):
+        """Test that oversized instances are covered greedily."""
+        monkeypatch.setattr(assignment, "MAX_STATES", 1)
+
+        plan = cover_roles({1: 5, 2: 5, 3: 2}, {1: 3, 2: 3})
+
+        assert plan == {3: 2, 1: 1, 2: 1}
+
+
+class TestAssignRoleCards:
+    """Test picking pool cards for role targets."""
+
+    def test_fewest_cards(self, make_pool):
+        """Test that multi-role cards cover several targets at once."""
+        pool = make_pool(
+            [("Ramp", 2, None, RAMP), ("Draw", 2, None, DRAW)] * 3
+            + [("Both", 3, None, RAMP | DRAW), ("Removal", 2, None, REMOVAL)]
+        )
+
+        chosen = assign_role_cards(
+            pool, range(len(pool)), {"ramp": 2, "card_draw": 1, "interaction": 1}
+        )
+
+        assert [pool.names[i] for i in chosen] == ["Ramp", "Both", "Removal"]
+
+    def test_candidate_order_within_role_set(self, make_pool):
+        """Test that candidates of a role set are taken in the given order."""
+        pool = make_pool([(f"Ramp {i}", 2, None, RAMP) for i in range(4)])
+
+        chosen = assign_role_cards(pool, [3, 1, 0, 2], {"ramp": 2, "unknown": 4})
+
+        assert chosen == [3, 1]
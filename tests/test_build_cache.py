@@ -0,0 +1,71 @@
+"""Tests for the build result cache."""
+
+import pytest
+
+from mtg_deck_builder.cache.build_cache import BuildCache, build_key
+
+
+class TestBuildCache:
+    """Test storing, evicting and invalidating build results."""
+
+    def test_hit_and_miss(self):
+        """Test that a stored result is returned as a fresh copy."""
+        cache = BuildCache(":memory:")
+        result = {"deck": [{"name": "Sol Ring", "cmc": 1}], "role_counts": {}}
+
+        assert cache.get("a") is None
+        cache.put("a", "snap-1", result)
+        cached = cache.get("a")
+
+        assert cached == result
+        cached["deck"].clear()
+        assert cache.get("a") == result
+        assert (cache.hits, cache.misses) == (2, 1)
+
+    def test_least_recently_used_evicted(self):
+        """Test that the entry unused for longest is evicted first."""
+        cache = BuildCache(":memory:", max_entries=2)
+        cache.put("a", "snap", {"n": 1})
+        cache.put("b", "snap", {"n": 2})
+
+        cache.get("a")
+        cache.put("c", "snap", {"n": 3})
+
+        assert len(cache) == 2
+        assert cache.get("b") is None
+        assert cache.get("a") == {"n": 1}
+        assert cache.get("c") == {"n": 3}
+
+    def test_other_snapshots_dropped(self):
+        """Test that a write drops the results of older index snapshots."""
+        cache = BuildCache(":memory:")
+        cache.put("old", "snap-1", {"n": 1})
+
+        cache.put("new", "snap-2", {"n": 2})
+
+        assert len(cache) == 1
+        assert cache.get("old") is None
+
+    def test_persistent(self, tmp_path):
+        """Test that results survive reopening the database."""
+        with BuildCache(tmp_path / "builds.db") as cache:
+            cache.put("a", "snap", {"n": 1})
+
+        with BuildCache(tmp_path / "builds.db") as cache:
+            assert cache.get("a") == {"n": 1}
+
+    def test_invalid_max_entries(self):
+        """Test that a cache must hold at least one entry."""
+        with pytest.raises(ValueError, match="at least 1"):
+            BuildCache(":memory:", max_entries=0)
+
+    def test_build_key(self):
+        """Test that keys depend on content, not on keyword order."""
+        key = build_key(snapshot="s", brief={"commander": "A", "soft_budget": None})
+
+        assert key == build_key(
+            brief={"soft_budget": None, "commander": "A"}, snapshot="s"
+        )
+        assert key != build_key(
+            snapshot="t", brief={"commander": "A", "soft_budget": None}
+        )
@@ -0,0 +1,86 @@
+"""Tests for streaming bulk-data ingestion."""
+
+import gzip
+import json
+
+import pytest
+
+from mtg_deck_builder.data.bulk_data import iter_bulk_cards
+
+
+class TestBulkData:
+    """Test reading Scryfall bulk-data files."""
+
+    @pytest.fixture
+    def bulk_cards(self, sample_scryfall_card):
+        """A small bulk array with varied card contents."""
+        return [
+            {
+                **sample_scryfall_card,
+                "id": f"bulk-{i}",
+                "name": f"Bulk Card {i}",
+                "oracle_text": "Draw a card. " * i,
+            }
+            for i in range(50)
+        ]
+
+    def test_reads_all_cards_in_order(self, tmp_path, bulk_cards):
+        """Test that every card is yielded in file order."""
+        path = tmp_path / "oracle-cards.json"
+        path.write_text(json.dumps(bulk_cards, indent=2))
+
+        assert list(iter_bulk_cards(path)) == bulk_cards
+
+    @pytest.mark.parametrize("chunk_size", [1, 7, 128])
+    def test_cards_straddling_chunks(self, tmp_path, bulk_cards, chunk_size):
+        """Test that cards split across read chunks decode correctly."""
+        path = tmp_path / "oracle-cards.json"
+        path.write_text(json.dumps(bulk_cards))
+
+        assert list(iter_bulk_cards(path, chunk_size=chunk_size)) == bulk_cards
+
+    def test_streams_lazily(self, tmp_path, bulk_cards):
+        """Test that the first card is available before the file is consumed."""
+        path = tmp_path / "oracle-cards.json"
+        path.write_text(json.dumps(bulk_cards) + "garbage")
+
+        cards = iter_bulk_cards(path, chunk_size=64)
+
+        assert next(cards)["id"] == "bulk-0"
+
+    def test_gzip_file(self, tmp_path, bulk_cards):
+        """Test that gzipped bulk files are decompressed on the fly."""
+        path = tmp_path / "oracle-cards.json.gz"
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            json.dump(bulk_cards, f)
+
+        assert list(iter_bulk_cards(path)) == bulk_cards
+
+    def test_empty_array(self, tmp_path):
+        """Test that an empty array yields nothing."""
+        path = tmp_path / "empty.json"
+        path.write_text(" [ ] ")
+
+        assert list(iter_bulk_cards(path)) == []
+
+    @pytest.mark.parametrize(
+        "content", ['{"object": "list"}', '[{"id": "a"}, {"id": "b"}', '[{"id": "a"']
+    )
+    def test_malformed_file_raises(self, tmp_path, content):
+        """Test that non-array or truncated files raise ValueError."""
+        path = tmp_path / "bad.json"
+        path.write_text(content)
+
+        with pytest.raises(ValueError):
+            list(iter_bulk_cards(path, chunk_size=4))
+
+    def test_malformed_element_raises_without_reading_on(self, tmp_path, bulk_cards):
+        """Test that a bad element fails at once instead of buffering the rest."""
+        body = json.dumps(bulk_cards)
+        path = tmp_path / "bad.json"
+        path.write_text('[{"id": "a"}, {"id": "b" "name": "x"}, ' + body[1:])
+
+        with pytest.raises(json.JSONDecodeError) as excinfo:
+            list(iter_bulk_cards(path, chunk_size=64))
+
+        assert len(excinfo.value.doc) < 2 * 64
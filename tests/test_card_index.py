@@ -1,6 +1,13 @@
 """Tests for card index."""
 
-from mtg_deck_builder.data.card_index import CardIndex
+import duckdb
+import pytest
+
+from mtg_deck_builder.data.card_index import (
+    CARD_COLUMNS,
+    CardIndex,
+    color_identity_mask,
+)
 
 
 class TestCardIndex:
@@ -17,6 +24,15 @@ class TestCardIndex:
         assert "cards" in tables
         assert "card_features" in tables
 
+    def test_read_only(self, temp_db_path):
+        """Test that a read-only index can be queried but not written."""
+        CardIndex(temp_db_path).close()
+        index = CardIndex(temp_db_path, read_only=True)
+
+        assert index.query_cards() == []
+        with pytest.raises(duckdb.Error):
+            index.insert_cards_bulk([_bulk_card(0)])
+
     def test_insert_and_query_card(self, temp_db_path):
         """Test inserting and querying a card."""
         index = CardIndex(temp_db_path)
@@ -330,3 +346,301 @@ class TestCardIndex:
         assert row is not None
         count = row[0]
         assert count == 1
+
+
+def _bulk_card(i: int, **overrides):
+    """A normalised card for bulk insert tests."""
+    return {
+        "scryfall_id": f"bulk-{i}",
+        "name": f"Bulk Card {i}",
+        "mana_cost": "{G}",
+        "cmc": 1,
+        "type_line": "Creature — Elf",
+        "oracle_text": "{T}: Add {G}.",
+        "colors": ["G"],
+        "color_identity": ["G"],
+        "rarity": "common",
+        "commander_legal": True,
+        "power": "1",
+        "toughness": "1",
+        "keywords": [],
+        "produced_mana": ["G"],
+        **overrides,
+    }
+
+
+class TestCardIndexBulk:
+    """Test set-based bulk upserts."""
+
+    def test_insert_cards_bulk_rows(self, temp_db_path):
+        """Test bulk inserting a list of card dicts."""
+        index = CardIndex(temp_db_path)
+
+        written = index.insert_cards_bulk([_bulk_card(i) for i in range(50)])
+
+        assert written == 50
+        row = index.conn.execute(
+            "SELECT name, colors, cmc, commander_legal FROM cards "
+            "WHERE scryfall_id = 'bulk-7'"
+        ).fetchone()
+        assert row == ("Bulk Card 7", ["G"], 1.0, True)
+
+    def test_insert_cards_bulk_columns(self, temp_db_path):
+        """Test bulk inserting a dict of column lists."""
+        index = CardIndex(temp_db_path)
+        rows = [_bulk_card(i) for i in range(5)]
+        columns = {name: [row[name] for row in rows] for name in rows[0]}
+
+        assert index.insert_cards_bulk(columns) == 5
+        count = index.conn.execute("SELECT COUNT(*) FROM cards").fetchone()
+        assert count == (5,)
+
+    def test_insert_cards_bulk_mismatched_columns(self, temp_db_path):
+        """Test that column lists of different lengths are rejected."""
+        index = CardIndex(temp_db_path)
+
+        with pytest.raises(ValueError):
+            index.insert_cards_bulk({"scryfall_id": ["a", "b"], "name": ["A"]})
+
+    def test_insert_cards_bulk_empty(self, temp_db_path):
+        """Test that an empty batch is a no-op."""
+        index = CardIndex(temp_db_path)
+
+        assert index.insert_cards_bulk([]) == 0
+        assert index.insert_features_bulk([]) == 0
+
+    def test_bulk_upsert_replaces_cards_and_features(self, temp_db_path):
+        """Test that re-inserting a batch replaces rows instead of duplicating."""
+        index = CardIndex(temp_db_path)
+        index.insert_cards_bulk([_bulk_card(i) for i in range(10)])
+        index.insert_features_bulk(
+            [{"scryfall_id": f"bulk-{i}", "produces_mana": True} for i in range(10)]
+        )
+
+        index.insert_cards_bulk([_bulk_card(i, name=f"Renamed {i}") for i in range(10)])
+        index.insert_features_bulk(
+            [{"scryfall_id": f"bulk-{i}", "draws_cards": True} for i in range(10)]
+        )
+
+        assert index.conn.execute("SELECT COUNT(*) FROM cards").fetchone() == (10,)
+        row = index.conn.execute(
+            "SELECT c.name, f.produces_mana, f.draws_cards FROM cards c "
+            "JOIN card_features f USING (scryfall_id) WHERE scryfall_id = 'bulk-3'"
+        ).fetchone()
+        assert row == ("Renamed 3", False, True)
+
+    def test_insert_features_bulk_defaults(self, temp_db_path):
+        """Test that features missing from a row default to False."""
+        index = CardIndex(temp_db_path)
+        index.insert_cards_bulk([_bulk_card(0)])
+
+        index.insert_features_bulk([{"scryfall_id": "bulk-0", "is_tutor": True}])
+
+        result = index.conn.execute(
+            "SELECT * FROM card_features WHERE scryfall_id = 'bulk-0'"
+        )
+        columns = [col[0] for col in result.description]
+        features = dict(zip(columns, result.fetchone()))
+        assert features.pop("scryfall_id") == "bulk-0"
+        assert features.pop("is_tutor") is True
+        assert not any(features.values())
+
+    def test_update_features_bulk(self, temp_db_path):
+        """Test that only the named feature columns are overwritten."""
+        index = CardIndex(temp_db_path)
+        index.insert_cards_bulk([_bulk_card(0), _bulk_card(1)])
+        index.insert_features_bulk(
+            [{"scryfall_id": f"bulk-{i}", "is_tutor": True} for i in range(2)]
+        )
+
+        index.update_features_bulk(
+            [{"scryfall_id": "bulk-1", "draws_cards": True, "is_tutor": False}],
+            ["draws_cards"],
+        )
+
+        rows = index.conn.execute(
+            "SELECT scryfall_id, draws_cards, is_tutor FROM card_features "
+            "ORDER BY scryfall_id"
+        ).fetchall()
+        assert rows == [("bulk-0", False, True), ("bulk-1", True, True)]
+        with pytest.raises(ValueError, match="Unknown features"):
+            index.update_features_bulk([], ["not_a_feature"])
+
+    def test_writes_renew_snapshot_id(self, temp_db_path):
+        """Test that bulk card and feature writes, not role writes, renew the ID."""
+        index = CardIndex(temp_db_path)
+        ids = [index.snapshot_id()]
+
+        index.insert_cards_bulk([_bulk_card(0)])
+        ids.append(index.snapshot_id())
+        index.insert_features_bulk([{"scryfall_id": "bulk-0", "is_tutor": True}])
+        ids.append(index.snapshot_id())
+        index.update_features_bulk([{"scryfall_id": "bulk-0"}], ["is_tutor"])
+        ids.append(index.snapshot_id())
+
+        assert None not in ids
+        assert len(set(ids)) == 4
+        # Row-wise inserts leave the renewal to their batch
+        index.insert_card(_bulk_card(1))
+        index.insert_features("bulk-1", {"is_tutor": True})
+        assert index.snapshot_id() == ids[-1]
+        index.materialize_role("tutor", "cf.is_tutor", "fingerprint")
+        assert index.snapshot_id() == ids[-1]
+        index.close()
+        assert CardIndex(temp_db_path, read_only=True).snapshot_id() == ids[-1]
+
+    def test_insert_cards_bulk_arrow(self, temp_db_path):
+        """Test bulk inserting an Arrow table."""
+        pa = pytest.importorskip("pyarrow")
+        index = CardIndex(temp_db_path)
+
+        table = pa.Table.from_pylist([_bulk_card(i) for i in range(3)])
+
+        assert index.insert_cards_bulk(table) == 3
+        count = index.conn.execute("SELECT COUNT(*) FROM cards").fetchone()
+        assert count == (3,)
+
+
+class TestQueryRole:
+    """Test role queries pushed down into DuckDB."""
+
+    @pytest.fixture
+    def role_index(self, temp_db_path):
+        """Index of draw cards in several colors, half of them legal."""
+        index = CardIndex(temp_db_path)
+        colors = ["G", "U", "B"]
+        index.insert_cards_bulk(
+            [
+                _bulk_card(
+                    i,
+                    color_identity=[colors[i % 3]],
+                    commander_legal=i % 2 == 0,
+                )
+                for i in range(12)
+            ]
+        )
+        index.insert_features_bulk(
+            [
+                {"scryfall_id": f"bulk-{i}", "draws_cards": True, "is_tutor": i < 6}
+                for i in range(12)
+            ]
+        )
+        return index
+
+    def test_filters_role_color_and_legality(self, role_index):
+        """Test that the predicate, ci_mask and legality are all applied."""
+        cards = role_index.query_role(
+            "cf.draws_cards AND NOT cf.is_tutor", color_identity_mask(["G", "U"])
+        )
+
+        # Legal (even), green or blue (i % 3 != 2), not a tutor (i >= 6)
+        assert [c["scryfall_id"] for c in cards] == ["bulk-6", "bulk-10"]
+        assert set(cards[0]) == set(CARD_COLUMNS)
+
+    def test_exclusions_and_limit(self, role_index):
+        """Test excluding names and IDs and limiting the result."""
+        mask = color_identity_mask(["G", "U", "B"])
+
+        cards = role_index.query_role(
+            "cf.draws_cards",
+            mask,
+            exclusions=["Bulk Card 0"],
+            exclude_ids=["bulk-2"],
+            limit=2,
+        )
+
+        assert [c["scryfall_id"] for c in cards] == ["bulk-4", "bulk-6"]
+        assert role_index.query_role("false", mask) == []
+
+
+class TestColorIdentityMask:
+    """Test the ci_mask color identity bitmask."""
+
+    @pytest.mark.parametrize(
+        "color_identity, expected",
+        [
+            ([], 0),
+            (None, 0),
+            (["W"], 1),
+            (["U", "B"], 6),
+            (["W", "U", "B", "R", "G"], 31),
+        ],
+    )
+    def test_color_identity_mask(self, color_identity, expected):
+        """Test encoding color identities as bitmasks."""
+        assert color_identity_mask(color_identity) == expected
+
+    def test_mask_computed_on_insert(self, temp_db_path):
+        """Test that single and bulk inserts store ci_mask."""
+        index = CardIndex(temp_db_path)
+        index.insert_card(_bulk_card(0, color_identity=["W", "G"]))
+        index.insert_cards_bulk([_bulk_card(1, color_identity=["U", "R"])])
+
+        rows = index.conn.execute(
+            "SELECT scryfall_id, ci_mask FROM cards ORDER BY scryfall_id"
+        ).fetchall()
+        assert rows == [("bulk-0", 17), ("bulk-1", 10)]
+
+    def test_price_stored_on_insert(self, temp_db_path):
+        """Test that single and bulk inserts store price_usd."""
+        index = CardIndex(temp_db_path)
+        index.insert_card(_bulk_card(0, price_usd=2.5))
+        index.insert_cards_bulk([_bulk_card(1, price_usd=0.1), _bulk_card(2)])
+
+        rows = index.conn.execute(
+            "SELECT scryfall_id, price_usd FROM cards ORDER BY scryfall_id"
+        ).fetchall()
+        assert rows == [("bulk-0", 2.5), ("bulk-1", 0.1), ("bulk-2", None)]
+
+    def test_query_cards_subset(self, temp_db_path):
+        """Test that query_cards keeps cards within the color identity."""
+        index = CardIndex(temp_db_path)
+        index.insert_cards_bulk(
+            [
+                _bulk_card(0, color_identity=[]),
+                _bulk_card(1, color_identity=["G"]),
+                _bulk_card(2, color_identity=["B", "G"]),
+                _bulk_card(3, color_identity=["W"]),
+            ]
+        )
+
+        def names(color_identity):
+            cards = index.query_cards(color_identity=color_identity)
+            return sorted(card["name"] for card in cards)
+
+        assert names(["G"]) == ["Bulk Card 0", "Bulk Card 1"]
+        assert names(["B", "G"]) == ["Bulk Card 0", "Bulk Card 1", "Bulk Card 2"]
+        assert names([]) == ["Bulk Card 0"]
+        assert len(names(None)) == 4
+
+    def test_backfills_older_index(self, temp_db_path):
+        """Test that an index built without ci_mask gets it on open."""
+        conn = duckdb.connect(str(temp_db_path))
+        conn.execute(
+            """
+            CREATE TABLE cards (
+                scryfall_id VARCHAR PRIMARY KEY,
+                name VARCHAR NOT NULL,
+                cmc INTEGER NOT NULL,
+                type_line VARCHAR NOT NULL,
+                color_identity VARCHAR[],
+                commander_legal BOOLEAN NOT NULL
+            )
+            """
+        )
+        conn.execute(
+            "INSERT INTO cards VALUES "
+            "('old-1', 'Old', 1, 'Instant', ['U', 'R'], true), "
+            "('old-2', 'Colorless', 1, 'Artifact', [], true)"
+        )
+        conn.close()
+
+        index = CardIndex(temp_db_path)
+
+        rows = index.conn.execute(
+            "SELECT scryfall_id, ci_mask FROM cards ORDER BY scryfall_id"
+        ).fetchall()
+        assert rows == [("old-1", 10), ("old-2", 0)]
+        assert index.conn.execute(
+            "SELECT price_usd FROM cards WHERE scryfall_id = 'old-1'"
+        ).fetchone() == (None,)
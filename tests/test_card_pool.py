@@ -0,0 +1,116 @@
+"""Tests for the in-memory card pool."""
+
+import pytest
+
+from mtg_deck_builder.data.card_index import CARD_COLUMNS, color_identity_mask
+from mtg_deck_builder.engine.card_pool import HAS_FEATURES, CardPool
+from mtg_deck_builder.engine.deck_builder import DeckBuilder
+from mtg_deck_builder.engine.deckbrief import DeckBrief
+from mtg_deck_builder.roles.role_engine import RoleEngine, pack_features
+
+FIVE_COLOR = color_identity_mask(["W", "U", "B", "R", "G"])
+
+
+@pytest.fixture
+def pool(mock_card_index, role_engine):
+    """Pool loaded from the fixture index."""
+    return CardPool.load(mock_card_index, role_engine)
+
+
+class TestCardPool:
+    """Test loading and querying a CardPool."""
+
+    def test_load_columns(self, pool, mock_card_index):
+        """Test that columns and records mirror the index rows."""
+        assert len(pool) == 6
+        assert pool.ids[0] == "test-commander-1"
+
+        draw = pool[pool.ids.index("test-draw-1")]
+        assert draw.name == "Test Draw"
+        assert draw.roles == ["card_draw"]
+        assert draw.feature_bits == HAS_FEATURES | pack_features({"draws_cards": True})
+        [expected] = mock_card_index.query_role(
+            "cf.scryfall_id = 'test-draw-1'", FIVE_COLOR
+        )
+        assert draw.to_dict() == expected
+        assert set(draw.to_dict()) == set(CARD_COLUMNS)
+        with pytest.raises(IndexError):
+            pool[len(pool)]
+
+    def test_select(self, pool):
+        """Test land, role, name and ID filters with a limit."""
+        lands = pool.select(FIVE_COLOR, 10, land=True)
+        assert [pool.names[i] for i in lands] == ["Test Land"]
+
+        # The land is white: a green deck cannot play it
+        assert pool.select(color_identity_mask(["G"]), 10, land=True) == []
+
+        spells = pool.select(FIVE_COLOR, 10, land=False, exclude_names={"Test Draw"})
+        assert "Test Land" not in [pool.names[i] for i in spells]
+        assert "Test Draw" not in [pool.names[i] for i in spells]
+        assert len(pool.select(FIVE_COLOR, 2, land=False)) == 2
+
+        ramp = pool.select(FIVE_COLOR, 10, role="ramp", exclude_ids={"test-draw-1"})
+        assert [pool.ids[i] for i in ramp] == ["test-ramp-1"]
+        assert pool.select(FIVE_COLOR, 10, role="nonexistent_role") == []
+
+    def test_candidates_cached_per_color_identity(self, pool):
+        """Test that candidate lists are shared until released."""
+        ramp = pool.candidates(FIVE_COLOR, role="ramp")
+
+        assert pool.candidates(FIVE_COLOR, role="ramp") is ramp
+        pool.release(FIVE_COLOR)
+        assert pool.candidates(FIVE_COLOR, role="ramp") is not ramp
+        assert pool.candidates(FIVE_COLOR, role="ramp") == ramp
+
+    def test_find(self, pool):
+        """Test exact and subset color identity lookups by name."""
+        assert pool.find("Test Commander", FIVE_COLOR, exact=True) == 0
+        assert pool.find("Test Commander", color_identity_mask(["W"])) is None
+        assert pool.find("Test Land", FIVE_COLOR) is not None
+        assert pool.find("Test Land", FIVE_COLOR, exact=True) is None
+
+    def test_cards_without_features_are_skipped(self, mock_card_index, role_engine):
+        """Test that cards without a features row are never selected."""
+        mock_card_index.conn.execute(
+            "DELETE FROM card_features WHERE scryfall_id = 'test-draw-1'"
+        )
+        pool = CardPool.load(mock_card_index, role_engine)
+
+        assert pool.find("Test Draw", FIVE_COLOR) is not None
+        assert "test-draw-1" not in [
+            pool.ids[i] for i in pool.select(FIVE_COLOR, 10, land=False)
+        ]
+
+    def test_too_many_roles(self, mock_card_index):
+        """Test that roles beyond the role bitset width are rejected."""
+        roles = {f"role_{i}": {"requires": ["draws_cards"]} for i in range(65)}
+
+        with pytest.raises(ValueError, match="64 roles"):
+            CardPool.load(mock_card_index, RoleEngine(roles))
+
+    @pytest.mark.parametrize(
+        "brief",
+        [
+            DeckBrief(
+                commander="Test Commander",
+                color_identity=["W", "U", "B", "R", "G"],
+                role_targets={"ramp": 2, "card_draw": 1, "interaction": 3},
+            ),
+            DeckBrief(
+                commander="Test Commander",
+                color_identity=["W", "U", "B", "R", "G"],
+                role_targets={"finisher": 1},
+                exclusions=["Test Land", "Test Removal"],
+                must_includes=["Test Removal", "Test Draw"],
+            ),
+        ],
+    )
+    def test_pool_builds_match_index_builds(
+        self, mock_card_index, role_engine, pool, brief
+    ):
+        """Test that building against the pool gives the same deck."""
+        expected = DeckBuilder(mock_card_index, role_engine).build_deck(brief)
+
+        builder = DeckBuilder(mock_card_index, role_engine, pool)
+        assert builder.build_deck(brief) == expected
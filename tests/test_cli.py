@@ -2,9 +2,22 @@
 
 import pytest
 import json
+import requests
+from pathlib import Path
 from unittest.mock import patch
-from mtg_deck_builder.cli import main, build_deck
+from mtg_deck_builder.cli import (
+    _index_batch,
+    _prepare_cards,
+    main,
+    build_batch,
+    build_deck,
+    build_index,
+    reextract,
+)
 from mtg_deck_builder.data.card_index import CardIndex
+from mtg_deck_builder.data.normalise import normalise_card
+from mtg_deck_builder.roles.materialize import stale_roles
+from mtg_deck_builder.roles.role_engine import RoleEngine
 
 
 class TestCLI:
@@ -60,6 +73,398 @@ class TestCLI:
         assert len(data["deck"]) >= 1  # At least commander
         assert data["commander"]["name"] == "Test Commander"
 
+    def test_build_index_streams_cards(
+        self, temp_db_path, sample_scryfall_card, tmp_path
+    ):
+        """Test that build_index consumes the card stream into the index."""
+        cards = [
+            {**sample_scryfall_card, "id": f"card-{i}", "name": f"Card {i}"}
+            for i in range(3)
+        ]
+
+        with patch(
+            "mtg_deck_builder.cli.ScryfallClient.iter_cards", return_value=iter(cards)
+        ):
+            index = build_index(
+                cache_path=tmp_path / "cache.db", index_path=temp_db_path
+            )
+
+        row = index.conn.execute(
+            "SELECT COUNT(*) FROM cards c JOIN card_features cf USING (scryfall_id)"
+        ).fetchone()
+        assert row is not None
+        assert row[0] == 3
+
+    def test_build_index_closes_cache(
+        self, temp_db_path, sample_scryfall_card, tmp_path
+    ):
+        """Test that build_index closes the page cache it opened."""
+        with (
+            patch(
+                "mtg_deck_builder.cli.ScryfallClient.iter_cards",
+                return_value=iter([sample_scryfall_card]),
+            ),
+            patch(
+                "mtg_deck_builder.cli.ScryfallCache.close", autospec=True
+            ) as cache_close,
+        ):
+            build_index(
+                cache_path=tmp_path / "cache.db", index_path=temp_db_path
+            ).close()
+
+        cache_close.assert_called_once()
+
+    def test_build_index_reports_fetch_errors(
+        self, temp_db_path, sample_scryfall_card, tmp_path, capsys
+    ):
+        """Test that a failed page fetch is reported as an API error."""
+
+        def cards():
+            yield sample_scryfall_card
+            raise requests.ConnectionError("connection reset")
+
+        with patch(
+            "mtg_deck_builder.cli.ScryfallClient.iter_cards", return_value=cards()
+        ):
+            with pytest.raises(SystemExit):
+                build_index(cache_path=tmp_path / "cache.db", index_path=temp_db_path)
+
+        out = capsys.readouterr().out
+        assert "Failed to fetch cards from Scryfall API: connection reset" in out
+
+    def test_build_index_reports_index_errors(
+        self, temp_db_path, sample_scryfall_card, tmp_path, capsys
+    ):
+        """Test that an index write failure is not blamed on the API."""
+        with (
+            patch(
+                "mtg_deck_builder.cli.ScryfallClient.iter_cards",
+                return_value=iter([sample_scryfall_card]),
+            ),
+            patch(
+                "mtg_deck_builder.cli._index_batch",
+                side_effect=RuntimeError("disk full"),
+            ),
+        ):
+            with pytest.raises(SystemExit):
+                build_index(cache_path=tmp_path / "cache.db", index_path=temp_db_path)
+
+        out = capsys.readouterr().out
+        assert "Failed to build index: disk full" in out
+        assert "Failed to fetch" not in out
+
+    def test_build_index_falls_back_to_row_inserts(
+        self, temp_db_path, sample_scryfall_card, tmp_path
+    ):
+        """Test that a failed bulk insert retries the batch card by card."""
+        bulk_path = tmp_path / "oracle-cards.json"
+        bulk_path.write_text(
+            json.dumps(
+                [
+                    {**sample_scryfall_card, "id": f"card-{i}", "name": f"Card {i}"}
+                    for i in range(5)
+                ]
+            )
+        )
+
+        with patch(
+            "mtg_deck_builder.cli.CardIndex.insert_cards_bulk",
+            side_effect=RuntimeError("bulk insert failed"),
+        ) as bulk_insert:
+            index = build_index(
+                index_path=temp_db_path, bulk_path=bulk_path, batch_size=2
+            )
+
+        assert bulk_insert.call_count == 3
+        row = index.conn.execute(
+            "SELECT COUNT(*) FROM cards c JOIN card_features cf USING (scryfall_id)"
+        ).fetchone()
+        assert row is not None
+        assert row[0] == 5
+
+    @patch("mtg_deck_builder.cli.ScryfallClient")
+    def test_build_index_from_bulk_file(
+        self, mock_client, temp_db_path, sample_scryfall_card, tmp_path
+    ):
+        """Test that build_index ingests a bulk file without the API."""
+        bulk_path = tmp_path / "oracle-cards.json"
+        bulk_path.write_text(
+            json.dumps(
+                [
+                    {**sample_scryfall_card, "id": f"card-{i}", "name": f"Card {i}"}
+                    for i in range(5)
+                ]
+            )
+        )
+
+        index = build_index(index_path=temp_db_path, bulk_path=bulk_path)
+
+        mock_client.assert_not_called()
+        row = index.conn.execute("SELECT COUNT(*) FROM card_features").fetchone()
+        assert row is not None
+        assert row[0] == 5
+
+    def test_prepare_cards_in_process_pool(self, sample_scryfall_card):
+        """Test that pooled preparation keeps input order and outcomes."""
+        cards = [
+            {**sample_scryfall_card, "id": f"card-{i}", "name": f"Card {i}"}
+            for i in range(20)
+        ]
+        cards[7] = {**cards[7], "id": ""}
+        cards[11] = {**cards[11], "oracle_text": None}
+
+        serial = list(_prepare_cards(cards))
+        pooled = list(_prepare_cards(iter(cards), workers=2, chunk_size=3))
+
+        assert pooled == serial
+        assert [card_json["id"] for card_json, _ in pooled] == [
+            card["id"] for card in cards
+        ]
+        statuses = [status for _, (status, _, _) in pooled]
+        assert statuses[7] == "missing"
+        assert statuses[11] == "error"
+        assert statuses.count("ok") == 18
+
+    def test_build_index_with_workers(
+        self, temp_db_path, sample_scryfall_card, tmp_path
+    ):
+        """Test that a multi-process build indexes the same cards."""
+        bulk_path = tmp_path / "oracle-cards.json"
+        bulk_path.write_text(
+            json.dumps(
+                [
+                    {**sample_scryfall_card, "id": f"card-{i}", "name": f"Card {i}"}
+                    for i in range(50)
+                ]
+            )
+        )
+
+        index = build_index(index_path=temp_db_path, bulk_path=bulk_path, workers=2)
+
+        row = index.conn.execute(
+            "SELECT COUNT(*) FROM cards c JOIN card_features cf USING (scryfall_id)"
+        ).fetchone()
+        assert row is not None
+        assert row[0] == 50
+
+    def test_build_index_sql_feature_engine(self, sample_scryfall_card, tmp_path):
+        """Test that SQL-derived features match the Python engine's."""
+        texts = [
+            "Draw two cards.",
+            "Destroy all creatures.",
+            "{T}: Add {G}.",
+            "Exile target creature.",
+        ]
+        bulk_path = tmp_path / "oracle-cards.json"
+        bulk_path.write_text(
+            json.dumps(
+                [
+                    {
+                        **sample_scryfall_card,
+                        "id": f"card-{i}",
+                        "name": f"Card {i}",
+                        "oracle_text": text,
+                    }
+                    for i, text in enumerate(texts)
+                ]
+            )
+        )
+
+        def features(engine):
+            index = build_index(
+                index_path=tmp_path / f"{engine}.duckdb",
+                bulk_path=bulk_path,
+                feature_engine=engine,
+            )
+            return index.conn.execute(
+                "SELECT * FROM card_features ORDER BY scryfall_id"
+            ).fetchall()
+
+        python_features = features("python")
+        assert len(python_features) == len(texts)
+        assert features("sql") == python_features
+
+    def test_build_index_unknown_feature_engine(self, temp_db_path):
+        """Test that an unknown feature engine is rejected."""
+        with pytest.raises(ValueError, match="feature engine"):
+            build_index(index_path=temp_db_path, feature_engine="numpy")
+
+    def test_build_index_records_feature_versions(
+        self, temp_db_path, sample_scryfall_card, tmp_path
+    ):
+        """Test that a fresh index needs no re-extraction."""
+        bulk_path = tmp_path / "oracle-cards.json"
+        bulk_path.write_text(json.dumps([sample_scryfall_card]))
+
+        build_index(index_path=temp_db_path, bulk_path=bulk_path).close()
+
+        assert reextract(index_path=temp_db_path) == []
+
+    def test_build_index_materializes_roles(
+        self, temp_db_path, sample_scryfall_card, tmp_path
+    ):
+        """Test that a fresh index has every role materialized."""
+        bulk_path = tmp_path / "oracle-cards.json"
+        card = {**sample_scryfall_card, "oracle_text": "Draw two cards."}
+        bulk_path.write_text(json.dumps([card]))
+
+        index = build_index(index_path=temp_db_path, bulk_path=bulk_path)
+
+        assert stale_roles(index, RoleEngine()) == []
+        rows = index.conn.execute("SELECT role FROM card_roles").fetchall()
+        assert rows == [("card_draw",)]
+
+    @patch("mtg_deck_builder.cli.build_deck")
+    def test_cli_build_roles_file(self, mock_build_deck):
+        """Test that --roles is passed through to build_deck."""
+        with patch(
+            "sys.argv",
+            ["mtg-deck-builder", "build", "Test", "--colors", "R", "--roles", "r.yaml"],
+        ):
+            main()
+
+        _, kwargs = mock_build_deck.call_args
+        assert kwargs["roles_path"] == Path("r.yaml")
+        assert kwargs["scoring"] is False
+        assert kwargs["soft_budget"] is None
+
+    @patch("mtg_deck_builder.cli.build_deck")
+    def test_cli_build_scoring(self, mock_build_deck):
+        """Test that --score and --budget are passed through to build_deck."""
+        with patch(
+            "sys.argv",
+            ["mtg-deck-builder", "build", "Test", "--colors", "R", "--score"]
+            + ["--budget", "150"],
+        ):
+            main()
+
+        _, kwargs = mock_build_deck.call_args
+        assert kwargs["scoring"] is True
+        assert kwargs["soft_budget"] == 150
+        assert kwargs["optimize"] is False
+
+    @patch("mtg_deck_builder.cli.build_deck")
+    def test_cli_build_optimize(self, mock_build_deck):
+        """Test that --optimize and --seed are passed through to build_deck."""
+        with patch(
+            "sys.argv",
+            ["mtg-deck-builder", "build", "Test", "--colors", "R", "--optimize"]
+            + ["--seed", "7"],
+        ):
+            main()
+
+        _, kwargs = mock_build_deck.call_args
+        assert kwargs["optimize"] is True
+        assert kwargs["seed"] == 7
+        assert kwargs["assign_roles"] is False
+
+    @patch("mtg_deck_builder.cli.build_deck")
+    def test_cli_build_assign_roles(self, mock_build_deck):
+        """Test that --assign-roles is passed through to build_deck."""
+        with patch(
+            "sys.argv",
+            ["mtg-deck-builder", "build", "Test", "--colors", "R", "--assign-roles"],
+        ):
+            main()
+
+        _, kwargs = mock_build_deck.call_args
+        assert kwargs["assign_roles"] is True
+        assert kwargs["cache_path"] is None
+
+    @patch("mtg_deck_builder.cli.build_deck")
+    def test_cli_build_cache(self, mock_build_deck):
+        """Test that --build-cache is passed through to build_deck."""
+        with patch(
+            "sys.argv",
+            ["mtg-deck-builder", "build", "Test", "--colors", "R"]
+            + ["--build-cache", "builds.db"],
+        ):
+            main()
+
+        _, kwargs = mock_build_deck.call_args
+        assert kwargs["cache_path"] == Path("builds.db")
+
+    def test_build_batch_output_independent_of_workers(
+        self, mock_card_index, temp_db_path, tmp_path
+    ):
+        """Test that batch output is in input order for any worker count."""
+        mock_card_index.close()
+        briefs = [
+            {
+                "commander": "Test Commander",
+                "color_identity": ["W", "U", "B", "R", "G"],
+                "role_targets": {"ramp": i % 3, "card_draw": 1},
+                "exclusions": ["Test Draw"] if i % 2 else [],
+            }
+            for i in range(7)
+        ]
+        briefs.insert(3, {"commander": "Missing", "color_identity": ["G"]})
+        briefs_path = tmp_path / "briefs.jsonl"
+        briefs_path.write_text("".join(json.dumps(b) + "\n" for b in briefs) + "\n")
+
+        outputs = []
+        for workers in (1, 2):
+            output_path = tmp_path / f"decks-{workers}.jsonl"
+            built = build_batch(
+                briefs_path,
+                output_path,
+                index_path=temp_db_path,
+                workers=workers,
+                chunk_size=2,
+            )
+            assert built == 7
+            outputs.append(output_path.read_text())
+
+        assert outputs[0] == outputs[1]
+        results = [json.loads(line) for line in outputs[0].splitlines()]
+        assert len(results) == 8
+        assert results[3] == {"error": "Commander 'Missing' not found or illegal"}
+        assert results[1]["role_counts"] == {"ramp": 1, "card_draw": 0}
+        assert results[2]["role_counts"] == {"ramp": 1, "card_draw": 1}  # one ramp card
+
+    def test_build_batch_invalid_brief(self, mock_card_index, temp_db_path, tmp_path):
+        """Test that an invalid brief line stops the batch before building."""
+        mock_card_index.close()
+        briefs_path = tmp_path / "briefs.jsonl"
+        briefs_path.write_text('{"commander": "Test Commander"}\n')
+
+        with pytest.raises(SystemExit):
+            build_batch(briefs_path, tmp_path / "out.jsonl", index_path=temp_db_path)
+
+    @patch("mtg_deck_builder.cli.build_batch")
+    def test_cli_build_batch_command(self, mock_build_batch):
+        """Test that build-batch arguments are passed through."""
+        with patch(
+            "sys.argv",
+            [
+                "mtg-deck-builder",
+                "build-batch",
+                "briefs.jsonl",
+                "--output",
+                "decks.jsonl",
+                "--workers",
+                "4",
+                "--score",
+                "--optimize",
+                "--assign-roles",
+            ],
+        ):
+            main()
+
+        _, kwargs = mock_build_batch.call_args
+        assert kwargs["briefs_path"] == Path("briefs.jsonl")
+        assert kwargs["output_path"] == Path("decks.jsonl")
+        assert kwargs["workers"] == 4
+        assert kwargs["scoring"] is True
+        assert kwargs["optimize"] is True
+        assert kwargs["seed"] == 0
+        assert kwargs["assign_roles"] is True
+
+    def test_reextract_missing_index(self, tmp_path):
+        """Test that reextract exits when the index does not exist."""
+        with pytest.raises(SystemExit):
+            reextract(index_path=tmp_path / "missing.duckdb")
+
     @patch("mtg_deck_builder.cli.build_index")
     def test_cli_index_command(self, mock_build_index):
         """Test the index command."""
@@ -68,6 +473,43 @@ class TestCLI:
 
         mock_build_index.assert_called_once()
 
+    def test_index_batch_fallback_renews_snapshot_once(
+        self, temp_db_path, sample_scryfall_card
+    ):
+        """Test that the row-wise fallback renews the snapshot per batch."""
+        index = CardIndex(temp_db_path)
+        batch = [
+            (card_json, normalise_card(card_json), {"produces_mana": False})
+            for card_json in (
+                sample_scryfall_card | {"id": f"card-{i}", "name": f"Card {i}"}
+                for i in range(3)
+            )
+        ]
+        before = index.snapshot_id()
+
+        with (
+            patch.object(index, "insert_cards_bulk", side_effect=ValueError),
+            patch.object(index, "new_snapshot", wraps=index.new_snapshot) as renew,
+        ):
+            assert _index_batch(index, batch) == 0
+
+        assert renew.call_count == 1
+        assert index.snapshot_id() != before
+        count = index.conn.execute("SELECT COUNT(*) FROM cards").fetchone()
+        assert count == (3,)
+
+    @patch("mtg_deck_builder.cli.build_index")
+    def test_cli_index_bulk_file(self, mock_build_index):
+        """Test that --bulk-file is passed through to build_index."""
+        with patch(
+            "sys.argv",
+            ["mtg-deck-builder", "index", "--bulk-file", "oracle-cards.json"],
+        ):
+            main()
+
+        _, kwargs = mock_build_index.call_args
+        assert kwargs["bulk_path"] == Path("oracle-cards.json")
+
     @patch("mtg_deck_builder.cli.build_deck")
     def test_cli_build_command(self, mock_build_deck):
         """Test the build command."""
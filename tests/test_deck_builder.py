@@ -1,8 +1,58 @@
 """Tests for deck builder."""
 
 import pytest
+from unittest.mock import Mock
+
+from mtg_deck_builder.cache.build_cache import BuildCache
+from mtg_deck_builder.data.card_index import CardIndex
+from mtg_deck_builder.engine.card_pool import CardPool
 from mtg_deck_builder.engine.deck_builder import DeckBuilder
 from mtg_deck_builder.engine.deckbrief import DeckBrief
+from mtg_deck_builder.engine.optimizer import DeckOptimizer
+from mtg_deck_builder.roles.materialize import materialize_roles
+
+# Feature rows cycled through by _large_index
+_FEATURE_CYCLE = [
+    {"produces_mana": True},
+    {"draws_cards": True},
+    {},
+    {"removes_creature": True},
+    {},
+    {"produces_mana": True, "draws_cards": True},
+]
+
+
+def _large_index(db_path, n_spells):
+    """Index with a green commander and more than a deck's worth of spells."""
+    cards = [
+        {
+            "scryfall_id": f"card-{i}",
+            "name": "Big Commander" if i == 0 else f"Spell {i}",
+            "mana_cost": "{G}",
+            "cmc": 4 if i == 0 else i % 8,
+            "type_line": "Legendary Creature — Elf" if i == 0 else "Sorcery",
+            "oracle_text": "",
+            "colors": ["G"],
+            "color_identity": ["G"],
+            "rarity": "common",
+            "commander_legal": True,
+            "power": None,
+            "toughness": None,
+            "keywords": [],
+            "produced_mana": [],
+            "price_usd": float(i % 5),
+        }
+        for i in range(n_spells + 1)
+    ]
+    index = CardIndex(db_path)
+    index.insert_cards_bulk(cards)
+    index.insert_features_bulk(
+        [
+            {"scryfall_id": f"card-{i}", **_FEATURE_CYCLE[i % len(_FEATURE_CYCLE)]}
+            for i in range(n_spells + 1)
+        ]
+    )
+    return index
 
 
 class TestDeckBuilder:
@@ -130,6 +180,24 @@ class TestDeckBuilder:
         card_names = [card["name"] for card in result["deck"]]
         assert "Test Ramp" in card_names
 
+    def test_trim_keeps_must_includes(self, temp_db_path, role_engine):
+        """Test that trimming to 99 never drops a must-include."""
+        index = _large_index(temp_db_path, 120)
+        brief = DeckBrief(
+            commander="Big Commander",
+            color_identity=["G"],
+            role_targets={},
+            must_includes=["Spell 120"],
+        )
+
+        result = DeckBuilder(index, role_engine).build_deck(brief)
+
+        names = [card["name"] for card in result["deck"]]
+        assert len(names) == 99
+        assert names[0] == "Big Commander"
+        assert names[-1] == "Spell 120"
+        assert result["explanation"][-1] == "Trimmed deck to exactly 99 cards"
+
     def test_deck_size_exactly_99(self, mock_card_index, role_engine):
         """Test that deck is exactly 99 cards."""
         builder = DeckBuilder(mock_card_index, role_engine)
@@ -195,3 +263,380 @@ class TestDeckBuilder:
             assert card_colors.issubset(deck_colors), (
                 f"Card {card['name']} has invalid colors {card_colors}"
             )
+
+    def test_role_candidates_single_query(self, mock_card_index, role_engine):
+        """Test that role candidates are fetched with one joined query."""
+        builder = DeckBuilder(mock_card_index, role_engine)
+        conn = Mock(wraps=mock_card_index.conn)
+        mock_card_index.conn = conn
+
+        candidates = builder._get_role_candidates(
+            "card_draw", ["W", "U", "B", "R", "G"], 10, [], []
+        )
+
+        assert conn.execute.call_count == 1
+        assert [c["name"] for c in candidates] == ["Test Draw"]
+        assert "produces_mana" not in candidates[0]
+        assert "LIMIT" in conn.execute.call_args.args[0]
+
+    def test_role_candidates_from_materialized_roles(
+        self, mock_card_index, role_engine
+    ):
+        """Test that materialized roles give the same candidates as the rules."""
+        materialize_roles(mock_card_index, role_engine)
+        builder = DeckBuilder(mock_card_index, role_engine)
+
+        for role_name in role_engine.roles:
+            args = (role_name, ["W", "U", "B", "R", "G"], 10, [], [])
+            assert builder._get_role_candidates(
+                *args, materialized=True
+            ) == builder._get_role_candidates(*args)
+
+        # Stale materializations are ignored by build_deck
+        mock_card_index.conn.execute("DELETE FROM card_roles")
+        mock_card_index.invalidate_roles()
+        result = builder.build_deck(
+            DeckBrief(
+                commander="Test Commander",
+                color_identity=["W", "U", "B", "R", "G"],
+                role_targets={"card_draw": 1},
+            )
+        )
+        assert result["role_counts"] == {"card_draw": 1}
+
+    def test_build_decks_in_input_order(self, mock_card_index, role_engine):
+        """Test that batch builds match single builds, in input order."""
+        five_color = ["W", "U", "B", "R", "G"]
+        briefs = [
+            DeckBrief(
+                commander="Test Commander",
+                color_identity=five_color,
+                role_targets={"ramp": 1},
+            ),
+            DeckBrief(
+                commander="Test Land",
+                color_identity=["W"],
+                role_targets={"card_draw": 1},
+            ),
+            DeckBrief(
+                commander="Test Commander",
+                color_identity=five_color,
+                role_targets={"card_draw": 1},
+                exclusions=["Test Draw"],
+            ),
+        ]
+        builder = DeckBuilder(mock_card_index, role_engine)
+
+        results = builder.build_decks(briefs)
+
+        assert results == [builder.build_deck(brief) for brief in briefs]
+        assert results[2]["role_counts"] == {"card_draw": 0}
+
+    def test_build_decks_errors(self, mock_card_index, role_engine):
+        """Test that unbuildable briefs raise or are reported in place."""
+        briefs = [
+            DeckBrief(commander="Missing", color_identity=["G"], role_targets={}),
+            DeckBrief(
+                commander="Test Commander",
+                color_identity=["W", "U", "B", "R", "G"],
+                role_targets={},
+            ),
+        ]
+        builder = DeckBuilder(mock_card_index, role_engine)
+
+        with pytest.raises(ValueError, match="Missing"):
+            builder.build_decks(briefs)
+
+        results = builder.build_decks(briefs, raise_errors=False)
+        assert results[0] == {"error": "Commander 'Missing' not found or illegal"}
+        assert results[1]["commander"]["name"] == "Test Commander"
+
+
+class TestScoredBuild:
+    """Test building decks with scoring."""
+
+    def test_role_cards_picked_first(self, mock_card_index, role_engine):
+        """Test that cards filling role deficits are picked before others."""
+        builder = DeckBuilder(mock_card_index, role_engine, scoring=True)
+        brief = DeckBrief(
+            commander="Test Commander",
+            color_identity=["W", "U", "B", "R", "G"],
+            role_targets={"ramp": 1, "card_draw": 1, "interaction": 1, "tutor": 2},
+        )
+
+        result = builder.build_deck(brief)
+
+        names = [card["name"] for card in result["deck"]]
+        assert names[:2] == ["Test Commander", "Test Land"]
+        assert set(names[2:5]) == {"Test Ramp", "Test Draw", "Test Removal"}
+        assert names[5:] == ["Test Finisher"]
+        assert result["role_counts"] == {
+            "ramp": 1,
+            "card_draw": 1,
+            "interaction": 1,
+            "tutor": 0,
+        }
+        assert [s["name"] for s in result["scores"]] == names[2:]
+        assert result["scores"][0]["roles"]
+        assert result["scores"][-1]["role_deficit_bonus"] == 0
+        assert any("Test Finisher: score" in line for line in result["explanation"])
+        assert builder.build_deck(brief) == result
+
+    def test_exclusions_and_must_includes(self, mock_card_index, role_engine):
+        """Test that must-includes are added before scored picks."""
+        builder = DeckBuilder(mock_card_index, role_engine, scoring=True)
+        brief = DeckBrief(
+            commander="Test Commander",
+            color_identity=["W", "U", "B", "R", "G"],
+            role_targets={"card_draw": 1},
+            soft_budget=100,
+            exclusions=["Test Ramp", "Test Draw"],
+            must_includes=["Test Draw", "Missing Card"],
+        )
+
+        result = builder.build_deck(brief)
+
+        names = [card["name"] for card in result["deck"]]
+        assert "Test Ramp" not in names
+        assert names[2] == "Test Draw"
+        assert len(names) == len(set(names))
+        assert result["role_counts"] == {"card_draw": 1}
+        assert "Added must-include: Test Draw" in result["explanation"]
+
+    def test_build_decks_with_scoring(self, mock_card_index, role_engine):
+        """Test that batch builds use scoring too."""
+        builder = DeckBuilder(mock_card_index, role_engine, scoring=True)
+        brief = DeckBrief(
+            commander="Test Commander",
+            color_identity=["W", "U", "B", "R", "G"],
+            role_targets={"finisher": 1},
+        )
+
+        [result] = builder.build_decks([brief])
+
+        assert result == builder.build_deck(brief)
+        assert result["deck"][2]["name"] == "Test Finisher"
+
+
+class TestOptimizedBuild:
+    """Test building decks with the optimizer pass."""
+
+    BRIEF = DeckBrief(
+        commander="Big Commander",
+        color_identity=["G"],
+        role_targets={"ramp": 12, "card_draw": 10, "interaction": 8},
+        soft_budget=120,
+        must_includes=["Spell 150", "Spell 149"],
+    )
+
+    @pytest.mark.parametrize("scoring", [False, True])
+    def test_optimized_build(self, temp_db_path, role_engine, scoring):
+        """Test that optimization improves the deck and keeps locked cards."""
+        index = _large_index(temp_db_path, 150)
+        plain = DeckBuilder(index, role_engine, scoring=scoring).build_deck(self.BRIEF)
+        builder = DeckBuilder(
+            index, role_engine, scoring=scoring, optimizer=DeckOptimizer(seed=3)
+        )
+
+        result = builder.build_deck(self.BRIEF)
+
+        optimization = result["optimization"]
+        assert optimization["objective_after"] >= optimization["objective_before"]
+        assert optimization["stopped"] == "converged"
+        names = [card["name"] for card in result["deck"]]
+        assert len(names) == len(set(names)) == 99
+        assert names[0] == "Big Commander"
+        assert {"Spell 150", "Spell 149"} <= set(names)
+        swapped_out = {swap["out"] for swap in optimization["swaps"]}
+        assert not swapped_out & {"Big Commander", "Spell 150", "Spell 149"}
+        if not scoring:
+            # The greedy fill leaves room to improve
+            assert optimization["swaps"]
+            assert names != [card["name"] for card in plain["deck"]]
+        assert result["role_counts"]["ramp"] >= 12
+        assert any(
+            line.startswith("Optimized with seed 3") for line in result["explanation"]
+        )
+
+    def test_reproducible(self, temp_db_path, role_engine):
+        """Test that the same index, brief and seed give the same deck."""
+        index = _large_index(temp_db_path, 150)
+
+        results = [
+            DeckBuilder(index, role_engine, optimizer=DeckOptimizer(seed=9)).build_deck(
+                self.BRIEF
+            )
+            for _ in range(2)
+        ]
+
+        assert results[0] == results[1]
+
+
+class TestAssignedRolesBuild:
+    """Test building decks with role assignment."""
+
+    BRIEF = DeckBrief(
+        commander="Big Commander",
+        color_identity=["G"],
+        role_targets={"ramp": 12, "card_draw": 10, "interaction": 8},
+    )
+
+    def test_fewest_role_cards(self, temp_db_path, role_engine):
+        """Test that ramp-and-draw cards count toward both targets."""
+        index = _large_index(temp_db_path, 150)
+        builder = DeckBuilder(index, role_engine, assign_roles=True)
+
+        result = builder.build_deck(self.BRIEF)
+
+        names = [card["name"] for card in result["deck"]]
+        assert len(names) == len(set(names)) == 99
+        # At least 10 ramp-and-draw cards, then 8 interaction cards
+        assert any(
+            line.startswith("Assigned 20 cards to roles")
+            for line in result["explanation"]
+        )
+        for role, target in self.BRIEF.role_targets.items():
+            assert result["role_counts"][role] >= target
+        assert builder.pool is not None
+
+    def test_scored_build(self, temp_db_path, role_engine):
+        """Test that a scored build picks the assigned role sets first."""
+        index = _large_index(temp_db_path, 150)
+        builder = DeckBuilder(index, role_engine, scoring=True, assign_roles=True)
+
+        result = builder.build_deck(self.BRIEF)
+
+        assert "Assigning 20 cards to role targets" in result["explanation"]
+        picks = result["scores"][:20]
+        assert all(pick["roles"] for pick in picks)
+        assert sum(len(pick["roles"]) == 2 for pick in picks) == 10
+        for role, target in self.BRIEF.role_targets.items():
+            assert result["role_counts"][role] >= target
+
+
+class TestDeckVariants:
+    """Test building several distinct decks for one brief."""
+
+    BRIEF = DeckBrief(
+        commander="Big Commander",
+        color_identity=["G"],
+        role_targets={"ramp": 12, "card_draw": 10, "interaction": 8},
+        soft_budget=120,
+        must_includes=["Spell 150"],
+    )
+
+    def test_distinct_variants(self, temp_db_path, role_engine):
+        """Test that variants differ and drop earlier marginal picks."""
+        index = _large_index(temp_db_path, 200)
+        builder = DeckBuilder(index, role_engine)
+
+        variants = builder.build_deck_variants(self.BRIEF, 3, drop=4)
+
+        assert [v["variant"] for v in variants] == [0, 1, 2]
+        assert variants[0]["excluded"] == []
+        assert len(variants[1]["excluded"]) == 4
+        assert variants[1]["excluded"] == variants[2]["excluded"][:4]
+        decks = [frozenset(card["name"] for card in v["deck"]) for v in variants]
+        assert len(set(decks)) == 3
+        for variant, deck in zip(variants, decks):
+            assert len(deck) == 99
+            assert {"Big Commander", "Spell 150"} <= deck
+            assert not deck & set(variant["excluded"])
+        # The first variant is the plain scored build
+        plain = DeckBuilder(index, role_engine, scoring=True).build_deck(self.BRIEF)
+        assert variants[0]["deck"] == plain["deck"]
+
+    def test_optimized_variants(self, temp_db_path, role_engine):
+        """Test that the optimizer never swaps excluded cards back in."""
+        index = _large_index(temp_db_path, 200)
+        builder = DeckBuilder(
+            index, role_engine, optimizer=DeckOptimizer(seed=1), assign_roles=True
+        )
+
+        variants = builder.build_deck_variants(self.BRIEF, 2)
+
+        assert all("optimization" in v for v in variants)
+        names = {card["name"] for card in variants[1]["deck"]}
+        assert not names & set(variants[1]["excluded"])
+
+    def test_invalid_k(self, temp_db_path, role_engine):
+        """Test that k below 1 is rejected."""
+        builder = DeckBuilder(_large_index(temp_db_path, 10), role_engine)
+
+        with pytest.raises(ValueError, match="at least 1"):
+            builder.build_deck_variants(self.BRIEF, 0)
+
+
+class TestCachedBuild:
+    """Test serving builds from the build cache."""
+
+    BRIEF = DeckBrief(
+        commander="Big Commander",
+        color_identity=["G"],
+        role_targets={"ramp": 12, "card_draw": 10},
+        exclusions=["Spell 3", "Spell 9"],
+    )
+
+    @pytest.mark.parametrize("scoring", [False, True])
+    def test_identical_brief_served(self, temp_db_path, role_engine, scoring):
+        """Test that an equivalent brief is served the stored result."""
+        index = _large_index(temp_db_path, 150)
+        cache = BuildCache(":memory:")
+        builder = DeckBuilder(index, role_engine, scoring=scoring, cache=cache)
+
+        first = builder.build_deck(self.BRIEF)
+        again = builder.build_deck(
+            DeckBrief(
+                commander="Big Commander",
+                color_identity=["G"],
+                role_targets={"ramp": 12, "card_draw": 10},
+                exclusions=["Spell 9", "Spell 3"],
+            )
+        )
+
+        assert again == first
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_options_and_index_changes_miss(self, temp_db_path, role_engine):
+        """Test that other builder options or an index write rebuild."""
+        index = _large_index(temp_db_path, 150)
+        cache = BuildCache(":memory:")
+        DeckBuilder(index, role_engine, cache=cache).build_deck(self.BRIEF)
+
+        DeckBuilder(index, role_engine, scoring=True, cache=cache).build_deck(
+            self.BRIEF
+        )
+        assert (cache.hits, cache.misses) == (0, 2)
+
+        index.insert_features_bulk([{"scryfall_id": "card-5", "draws_cards": True}])
+        materialize_roles(index, role_engine)
+        builder = DeckBuilder(index, role_engine, cache=cache)
+        builder.build_deck(self.BRIEF)
+        assert (cache.hits, cache.misses) == (0, 3)
+        # Results of the old snapshot were dropped
+        assert len(cache) == 1
+        builder.build_deck(self.BRIEF)
+        assert cache.hits == 1
+
+    def test_stale_pool_not_served_after_rebuild(self, temp_db_path, role_engine):
+        """Test that a pool loaded before a rebuild keys its own snapshot."""
+        index = _large_index(temp_db_path, 150)
+        cache = BuildCache(":memory:")
+        stale = DeckBuilder(
+            index, role_engine, CardPool.load(index, role_engine), cache=cache
+        )
+
+        # Rebuild: the blank cards now ramp, so the ramp bucket changes
+        index.insert_features_bulk(
+            [
+                {"scryfall_id": f"card-{i}", "produces_mana": True}
+                for i in range(2, 40, 6)
+            ]
+        )
+        materialize_roles(index, role_engine)
+        stale_result = stale.build_deck(self.BRIEF)
+        fresh = DeckBuilder(index, role_engine, cache=cache).build_deck(self.BRIEF)
+
+        assert (cache.hits, cache.misses) == (0, 2)
+        assert fresh == DeckBuilder(index, role_engine).build_deck(self.BRIEF)
+        assert fresh["deck"] != stale_result["deck"]
@@ -63,3 +63,25 @@ class TestDeckBrief:
 
         assert brief.role_targets == targets
         # Note: dataclass assigns dict directly, no automatic copying
+
+    def test_canonical(self):
+        """Test that equivalent briefs have the same canonical form."""
+        brief = DeckBrief(
+            commander="Test Commander",
+            color_identity=["U", "W"],
+            role_targets={"ramp": 5, "draw": 5},
+            exclusions=["B", "A", "B"],
+            must_includes=["Y", "X"],
+        )
+        same = DeckBrief(
+            commander="Test Commander",
+            color_identity=["W", "U"],
+            role_targets={"ramp": 5, "draw": 5},
+            exclusions=["A", "B"],
+            must_includes=["Y", "X"],
+        )
+
+        assert brief.canonical() == same.canonical()
+        assert brief.canonical()["must_includes"] == ["Y", "X"]
+        reordered = DeckBrief("Test Commander", ["W", "U"], {"draw": 5, "ramp": 5})
+        assert reordered.canonical() != same.canonical()
@@ -1,6 +1,10 @@
 """Tests for feature extraction."""
 
-from mtg_deck_builder.features.extract import extract_features
+import pytest
+
+from mtg_deck_builder.data.card_index import FEATURE_NAMES, CardIndex
+from mtg_deck_builder.features.extract import extract_features, extract_features_batch
+from mtg_deck_builder.features.sql import extract_features_sql
 
 
 class TestFeatureExtraction:
@@ -265,3 +269,217 @@ class TestFeatureExtraction:
         for feature in expected_features:
             assert feature in features
             assert isinstance(features[feature], bool)
+
+
+# (type line, oracle text, power, produced mana) -> features that are True,
+# recorded from the original one-pattern-at-a-time implementation
+PARITY_CASES = [
+    ("Artifact", "{T}: Add {C}{C}.", None, [], {"produces_mana"}),
+    (
+        "Sorcery",
+        "Search your library for up to two basic land cards, reveal those cards, "
+        "put one onto the battlefield tapped and the other into your hand, then "
+        "shuffle.",
+        None,
+        [],
+        {"is_tutor"},
+    ),
+    (
+        "Sorcery",
+        "This spell costs {1} less to cast for each creature on the battlefield.\n"
+        "Blasphemous Act deals 13 damage to each creature.",
+        None,
+        [],
+        {"is_board_wipe"},
+    ),
+    (
+        "Sorcery",
+        "As an additional cost to cast this spell, pay X life.\n"
+        "All creatures get -X/-X until end of turn.",
+        None,
+        [],
+        {"is_board_wipe"},
+    ),
+    (
+        "Instant",
+        "Destroy target permanent. Its controller creates a 3/3 green Beast "
+        "creature token.",
+        None,
+        [],
+        {"creates_tokens", "removes_creature"},
+    ),
+    (
+        "Creature — Human Wizard",
+        "If you would draw a card while your library has no cards in it, you win "
+        "the game instead.",
+        "2",
+        [],
+        {"draws_cards", "is_finisher"},
+    ),
+    (
+        "Legendary Creature — Eldrazi",
+        "This spell can't be countered.\nFlying, protection from spells that are "
+        "one or more colors, annihilator 6",
+        "15",
+        [],
+        {"is_finisher", "protects_board"},
+    ),
+    (
+        "Land Creature — Forest Dryad",
+        "(Dryad Arbor isn't a spell, it's affected by summoning sickness, and it "
+        'has "{T}: Add {G}.")',
+        "1",
+        ["G"],
+        {"produces_mana"},
+    ),
+    (
+        "Basic Land — Forest",
+        "({T}: Add {G}.)",
+        None,
+        ["G"],
+        {"is_land_only", "produces_mana"},
+    ),
+    (
+        "Sorcery",
+        "Put target creature card from a graveyard onto the battlefield under your "
+        "control.",
+        None,
+        [],
+        {"recurs_from_graveyard"},
+    ),
+    ("Creature — Horror", "Flying", "*", [], set()),
+    ("Instant", "", None, [], set()),
+    (
+        "SORCERY",
+        "DESTROY ALL CREATURES. DRAW A CARD.",
+        None,
+        [],
+        {"draws_cards", "is_board_wipe"},
+    ),
+    # Characters re.IGNORECASE folds to ASCII but str.lower() does not
+    ("Sorcery", "ſearch your library for a card.", None, [], {"is_tutor"}),
+    (
+        "Instant",
+        "Draw a card. Hexproof ıs not granted.",
+        None,
+        [],
+        {"draws_cards", "protects_board"},
+    ),
+]
+
+
+class TestFeatureExtractionParity:
+    """Test that the compiled extraction matches the original patterns."""
+
+    @pytest.mark.parametrize(
+        "type_line, oracle_text, power, produced_mana, expected", PARITY_CASES
+    )
+    def test_matches_recorded_features(
+        self, type_line, oracle_text, power, produced_mana, expected
+    ):
+        """Test extraction against features recorded before compilation."""
+        card = {
+            "type_line": type_line,
+            "oracle_text": oracle_text,
+            "power": power,
+            "produced_mana": produced_mana,
+        }
+
+        features = extract_features(card)
+
+        assert list(features) == FEATURE_NAMES
+        assert {name for name, value in features.items() if value} == expected
+
+    def test_batch_matches_single(self, sample_scryfall_card):
+        """Test that extract_features_batch matches per-card extraction."""
+        cards = [sample_scryfall_card] + [
+            {
+                "type_line": type_line,
+                "oracle_text": oracle_text,
+                "power": power,
+                "produced_mana": produced_mana,
+            }
+            for type_line, oracle_text, power, produced_mana, _ in PARITY_CASES
+        ]
+
+        assert extract_features_batch(cards) == [extract_features(c) for c in cards]
+        assert extract_features_batch(iter([])) == []
+
+
+def _index_card(i, type_line, oracle_text, power, produced_mana):
+    """A normalised card row for the given feature inputs."""
+    return {
+        "scryfall_id": f"parity-{i}",
+        "name": f"Parity Card {i}",
+        "mana_cost": "",
+        "cmc": 0,
+        "type_line": type_line,
+        "oracle_text": oracle_text,
+        "colors": [],
+        "color_identity": [],
+        "rarity": "common",
+        "commander_legal": True,
+        "power": power,
+        "toughness": None,
+        "keywords": [],
+        "produced_mana": produced_mana,
+    }
+
+
+def _stored_features(index):
+    """Feature rows keyed by scryfall_id."""
+    result = index.conn.execute("SELECT * FROM card_features")
+    columns = [col[0] for col in result.description]
+    return {row[0]: dict(zip(columns[1:], row[1:])) for row in result.fetchall()}
+
+
+class TestSqlFeatureExtraction:
+    """Test that DuckDB feature extraction matches extract_features."""
+
+    def test_matches_python_for_fixture_cards(self, mock_card_index):
+        """Test SQL features against the Python features of the fixture index."""
+        expected = _stored_features(mock_card_index)
+        mock_card_index.conn.execute("DELETE FROM card_features")
+
+        written = extract_features_sql(mock_card_index)
+
+        assert written == len(expected)
+        assert _stored_features(mock_card_index) == expected
+
+    def test_matches_python_for_parity_cases(self, temp_db_path):
+        """Test SQL features on recorded cases and RE2/Python edge cases."""
+        cases = [case[:4] for case in PARITY_CASES] + [
+            ("Creature — Giant", "", power, [])
+            for power in ["3.5", "1e1", " 7 ", "+6", "1_0", "-9", "06", "X", ""]
+        ]
+        cases += [
+            # Unicode digits match Python's \d but not RE2's
+            ("Sorcery", "Deal ٣٣ damage to target player.", None, []),
+            ("Instant", "Draws ٣ cards.", None, []),
+            # Python lowercases İ to i + combining dot, DuckDB to plain i
+            ("Sorcery", "YOU WİN THE GAME.", None, []),
+            ("LAND — İSLAND", "", None, []),
+            ("Planeſwalker Land", "", None, []),
+        ]
+        index = CardIndex(temp_db_path)
+        cards = [_index_card(i, *case) for i, case in enumerate(cases)]
+        index.insert_cards_bulk(cards)
+
+        extract_features_sql(index)
+
+        stored = _stored_features(index)
+        for card in cards:
+            assert stored[card["scryfall_id"]] == extract_features(card), card
+
+    def test_selected_cards_only(self, temp_db_path):
+        """Test deriving features for a subset of cards."""
+        index = CardIndex(temp_db_path)
+        index.insert_cards_bulk(
+            [_index_card(i, "Instant", "Draw a card.", None, []) for i in range(3)]
+        )
+
+        written = extract_features_sql(index, ["parity-0", "parity-2"])
+
+        assert written == 2
+        assert sorted(_stored_features(index)) == ["parity-0", "parity-2"]
+        assert extract_features_sql(index, []) == 0
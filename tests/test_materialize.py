@@ -0,0 +1,91 @@
+"""Tests for materialized role membership."""
+
+import pytest
+import yaml
+
+from mtg_deck_builder.roles.materialize import (
+    fresh_roles,
+    materialize_roles,
+    stale_roles,
+)
+from mtg_deck_builder.roles.role_engine import RoleEngine
+
+
+def _members(index, role):
+    """Scryfall IDs stored for a role."""
+    rows = index.conn.execute(
+        "SELECT scryfall_id FROM card_roles WHERE role = ? ORDER BY scryfall_id",
+        (role,),
+    ).fetchall()
+    return [row[0] for row in rows]
+
+
+@pytest.fixture
+def materialized_index(mock_card_index, role_engine):
+    """Fixture index with the default roles materialized."""
+    materialize_roles(mock_card_index, role_engine)
+    return mock_card_index
+
+
+class TestMaterializeRoles:
+    """Test materializing and invalidating card_roles."""
+
+    def test_unmaterialized_index_is_stale(self, mock_card_index, role_engine):
+        """Test that an index without card_roles needs every role."""
+        assert stale_roles(mock_card_index, role_engine) == list(role_engine.roles)
+        assert fresh_roles(mock_card_index, role_engine) == set()
+
+    def test_materialize_stores_members(self, materialized_index, role_engine):
+        """Test that members match the role rules."""
+        assert _members(materialized_index, "card_draw") == ["test-draw-1"]
+        assert _members(materialized_index, "ramp") == ["test-ramp-1"]
+        assert stale_roles(materialized_index, role_engine) == []
+        assert materialize_roles(materialized_index, role_engine) == []
+
+    def test_definition_change_marks_only_that_role(self, materialized_index):
+        """Test that editing one role only rebuilds that role."""
+        roles = RoleEngine().roles | {"card_draw": {"requires": ["is_tutor"]}}
+        engine = RoleEngine(roles)
+
+        assert stale_roles(materialized_index, engine) == ["card_draw"]
+        assert materialize_roles(materialized_index, engine) == ["card_draw"]
+        assert _members(materialized_index, "card_draw") == ["test-ramp-1"]
+
+    def test_equivalent_definition_is_fresh(self, materialized_index):
+        """Test that reordering or annotating a role keeps it fresh."""
+        roles = RoleEngine().roles | {
+            "interaction": {
+                "requires_any": [
+                    "is_board_wipe",
+                    "removes_noncreature",
+                    "removes_creature",
+                ],
+                "optional": ["is_tutor"],
+            }
+        }
+
+        assert stale_roles(materialized_index, RoleEngine(roles)) == []
+
+    def test_roles_yaml(self, materialized_index, tmp_path):
+        """Test that roles loaded from YAML are materialized and pruned."""
+        roles_path = tmp_path / "roles.yaml"
+        roles_path.write_text(yaml.safe_dump({"tutor": {"requires": ["is_tutor"]}}))
+
+        materialize_roles(materialized_index, RoleEngine(roles_path))
+
+        assert _members(materialized_index, "tutor") == ["test-ramp-1"]
+        assert _members(materialized_index, "card_draw") == []
+        assert set(materialized_index.get_role_versions()) == {"tutor"}
+
+    def test_feature_writes_invalidate_roles(self, materialized_index, role_engine):
+        """Test that rewriting features makes every role stale."""
+        materialized_index.update_features_bulk(
+            [{"scryfall_id": "test-ramp-1", "draws_cards": True}], ["draws_cards"]
+        )
+
+        assert stale_roles(materialized_index, role_engine) == list(role_engine.roles)
+        materialize_roles(materialized_index, role_engine)
+        assert _members(materialized_index, "card_draw") == [
+            "test-draw-1",
+            "test-ramp-1",
+        ]
@@ -141,6 +141,22 @@ class TestCardNormalization:
         assert normalized["toughness"] is None
         assert normalized["keywords"] == []
         assert normalized["produced_mana"] == []
+        assert normalized["price_usd"] is None
+
+    def test_normalise_price(self):
+        """Test that the USD price string becomes a float."""
+        scryfall_data = {
+            "id": "priced-id",
+            "name": "Priced Card",
+            "type_line": "Instant",
+            "legalities": {"commander": "legal"},
+            "prices": {"usd": "1.25", "eur": None},
+        }
+
+        assert normalise_card(scryfall_data)["price_usd"] == 1.25
+
+        scryfall_data["prices"] = {"usd": None}
+        assert normalise_card(scryfall_data)["price_usd"] is None
 
     def test_normalise_colorless_artifact(self):
         """Test normalization of a colorless artifact."""
@@ -0,0 +1,85 @@
+"""Tests for the deck optimizer."""
+
+from mtg_deck_builder.engine.optimizer import DeckOptimizer
+from mtg_deck_builder.engine.scoring import DeckScorer
+
+RAMP = {"produces_mana": True}
+DRAW = {"draws_cards": True}
+
+
+def _overshooting_deck(pool):
+    """Scorer with every ramp card added, and the deck of added cards."""
+    ramp = [i for i, card in enumerate(pool) if card.roles == ["ramp"]]
+    scorer = DeckScorer(
+        pool,
+        [i for i in range(len(pool)) if i not in ramp],
+        {"ramp": 2, "card_draw": 3},
+        slots=len(ramp),
+    )
+    for i in ramp:
+        scorer.add(i)
+    return scorer, ramp
+
+
+class TestDeckOptimizer:
+    """Test swap-based local search."""
+
+    def test_swaps_fix_role_overshoot(self, make_pool):
+        """Test that surplus cards of one role are traded for another role."""
+        pool = make_pool(
+            [(f"Ramp {i}", 2, None, RAMP) for i in range(6)]
+            + [(f"Draw {i}", 3, None, DRAW) for i in range(6)]
+        )
+        scorer, deck = _overshooting_deck(pool)
+
+        result = DeckOptimizer(seed=1).optimize(scorer, deck)
+
+        assert result.stopped == "converged"
+        assert result.objective_after > result.objective_before
+        # Six slots: both targets met, the spare slot keeps a ramp card
+        assert scorer.role_counts == {"ramp": 3, "card_draw": 3}
+        assert len(result.swaps) == 3
+        assert sum(pool[i].roles == ["card_draw"] for i in deck) == 3
+        assert result.objective_after == scorer.objective()
+
+    def test_reproducible_for_a_seed(self, make_pool):
+        """Test that the same seed gives the same swaps."""
+        pool = make_pool(
+            [(f"Ramp {i}", i % 6, None, RAMP) for i in range(8)]
+            + [(f"Draw {i}", i % 6, None, DRAW) for i in range(8)]
+        )
+        results = []
+        for _ in range(2):
+            scorer, deck = _overshooting_deck(pool)
+            results.append((DeckOptimizer(seed=5).optimize(scorer, deck), deck))
+
+        assert results[0] == results[1]
+
+    def test_iteration_budget(self, make_pool):
+        """Test that the search stops after max_iterations evaluations."""
+        pool = make_pool(
+            [(f"Ramp {i}", 2, None, RAMP) for i in range(6)]
+            + [(f"Draw {i}", 3, None, DRAW) for i in range(6)]
+        )
+        scorer, deck = _overshooting_deck(pool)
+
+        result = DeckOptimizer(max_iterations=1).optimize(scorer, deck)
+
+        assert result.stopped == "iterations"
+        assert result.iterations == 1
+        assert len(result.swaps) <= 1
+
+    def test_cards_outside_the_deck_stay(self, make_pool):
+        """Test that added cards not passed as the deck are never swapped."""
+        pool = make_pool(
+            [(f"Ramp {i}", 2, None, RAMP) for i in range(6)]
+            + [(f"Draw {i}", 3, None, DRAW) for i in range(6)]
+        )
+        scorer, deck = _overshooting_deck(pool)
+        locked, deck = deck[:4], deck[4:]
+
+        result = DeckOptimizer().optimize(scorer, deck)
+
+        assert {swap.out for swap in result.swaps} <= {4, 5}
+        assert scorer.role_counts == {"ramp": 4, "card_draw": 2}
+        assert all(i not in deck for i in locked)
@@ -0,0 +1,88 @@
+"""Tests for targeted feature re-extraction."""
+
+import re
+
+import pytest
+
+from mtg_deck_builder.features import extract
+from mtg_deck_builder.features.extract import feature_fingerprints
+from mtg_deck_builder.features.reextract import reextract_features, stale_features
+
+
+def _features(index, scryfall_id):
+    """Stored features of one card."""
+    result = index.conn.execute(
+        "SELECT * FROM card_features WHERE scryfall_id = ?", (scryfall_id,)
+    )
+    columns = [col[0] for col in result.description]
+    return dict(zip(columns, result.fetchone()))
+
+
+@pytest.fixture
+def versioned_index(mock_card_index):
+    """Fixture index with up-to-date feature fingerprints."""
+    mock_card_index.set_feature_versions(feature_fingerprints())
+    return mock_card_index
+
+
+@pytest.fixture
+def draw_rule_change(monkeypatch):
+    """Change the draws_cards rule to match flying creatures instead."""
+    monkeypatch.setitem(extract.TEXT_PATTERNS, "draws_cards", (r"flying",))
+    monkeypatch.setitem(extract._SEARCH, "draws_cards", re.compile(r"flying").search)
+
+
+class TestReextract:
+    """Test versioned feature re-extraction."""
+
+    def test_unrecorded_index_is_stale(self, mock_card_index):
+        """Test that an index without fingerprints needs every feature."""
+        assert stale_features(mock_card_index) == list(feature_fingerprints())
+
+    def test_up_to_date_index(self, versioned_index):
+        """Test that nothing is recomputed when the rules are unchanged."""
+        assert stale_features(versioned_index) == []
+        assert reextract_features(versioned_index) == []
+
+    def test_pattern_change_marks_only_that_feature(
+        self, versioned_index, draw_rule_change
+    ):
+        """Test that editing one feature's patterns only makes it stale."""
+        assert stale_features(versioned_index) == ["draws_cards"]
+
+    def test_version_bump_marks_feature(self, versioned_index, monkeypatch):
+        """Test that bumping a feature version makes it stale."""
+        monkeypatch.setitem(extract.FEATURE_VERSIONS, "is_land_only", 2)
+
+        assert stale_features(versioned_index) == ["is_land_only"]
+
+    @pytest.mark.parametrize("engine", ["sql", "python"])
+    def test_recomputes_only_stale_columns(
+        self, versioned_index, draw_rule_change, engine
+    ):
+        """Test that only the changed feature column is rewritten."""
+        # A sentinel value in an unchanged column must survive
+        versioned_index.conn.execute("UPDATE card_features SET is_tutor = true")
+
+        updated = reextract_features(versioned_index, engine=engine)
+
+        assert updated == ["draws_cards"]
+        commander = _features(versioned_index, "test-commander-1")
+        assert commander["draws_cards"] is True  # "Flying, vigilance"
+        assert commander["is_tutor"] is True
+        assert _features(versioned_index, "test-draw-1")["draws_cards"] is False
+        assert stale_features(versioned_index) == []
+
+    def test_force_recomputes_everything(self, versioned_index):
+        """Test that force recomputes every feature from the cards table."""
+        versioned_index.conn.execute("UPDATE card_features SET is_tutor = true")
+
+        updated = reextract_features(versioned_index, force=True)
+
+        assert updated == list(feature_fingerprints())
+        assert _features(versioned_index, "test-commander-1")["is_tutor"] is False
+
+    def test_unknown_engine(self, versioned_index):
+        """Test that an unknown engine is rejected."""
+        with pytest.raises(ValueError, match="feature engine"):
+            reextract_features(versioned_index, engine="regex", force=True)
@@ -1,6 +1,9 @@
 """Tests for role engine."""
 
-from mtg_deck_builder.roles.role_engine import RoleEngine
+import pytest
+
+from mtg_deck_builder.data.card_index import FEATURE_NAMES, CardIndex
+from mtg_deck_builder.roles.role_engine import RoleEngine, pack_features
 
 
 class TestRoleEngine:
@@ -230,3 +233,138 @@ class TestRoleEngine:
             "recurs_from_graveyard": False,
         }
         assert not role_engine.card_matches_role(features, "nonexistent_role")
+
+
+class TestCompiledRoles:
+    """Test role definitions compiled to feature bitmasks."""
+
+    def test_pack_features_bit_order(self):
+        """Test that bit i is FEATURE_NAMES[i] and missing features are False."""
+        assert pack_features({}) == 0
+        for i, name in enumerate(FEATURE_NAMES):
+            assert pack_features({name: True}) == 1 << i
+        assert pack_features({"draws_cards": True, "is_land_only": False}) == (
+            1 << FEATURE_NAMES.index("draws_cards")
+        )
+
+    def test_compiled_masks(self, role_engine):
+        """Test the masks compiled for the default ramp role."""
+        ramp = role_engine.compiled["ramp"]
+
+        assert ramp.requires == pack_features({"produces_mana": True})
+        assert ramp.excludes == pack_features({"is_land_only": True})
+        assert ramp.requires_any is None
+
+    def test_unknown_feature_raises(self):
+        """Test that unknown feature names fail when roles are compiled."""
+        with pytest.raises(ValueError, match="draw_cards"):
+            RoleEngine({"typo": {"requires": ["draw_cards"]}})
+        with pytest.raises(ValueError, match="is_wipe"):
+            RoleEngine({"typo": {"requires_any": ["is_board_wipe", "is_wipe"]}})
+
+    def test_empty_requires_any_never_matches(self):
+        """Test that an empty requires_any list matches no card."""
+        engine = RoleEngine({"empty": {"requires_any": []}})
+
+        assert not engine.card_matches_role({"draws_cards": True}, "empty")
+        assert engine.match_many([0, 1, 0b111], "empty") == [False] * 3
+
+    def test_match_many_agrees_with_card_matches_role(self):
+        """Test match_many against card_matches_role on every feature combination."""
+        engine = RoleEngine(
+            {
+                **RoleEngine().roles,
+                "contradiction": {
+                    "requires": ["draws_cards"],
+                    "excludes": ["draws_cards"],
+                },
+                "mixed": {
+                    "requires": ["creates_tokens"],
+                    "requires_any": ["is_tutor", "protects_board"],
+                    "excludes": ["is_land_only"],
+                },
+            }
+        )
+        # Every combination of the features the roles above mention
+        names = [
+            "produces_mana",
+            "draws_cards",
+            "is_land_only",
+            "removes_creature",
+            "is_board_wipe",
+            "is_finisher",
+            "creates_tokens",
+            "is_tutor",
+            "protects_board",
+        ]
+        feature_sets = [
+            {name: bool(combo >> i & 1) for i, name in enumerate(names)}
+            for combo in range(1 << len(names))
+        ]
+        bitsets = [pack_features(features) for features in feature_sets]
+
+        for role_name in [*engine.roles, "nonexistent_role"]:
+            expected = [
+                engine.card_matches_role(features, role_name)
+                for features in feature_sets
+            ]
+            assert engine.match_many(bitsets, role_name) == expected
+
+    def test_role_predicate(self, role_engine):
+        """Test the SQL predicates emitted for the default roles."""
+        assert (
+            role_engine.role_predicate("ramp")
+            == "cf.produces_mana AND NOT cf.is_land_only"
+        )
+        assert role_engine.role_predicate("interaction", alias="f") == (
+            "(f.removes_creature OR f.removes_noncreature OR f.is_board_wipe)"
+        )
+        assert role_engine.role_predicate("nonexistent_role") == "false"
+
+    def test_role_predicate_agrees_with_card_matches_role(self, temp_db_path):
+        """Test query_role with role predicates against card_matches_role."""
+        engine = RoleEngine(
+            {
+                **RoleEngine().roles,
+                "anything": {},
+                "empty_any": {"requires_any": []},
+                "mixed": {
+                    "requires": ["draws_cards"],
+                    "requires_any": ["is_tutor", "is_finisher"],
+                    "excludes": ["is_land_only"],
+                },
+            }
+        )
+        index = CardIndex(temp_db_path)
+        names = ["produces_mana", "draws_cards", "is_land_only", "is_tutor"]
+        names += ["removes_creature", "is_finisher"]
+        feature_sets = {
+            f"card-{combo}": {
+                name: bool(combo >> i & 1) for i, name in enumerate(names)
+            }
+            for combo in range(1 << len(names))
+        }
+        index.insert_cards_bulk(
+            [
+                {
+                    "scryfall_id": sid,
+                    "name": sid,
+                    "cmc": 0,
+                    "type_line": "Sorcery",
+                    "commander_legal": True,
+                }
+                for sid in feature_sets
+            ]
+        )
+        index.insert_features_bulk(
+            [{"scryfall_id": sid, **f} for sid, f in feature_sets.items()]
+        )
+
+        for role_name in engine.roles:
+            cards = index.query_role(engine.role_predicate(role_name), 0)
+            expected = {
+                sid
+                for sid, features in feature_sets.items()
+                if engine.card_matches_role(features, role_name)
+            }
+            assert {card["scryfall_id"] for card in cards} == expected
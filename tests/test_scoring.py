@@ -0,0 +1,206 @@
+"""Tests for deck scoring."""
+
+import random
+
+import pytest
+
+from mtg_deck_builder.engine.scoring import (
+    BUDGET_WEIGHT,
+    CURVE_SHARES,
+    CURVE_WEIGHT,
+    ROLE_WEIGHT,
+    DeckScorer,
+    curve_bin,
+)
+
+
+RAMP = {"produces_mana": True}
+DRAW = {"draws_cards": True}
+
+
+class TestDeckScorer:
+    """Test score components, picks and incremental updates."""
+
+    @pytest.mark.parametrize(
+        "cmc,expected", [(0, 0), (1, 0), (2, 1), (3, 2), (5, 4), (6, 5), (12, 5)]
+    )
+    def test_curve_bin(self, cmc, expected):
+        """Test the coarse mana value bins."""
+        assert curve_bin(cmc) == expected
+
+    def test_role_deficit_beats_curve(self, make_pool):
+        """Test that a card filling a role deficit is picked first."""
+        pool = make_pool([("Vanilla", 2, None, {}), ("Ramp", 6, None, RAMP)])
+        scorer = DeckScorer(pool, range(len(pool)), {"ramp": 1}, slots=10)
+
+        ramp = scorer.breakdown(1)
+        assert ramp.roles == ("ramp",)
+        assert ramp.role_deficit_bonus == 2 * ROLE_WEIGHT
+        assert ramp.curve_bonus == CURVE_WEIGHT
+        assert scorer.best() == 1
+
+        scorer.add(1)
+        assert scorer.role_counts == {"ramp": 1}
+        assert scorer.breakdown(1).role_deficit_bonus == 0
+        assert scorer.best() == 0
+
+        scorer.add(0)
+        assert scorer.best() is None
+
+    def test_curve_bonus_tracks_bin_counts(self, make_pool):
+        """Test that filling a bin lowers its bonus."""
+        pool = make_pool([("Two", 2, None, {}), ("Other Two", 2, None, {})])
+        scorer = DeckScorer(pool, range(len(pool)), {}, slots=10)
+        target = CURVE_SHARES[1] * 10
+
+        scorer.add(0)
+
+        assert scorer.curve_counts[1] == 1
+        assert scorer.breakdown(1).curve_bonus == pytest.approx(
+            CURVE_WEIGHT * (target - 1) / target
+        )
+
+    def test_budget_penalty(self, make_pool):
+        """Test that prices above the per-slot allowance are penalised."""
+        pool = make_pool([("Pricey", 2, 30.0, {}), ("Cheap", 2, 1.0, {})])
+        scorer = DeckScorer(
+            pool, range(len(pool)), {}, slots=10, soft_budget=60.0, spent=10.0
+        )
+
+        assert scorer.allowance() == 5.0
+        assert scorer.breakdown(1).budget_penalty == 0
+        assert scorer.breakdown(0).budget_penalty == BUDGET_WEIGHT * 25.0 / 5.0
+        assert scorer.best() == 1
+
+        unbounded = DeckScorer(pool, range(len(pool)), {}, slots=10)
+        assert unbounded.allowance() is None
+        assert unbounded.breakdown(0).budget_penalty == 0
+        # Equal scores: the cheaper card wins
+        assert unbounded.best() == 1
+
+    def test_added_card_need_not_be_a_candidate(self, make_pool):
+        """Test that adding a must-include outside the candidates counts."""
+        pool = make_pool([("Ramp", 2, None, RAMP), ("Must Ramp", 2, 4.0, RAMP)])
+        scorer = DeckScorer(pool, [0], {"ramp": 1}, slots=10)
+
+        scorer.add(1)
+
+        assert scorer.role_counts == {"ramp": 1}
+        assert scorer.spent == 4.0
+        assert scorer.breakdown(0).role_deficit_bonus == 0
+
+    def test_best_matches_full_scores(self, make_pool):
+        """Test that grouped picks agree with scoring every candidate."""
+        rng = random.Random(7)
+        features = [{}, RAMP, DRAW, RAMP | DRAW, {"is_board_wipe": True}]
+        pool = make_pool(
+            [
+                (
+                    f"Card {i}",
+                    rng.randint(0, 8),
+                    rng.choice([None, 0.5, 3.0, 20.0]),
+                    rng.choice(features),
+                )
+                for i in range(300)
+            ]
+        )
+        scorer = DeckScorer(
+            pool,
+            range(len(pool)),
+            {"ramp": 8, "card_draw": 6, "interaction": 4},
+            slots=60,
+            soft_budget=150.0,
+        )
+
+        for _ in range(60):
+            scores = scorer.scores()
+            for position, i in enumerate(scorer.candidates):
+                if scores[position] != float("-inf"):
+                    assert scores[position] == pytest.approx(scorer.breakdown(i).score)
+            top = max(
+                (s, -pool.prices[i], -i) for s, i in zip(scores, scorer.candidates)
+            )
+            best = scorer.best()
+            assert best == -top[2]
+            scorer.add(best)
+
+        assert scorer.scores().count(float("-inf")) == 60
+
+    def test_objective_sums_greedy_bonuses(self, make_pool):
+        """Test that the objective grows by each added card's bonuses."""
+        pool = make_pool(
+            [(f"Card {i}", i % 7, None, [{}, RAMP, DRAW][i % 3]) for i in range(30)]
+        )
+        scorer = DeckScorer(pool, range(len(pool)), {"ramp": 4, "card_draw": 3}, 20)
+
+        assert scorer.objective() == 0
+        total = 0.0
+        for _ in range(20):
+            best = scorer.best()
+            total += scorer.breakdown(best).score
+            scorer.add(best)
+            assert scorer.objective() == pytest.approx(total)
+
+    def test_swap_delta_matches_objective(self, make_pool):
+        """Test constant-time swap deltas against full objective changes."""
+        rng = random.Random(3)
+        features = [{}, RAMP, DRAW, RAMP | DRAW, {"is_finisher": True}]
+        pool = make_pool(
+            [
+                (
+                    f"Card {i}",
+                    rng.randint(0, 8),
+                    rng.choice([None, 1.0, 9.0, 40.0]),
+                    rng.choice(features),
+                )
+                for i in range(120)
+            ]
+        )
+        scorer = DeckScorer(
+            pool,
+            range(len(pool)),
+            {"ramp": 5, "card_draw": 5, "finisher": 2},
+            slots=30,
+            soft_budget=120.0,
+        )
+        deck = list(range(0, 120, 4))
+        for i in deck:
+            scorer.add(i)
+
+        for _ in range(200):
+            out = rng.choice(deck)
+            into = rng.choice([i for i in range(120) if i not in deck])
+            before = scorer.objective()
+            delta = scorer.swap_delta(out, into)
+            scorer.swap(out, into)
+            deck[deck.index(out)] = into
+            assert scorer.objective() - before == pytest.approx(delta)
+
+    def test_removed_card_is_a_candidate_again(self, make_pool):
+        """Test that remove undoes add, including group heads."""
+        pool = make_pool([("Cheap", 2, 1.0, RAMP), ("Pricey", 2, 5.0, RAMP)])
+        scorer = DeckScorer(pool, range(len(pool)), {"ramp": 2}, slots=10)
+
+        scorer.add(scorer.best())
+        assert scorer.heads() == [1]
+
+        scorer.remove(0)
+        assert scorer.heads() == [0]
+        assert scorer.role_counts == {"ramp": 0}
+        assert scorer.added == 0
+        assert scorer.spent == 0
+
+    def test_copy_and_exclude(self, make_pool):
+        """Test that copies are independent and excluded cards never picked."""
+        pool = make_pool([("Cheap", 2, 1.0, RAMP), ("Pricey", 2, 5.0, RAMP)])
+        scorer = DeckScorer(pool, range(len(pool)), {"ramp": 2}, slots=10)
+
+        clone = scorer.copy()
+        clone.exclude(0)
+        assert clone.best() == 1
+        clone.add(1)
+
+        assert clone.role_counts == {"ramp": 1}
+        assert clone.best() is None
+        assert scorer.role_counts == {"ramp": 0}
+        assert scorer.best() == 0
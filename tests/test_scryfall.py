@@ -1,11 +1,108 @@
 """Tests for Scryfall client and cache."""
 
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
 import pytest
+import requests
 from unittest.mock import Mock, patch
-from mtg_deck_builder.cache.scryfall_cache import ScryfallCache
+from mtg_deck_builder.cache.rate_limiter import RateLimiter
+from mtg_deck_builder.cache.scryfall_cache import FreshnessPolicy, ScryfallCache
 from mtg_deck_builder.cache.scryfall_client import ScryfallClient
 
 
+class _SearchHandler(BaseHTTPRequestHandler):
+    """Stand-in for /cards/search serving ``server.pages`` pages of 2 cards."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        page = int(parse_qs(urlparse(self.path).query)["page"][0])
+        etag = f'"p{page}-v{server.versions.get(page, 1)}"'
+        with server.lock:
+            server.requests.append((time.monotonic(), page))
+            server.ports.add(self.client_address[1])
+            throttle = page in server.throttle_pages
+            server.throttle_pages.discard(page)
+
+        if throttle:
+            self._send_empty(429, {"Retry-After": "0.2"})
+            return
+        if self.headers.get("If-None-Match") == etag:
+            self._send_empty(304, {"ETag": etag})
+            return
+
+        time.sleep(server.delay)
+        version = server.versions.get(page, 1)
+        body = json.dumps(
+            {
+                "data": [
+                    {"name": f"Card {page}-{i}", "id": f"{page}-{i}", "v": version}
+                    for i in range(2)
+                ],
+                "total_cards": server.pages * 2,
+                "has_more": page < server.pages,
+            }
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_empty(self, status, headers):
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def scryfall_server():
+    """Run a local HTTP server that mimics Scryfall search pagination."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _SearchHandler)
+    server.pages = 8
+    server.delay = 0.05
+    server.requests = []
+    server.ports = set()
+    server.versions = {}
+    server.throttle_pages = set()
+    server.lock = threading.Lock()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _local_client(server, db_path, rate=1000.0, policy=None):
+    """Client pointed at the local stand-in server."""
+    host, port = server.server_address[:2]
+    return ScryfallClient(
+        ScryfallCache(db_path),
+        base_url=f"http://{host}:{port}",
+        rate_limiter=RateLimiter(rate),
+        policy=policy,
+    )
+
+
+def _age_cache(cache, seconds):
+    """Backdate every cached page by the given number of seconds."""
+    from datetime import datetime, timedelta, timezone
+
+    fetched_at = datetime.now(timezone.utc) - timedelta(seconds=seconds)
+    cache.conn.execute("UPDATE cache SET fetched_at = ?", (fetched_at.isoformat(),))
+
+
 class TestScryfallCache:
     """Test Scryfall caching functionality."""
 
@@ -60,6 +157,130 @@ class TestScryfallCache:
 
         assert datetime.fromisoformat(row[0]).timestamp() > time1
 
+    def test_cache_uses_wal_mode(self, temp_db_path):
+        """Test that the cache connection runs in WAL mode."""
+        with ScryfallCache(temp_db_path) as cache:
+            row = cache.conn.execute("PRAGMA journal_mode").fetchone()
+            assert row[0] == "wal"
+
+    def test_connection_reused_within_thread(self, temp_db_path):
+        """Test that one thread keeps a single long-lived connection."""
+        with ScryfallCache(temp_db_path) as cache:
+            conn = cache.conn
+            cache.put("test-query", {"data": "test"})
+            cache.get("test-query")
+            assert cache.conn is conn
+
+    def test_transaction_batches_writes(self, temp_db_path):
+        """Test that nested writes commit together or not at all."""
+        with ScryfallCache(temp_db_path) as cache:
+            with cache.transaction():
+                cache.set("test-query", {"data": 1}, page=1)
+                cache.set("test-query", {"data": 2}, page=2)
+            assert cache.get("test-query", page=2) == {"data": 2}
+
+            with pytest.raises(RuntimeError):
+                with cache.transaction():
+                    cache.set("test-query", {"data": 3}, page=3)
+                    raise RuntimeError("abort")
+            assert cache.get("test-query", page=3) is None
+
+    def test_concurrent_readers_and_writer(self, temp_db_path):
+        """Test that readers and a writer can run at the same time."""
+        errors = []
+        with ScryfallCache(temp_db_path) as cache:
+            cache.put("test-query", {"data": 0})
+
+            def writer():
+                try:
+                    for page in range(1, 51):
+                        cache.set("test-query", {"data": page}, page=page)
+                except Exception as e:
+                    errors.append(e)
+
+            def reader():
+                try:
+                    for _ in range(50):
+                        assert cache.get("test-query") is not None
+                except Exception as e:
+                    errors.append(e)
+
+            threads = [threading.Thread(target=writer)]
+            threads += [threading.Thread(target=reader) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            assert errors == []
+            assert cache.get("test-query", page=50) == {"data": 50}
+
+    @pytest.mark.parametrize("codec", ["json", "zlib", "lzma"])
+    def test_codec_round_trip(self, temp_db_path, codec):
+        """Test that every codec stores and reads back the same response."""
+        test_data = {"data": [{"name": "Card", "oracle_text": "Draw a card."}]}
+        with ScryfallCache(temp_db_path, codec=codec) as cache:
+            cache.put("test-query", test_data)
+
+            row = cache.conn.execute("SELECT codec FROM cache").fetchone()
+            assert row[0] == codec
+            assert cache.get("test-query") == test_data
+
+    def test_compressed_storage_is_smaller(self, temp_db_path):
+        """Test that compressed rows are smaller than the JSON text."""
+        test_data = {
+            "data": [{"name": f"Card {i}", "oracle_text": "x"} for i in range(200)]
+        }
+        with ScryfallCache(temp_db_path) as cache:
+            cache.put("test-query", test_data)
+
+            row = cache.conn.execute("SELECT response FROM cache").fetchone()
+            assert isinstance(row[0], bytes)
+            assert len(row[0]) < len(json.dumps(test_data)) / 4
+
+    def test_unknown_codec_rejected(self, temp_db_path):
+        """Test that an unknown codec raises ValueError."""
+        with pytest.raises(ValueError, match="Unknown cache codec"):
+            ScryfallCache(temp_db_path, codec="brotli")
+
+    def test_legacy_database_migrated(self, temp_db_path):
+        """Test that a cache written with the old TEXT layout is migrated."""
+        import sqlite3
+
+        with sqlite3.connect(temp_db_path) as conn:
+            conn.execute(
+                """
+                CREATE TABLE cache (
+                    query TEXT NOT NULL,
+                    page INTEGER NOT NULL DEFAULT 1,
+                    response_json TEXT NOT NULL,
+                    fetched_at TIMESTAMP NOT NULL,
+                    PRIMARY KEY (query, page)
+                )
+                """
+            )
+            conn.execute(
+                "INSERT INTO cache VALUES (?, ?, ?, ?)",
+                ("legacy", 1, json.dumps({"data": ["old"]}), "2025-01-01T00:00:00"),
+            )
+        conn.close()
+
+        with ScryfallCache(temp_db_path) as cache:
+            assert cache.get("legacy") == {"data": ["old"]}
+            row = cache.conn.execute("SELECT codec FROM cache").fetchone()
+            assert row[0] == "zlib"
+            assert cache.recompress() == 0
+
+    def test_recompress_switches_codec(self, temp_db_path):
+        """Test that recompress rewrites rows stored with another codec."""
+        with ScryfallCache(temp_db_path, codec="json") as cache:
+            cache.set("test-query", {"data": 1}, page=1)
+            cache.set("test-query", {"data": 2}, page=2)
+
+        with ScryfallCache(temp_db_path, codec="lzma") as cache:
+            assert cache.recompress() == 2
+            assert cache.get("test-query", page=2) == {"data": 2}
+
 
 class TestScryfallClient:
     """Test Scryfall API client."""
@@ -72,13 +293,13 @@ class TestScryfallClient:
         assert client.cache == cache
         assert client.base_url == "https://api.scryfall.com"
 
-    @patch("mtg_deck_builder.cache.scryfall_client.requests.get")
+    @patch("mtg_deck_builder.cache.scryfall_client.requests.Session.get")
     def test_get_single_page(self, mock_get, temp_db_path):
         """Test fetching a single page."""
         cache = ScryfallCache(temp_db_path)
         client = ScryfallClient(cache)
 
-        mock_response = Mock()
+        mock_response = Mock(headers={})
         mock_response.json.return_value = {
             "data": [
                 {"name": "Test Card 1", "id": "test-1"},
@@ -95,21 +316,21 @@ class TestScryfallClient:
         assert cards[0]["name"] == "Test Card 1"
         mock_get.assert_called_once()
 
-    @patch("mtg_deck_builder.cache.scryfall_client.requests.get")
+    @patch("mtg_deck_builder.cache.scryfall_client.requests.Session.get")
     def test_get_multiple_pages(self, mock_get, temp_db_path):
         """Test fetching multiple pages."""
         cache = ScryfallCache(temp_db_path)
         client = ScryfallClient(cache)
 
         # First page response
-        page1_response = Mock()
+        page1_response = Mock(headers={})
         page1_response.json.return_value = {
             "data": [{"name": "Card 1", "id": "1"}],
             "has_more": True,
         }
 
         # Second page response
-        page2_response = Mock()
+        page2_response = Mock(headers={})
         page2_response.json.return_value = {
             "data": [{"name": "Card 2", "id": "2"}],
             "has_more": False,
@@ -122,7 +343,7 @@ class TestScryfallClient:
         assert len(cards) == 2
         assert mock_get.call_count == 2
 
-    @patch("mtg_deck_builder.cache.scryfall_client.requests.get")
+    @patch("mtg_deck_builder.cache.scryfall_client.requests.Session.get")
     def test_cache_hit(self, mock_get, temp_db_path):
         """Test that cache hit prevents API call."""
         cache = ScryfallCache(temp_db_path)
@@ -139,7 +360,7 @@ class TestScryfallClient:
         assert cards[0]["name"] == "Cached Card"
         mock_get.assert_not_called()  # Should not make API call
 
-    @patch("mtg_deck_builder.cache.scryfall_client.requests.get")
+    @patch("mtg_deck_builder.cache.scryfall_client.requests.Session.get")
     def test_offline_mode(self, mock_get, temp_db_path):
         """Test offline mode."""
         cache = ScryfallCache(temp_db_path)
@@ -155,7 +376,7 @@ class TestScryfallClient:
         assert len(cards) == 1
         mock_get.assert_not_called()
 
-    @patch("mtg_deck_builder.cache.scryfall_client.requests.get")
+    @patch("mtg_deck_builder.cache.scryfall_client.requests.Session.get")
     def test_api_error_handling(self, mock_get, temp_db_path):
         """Test API error handling."""
         cache = ScryfallCache(temp_db_path)
@@ -176,13 +397,13 @@ class TestScryfallClient:
 
         assert cards == []
 
-    @patch("mtg_deck_builder.cache.scryfall_client.requests.get")
+    @patch("mtg_deck_builder.cache.scryfall_client.requests.Session.get")
     def test_rate_limiting_respected(self, mock_get, temp_db_path):
         """Test that rate limiting is handled."""
         cache = ScryfallCache(temp_db_path)
         client = ScryfallClient(cache)
 
-        mock_response = Mock()
+        mock_response = Mock(headers={})
         mock_response.json.return_value = {"data": [], "has_more": False}
         mock_get.return_value = mock_response
 
@@ -193,6 +414,317 @@ class TestScryfallClient:
         # Should have made API calls (since not cached)
         assert mock_get.call_count == 2
 
+    @patch("mtg_deck_builder.cache.scryfall_client.requests.Session.get")
+    def test_iter_cards_fetches_pages_lazily(self, mock_get, temp_db_path):
+        """Test that iter_cards only requests a page when it is consumed."""
+        cache = ScryfallCache(temp_db_path)
+        client = ScryfallClient(cache)
+
+        page1_response = Mock(headers={})
+        page1_response.json.return_value = {
+            "data": [{"name": "Card 1", "id": "1"}, {"name": "Card 2", "id": "2"}],
+            "has_more": True,
+        }
+        page2_response = Mock(headers={})
+        page2_response.json.return_value = {
+            "data": [{"name": "Card 3", "id": "3"}],
+            "has_more": False,
+        }
+        mock_get.side_effect = [page1_response, page2_response]
+
+        cards = client.iter_cards("test-query")
+        assert mock_get.call_count == 0
+
+        assert next(cards)["name"] == "Card 1"
+        assert next(cards)["name"] == "Card 2"
+        assert mock_get.call_count == 1
+
+        assert [card["name"] for card in cards] == ["Card 3"]
+        assert mock_get.call_count == 2
+
+    def test_iter_pages_from_cache(self, temp_db_path):
+        """Test that iter_pages yields one list per cached page."""
+        cache = ScryfallCache(temp_db_path)
+        client = ScryfallClient(cache)
+
+        cache.set("search:test-query", {"data": [{"name": "A"}], "has_more": True}, 1)
+        cache.set("search:test-query", {"data": [{"name": "B"}], "has_more": False}, 2)
+
+        pages = list(client.iter_pages("test-query"))
+
+        assert pages == [[{"name": "A"}], [{"name": "B"}]]
+
+
+class TestRateLimiter:
+    """Test the token-bucket rate limiter."""
+
+    def test_spaces_requests_at_rate(self):
+        """Test that acquisitions beyond the burst wait 1/rate apart."""
+        now = [0.0]
+
+        def sleep(seconds):
+            now[0] += seconds
+
+        limiter = RateLimiter(10.0, burst=2, clock=lambda: now[0], sleep=sleep)
+        waits = [limiter.acquire() for _ in range(5)]
+
+        assert waits[:2] == [0.0, 0.0]
+        assert waits[2:] == pytest.approx([0.1, 0.1, 0.1])
+
+    def test_pause_delays_next_acquire(self):
+        """Test that pause holds back the next caller for the full pause."""
+        now = [0.0]
+        limiter = RateLimiter(10.0, clock=lambda: now[0], sleep=lambda s: None)
+        assert limiter.acquire() == 0.0
+
+        # A 429 arrives 0.8 s later: the time since the last acquire must
+        # not count toward the pause
+        now[0] = 0.8
+        limiter.pause(2.0)
+
+        assert limiter.acquire() == pytest.approx(2.1)
+
+    def test_invalid_rate_rejected(self):
+        """Test that a non-positive rate raises ValueError."""
+        with pytest.raises(ValueError):
+            RateLimiter(0)
+
+
+class TestConcurrentFetch:
+    """Test concurrent pagination against a local stand-in server."""
+
+    def test_concurrent_matches_sequential(self, scryfall_server, tmp_path):
+        """Test that concurrent fetching yields the same cards in order."""
+        sequential = _local_client(scryfall_server, tmp_path / "a.db")
+        concurrent = _local_client(scryfall_server, tmp_path / "b.db")
+
+        expected = sequential.get_all_cards("test-query", use_cache=False)
+        cards = concurrent.get_all_cards("test-query", use_cache=False, workers=4)
+
+        assert len(expected) == 16
+        assert cards == expected
+
+    def test_concurrent_fetch_is_faster(self, scryfall_server, tmp_path):
+        """Test that concurrent fetching overlaps page latency."""
+        client = _local_client(scryfall_server, tmp_path / "cache.db")
+
+        start = time.perf_counter()
+        client.get_all_cards("test-query", use_cache=False)
+        sequential_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        client.get_all_cards("test-query", use_cache=False, workers=8)
+        concurrent_time = time.perf_counter() - start
+
+        assert concurrent_time < sequential_time / 2
+
+    def test_concurrent_fetch_respects_rate_limit(self, scryfall_server, tmp_path):
+        """Test that parallel workers still share the request budget."""
+        scryfall_server.delay = 0.0
+        client = _local_client(scryfall_server, tmp_path / "cache.db", rate=20.0)
+
+        client.get_all_cards("test-query", use_cache=False, workers=8)
+
+        times = sorted(t for t, _ in scryfall_server.requests)
+        assert len(times) == 8
+        # 8 requests at 20/s with a burst of 1 need at least 7 intervals
+        assert times[-1] - times[0] >= 7 / 20.0 * 0.9
+
+    def test_retry_after_on_429(self, scryfall_server, tmp_path):
+        """Test that a 429 is retried after the Retry-After delay."""
+        scryfall_server.throttle_pages = {3}
+        client = _local_client(scryfall_server, tmp_path / "cache.db")
+
+        cards = client.get_all_cards("test-query", use_cache=False, workers=4)
+
+        assert len(cards) == 16
+        page3 = [t for t, page in scryfall_server.requests if page == 3]
+        assert len(page3) == 2
+        assert page3[1] - page3[0] >= 0.2 * 0.9
+
+    def test_concurrent_fetch_populates_cache(self, scryfall_server, tmp_path):
+        """Test that pages fetched by worker threads are cached."""
+        client = _local_client(scryfall_server, tmp_path / "cache.db")
+        client.get_all_cards("test-query", workers=4)
+        scryfall_server.requests.clear()
+
+        cards = client.get_all_cards("test-query", workers=4)
+
+        assert len(cards) == 16
+        assert scryfall_server.requests == []
+
+    def test_repeated_fetches_reuse_worker_threads(self, scryfall_server, tmp_path):
+        """Test that repeated parallel fetches don't open more cache connections."""
+        scryfall_server.delay = 0.0
+        client = _local_client(scryfall_server, tmp_path / "cache.db")
+        client.get_all_cards("test-query", workers=4)
+        opened = len(client.cache._connections)
+
+        for _ in range(3):
+            client.get_all_cards("test-query", workers=4, refresh=True)
+
+        assert opened <= 5
+        assert len(client.cache._connections) == opened
+        client.close()
+        client.cache.close()
+        assert client.cache._connections == []
+
+
+class TestConditionalRefresh:
+    """Test session pooling and ETag revalidation against a local server."""
+
+    def test_session_reuses_connection(self, scryfall_server, tmp_path):
+        """Test that sequential pages share one keep-alive connection."""
+        client = _local_client(scryfall_server, tmp_path / "cache.db")
+
+        client.get_all_cards("test-query", use_cache=False)
+
+        assert len(scryfall_server.requests) == 8
+        assert len(scryfall_server.ports) == 1
+
+    def test_etag_stored_with_page(self, scryfall_server, tmp_path):
+        """Test that the response ETag is cached alongside the page."""
+        client = _local_client(scryfall_server, tmp_path / "cache.db")
+
+        client.search_cards("test-query", page=2)
+
+        assert client.cache.get_validators("search:test-query", 2) == (
+            '"p2-v1"',
+            None,
+        )
+
+    def test_refresh_unchanged_pages_revalidate(self, scryfall_server, tmp_path):
+        """Test that refreshing an unchanged snapshot only gets 304s."""
+        client = _local_client(scryfall_server, tmp_path / "cache.db")
+        expected = client.get_all_cards("test-query")
+        before = client.cache.conn.execute(
+            "SELECT page, response FROM cache ORDER BY page"
+        ).fetchall()
+
+        with patch.object(client.cache, "set", wraps=client.cache.set) as mock_set:
+            cards = client.get_all_cards("test-query", refresh=True)
+
+        assert cards == expected
+        assert len(scryfall_server.requests) == 16
+        mock_set.assert_not_called()
+        after = client.cache.conn.execute(
+            "SELECT page, response FROM cache ORDER BY page"
+        ).fetchall()
+        assert [tuple(row) for row in after] == [tuple(row) for row in before]
+
+    def test_refresh_rewrites_changed_pages(self, scryfall_server, tmp_path):
+        """Test that only pages whose ETag changed are rewritten."""
+        client = _local_client(scryfall_server, tmp_path / "cache.db")
+        client.get_all_cards("test-query")
+        scryfall_server.versions[5] = 2
+
+        with patch.object(client.cache, "set", wraps=client.cache.set) as mock_set:
+            cards = client.get_all_cards("test-query", refresh=True, workers=4)
+
+        assert [call.args[2] for call in mock_set.call_args_list] == [5]
+        assert [card["v"] for card in cards if card["id"].startswith("5-")] == [2, 2]
+        assert client.cache.get_validators("search:test-query", 5) == (
+            '"p5-v2"',
+            None,
+        )
+
+
+class TestFreshnessPolicy:
+    """Test TTL and stale-while-revalidate handling of cached pages."""
+
+    def test_policy_states(self):
+        """Test that ages are classified against ttl and max_age."""
+        policy = FreshnessPolicy(ttl=60, max_age=3600)
+
+        assert policy.state(10) == "fresh"
+        assert policy.state(60) == "stale"
+        assert policy.state(3600) == "expired"
+        assert FreshnessPolicy().state(10**9) == "fresh"
+
+    def test_fresh_page_served_without_request(self, scryfall_server, tmp_path):
+        """Test that a page younger than the ttl is served from cache."""
+        policy = FreshnessPolicy(ttl=60, max_age=3600)
+        client = _local_client(scryfall_server, tmp_path / "cache.db", policy=policy)
+        client.search_cards("test-query", page=1)
+        scryfall_server.requests.clear()
+
+        client.search_cards("test-query", page=1)
+        client.wait_for_revalidation()
+
+        assert scryfall_server.requests == []
+
+    def test_stale_page_revalidated_in_background(self, scryfall_server, tmp_path):
+        """Test that a stale page is served at once and refreshed afterwards."""
+        policy = FreshnessPolicy(ttl=60, max_age=3600)
+        client = _local_client(scryfall_server, tmp_path / "cache.db", policy=policy)
+        client.search_cards("test-query", page=1)
+        _age_cache(client.cache, 120)
+        scryfall_server.versions[1] = 2
+        scryfall_server.delay = 0.2
+        scryfall_server.requests.clear()
+
+        start = time.perf_counter()
+        data = client.search_cards("test-query", page=1)
+        elapsed = time.perf_counter() - start
+
+        assert data["data"][0]["v"] == 1
+        assert elapsed < 0.2
+        client.wait_for_revalidation()
+        assert [page for _, page in scryfall_server.requests] == [1]
+        entry = client.cache.get_entry("search:test-query", 1)
+        assert entry.response["data"][0]["v"] == 2
+        assert entry.age < 60
+
+    def test_failed_revalidation_keeps_stale_page(
+        self, scryfall_server, tmp_path, caplog
+    ):
+        """Test that a failed background refresh is logged, not raised."""
+        policy = FreshnessPolicy(ttl=60, max_age=3600)
+        client = _local_client(scryfall_server, tmp_path / "cache.db", policy=policy)
+        client.search_cards("test-query", page=1)
+        _age_cache(client.cache, 120)
+
+        with (
+            caplog.at_level("WARNING", logger="mtg_deck_builder.cache"),
+            patch.object(
+                client, "_request", side_effect=requests.ConnectionError("offline")
+            ),
+        ):
+            data = client.search_cards("test-query", page=1)
+            client.wait_for_revalidation()
+
+        assert data["data"][0]["v"] == 1
+        assert client.cache.get_entry("search:test-query", 1).age >= 60
+        assert "Background refresh of 'test-query' page 1 failed: offline" in (
+            caplog.text
+        )
+
+    def test_expired_page_refetched_before_use(self, scryfall_server, tmp_path):
+        """Test that a page past max_age is refetched synchronously."""
+        policy = FreshnessPolicy(ttl=60, max_age=3600)
+        client = _local_client(scryfall_server, tmp_path / "cache.db", policy=policy)
+        client.search_cards("test-query", page=1)
+        _age_cache(client.cache, 7200)
+        scryfall_server.versions[1] = 2
+
+        data = client.search_cards("test-query", page=1)
+
+        assert data["data"][0]["v"] == 2
+
+    def test_close_waits_for_revalidation(self, scryfall_server, tmp_path):
+        """Test that closing the client finishes queued refreshes."""
+        policy = FreshnessPolicy(ttl=60)
+        client = _local_client(scryfall_server, tmp_path / "cache.db", policy=policy)
+        client.get_all_cards("test-query")
+        _age_cache(client.cache, 120)
+        scryfall_server.requests.clear()
+
+        client.get_all_cards("test-query")
+        client.close()
+
+        assert len(scryfall_server.requests) == 8
+        assert client.cache.get_entry("search:test-query", 8).age < 60
+
 
 class TestScryfallIntegration:
     """Integration tests with real Scryfall API (requires internet)."""